@@ -2,11 +2,15 @@ import os
 import logging
 from flask import Flask, jsonify
 from flask_jwt_extended import JWTManager
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
 
 from config import config
 from utils.api_docs import setup_swagger, init_api_docs
+from utils.cache import init_analytics_cache
+from utils.database import init_database
+from utils.token_blocklist import init_token_blocklist
+from utils.passwords import PasswordHasherBusy, init_password_hasher, password_hasher_busy_response
+from utils.photo_uploads import init_upload_worker
+from utils.image_variants import init_variant_renderer
 
 # Initialize extensions
 jwt = JWTManager()
@@ -21,6 +25,7 @@ def create_app(config_name=None):
     
     # Initialize extensions with app
     jwt.init_app(app)
+    init_token_blocklist(app, jwt)
     
     # Setup logging
     logging.basicConfig(
@@ -28,20 +33,33 @@ def create_app(config_name=None):
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create database engine and session
-    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
-    app.db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    # Attach the shared database engine and session
+    init_database(app)
     
     # Create tables for SQLite (only in testing mode)
     if config_name == 'testing' and app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
         from models import Base
-        Base.metadata.create_all(engine)
+        Base.metadata.create_all(app.db_engine)
+    
+    # Analytics result cache
+    init_analytics_cache(app)
+    
+    # Password hashing pool
+    init_password_hasher(app)
+    
+    # Background photo storage and resizing
+    init_upload_worker(app)
+    init_variant_renderer(app)
     
     # Register error handlers
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({"error": "Not found"}), 404
     
+    @app.errorhandler(PasswordHasherBusy)
+    def password_hasher_busy(error):
+        return password_hasher_busy_response(error)
+    
     @app.errorhandler(500)
     def server_error(error):
         return jsonify({"error": "Internal server error"}), 500
@@ -52,7 +70,7 @@ def create_app(config_name=None):
     
     # Set up Swagger UI
     setup_swagger(app)
-    init_api_docs()
+    init_api_docs(app)
     
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
@@ -68,6 +86,7 @@ def create_app(config_name=None):
     @app.teardown_appcontext
     def shutdown_session(exception=None):
         app.db_session.remove()
+        app.db_read_session.remove()
     
     return app
 
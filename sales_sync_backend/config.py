@@ -10,15 +10,83 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'postgresql://postgres:postgres@db:5432/sales_sync')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connection pool ('queue', or 'null' behind PgBouncer in transaction mode)
+    DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'queue')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_CONNECT_TIMEOUT = int(os.environ.get('DB_CONNECT_TIMEOUT', 10))
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))  # milliseconds, 0 disables
+    
+    # Read replicas for analytics and admin reports (comma-separated URLs)
+    DATABASE_REPLICA_URLS = os.environ.get('DATABASE_REPLICA_URLS', '')
+    DB_REPLICA_HEALTH_INTERVAL = int(os.environ.get('DB_REPLICA_HEALTH_INTERVAL', 30))
+    # Seconds after a tenant's write during which its reports are computed on the primary
+    DB_REPLICA_MAX_LAG = int(os.environ.get('DB_REPLICA_MAX_LAG', 10))
+    
     # JWT
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key-please-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Revoked token blocklist ('memory', 'redis' or 'none')
+    TOKEN_BLOCKLIST_BACKEND = os.environ.get('TOKEN_BLOCKLIST_BACKEND', 'memory')
+    TOKEN_BLOCKLIST_SYNC_INTERVAL = float(os.environ.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 1.0))
+    TOKEN_BLOCKLIST_REBUILD_INTERVAL = int(os.environ.get('TOKEN_BLOCKLIST_REBUILD_INTERVAL', 600))
+    TOKEN_BLOCKLIST_CAPACITY = int(os.environ.get('TOKEN_BLOCKLIST_CAPACITY', 100000))
+    
+    # Password hashing (bcrypt cost factor and per-worker process pool; 0 workers hashes inline)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    PASSWORD_HASH_RETRY_AFTER = int(os.environ.get('PASSWORD_HASH_RETRY_AFTER', 1))
+    
     # File Storage
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', '/tmp/sales_sync_uploads')
     S3_BUCKET = os.environ.get('S3_BUCKET', None)
     S3_REGION = os.environ.get('S3_REGION', 'us-east-1')
+    S3_MAX_POOL_CONNECTIONS = int(os.environ.get('S3_MAX_POOL_CONNECTIONS', 20))
+    S3_MULTIPART_THRESHOLD = int(os.environ.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024))
+    S3_MULTIPART_CHUNKSIZE = int(os.environ.get('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024))
+    
+    # Photo uploads (spooled to disk, stored by a per-worker thread pool; 0 threads stores inline)
+    PHOTO_SPOOL_FOLDER = os.environ.get('PHOTO_SPOOL_FOLDER')
+    PHOTO_UPLOAD_WORKERS = int(os.environ.get('PHOTO_UPLOAD_WORKERS', 4))
+    # Seconds before a pending upload is presumed lost and its content can be uploaded again
+    PHOTO_BLOB_CLAIM_TIMEOUT = int(os.environ.get('PHOTO_BLOB_CLAIM_TIMEOUT', 900))
+    
+    # Photo variants (thumbnail and medium copies, resized in a per-worker process pool; 0 processes resizes inline)
+    PHOTO_VARIANTS = {'thumb': 200, 'medium': 1024}
+    PHOTO_VARIANT_FORMAT = os.environ.get('PHOTO_VARIANT_FORMAT', 'WEBP')  # 'WEBP' or 'JPEG'
+    PHOTO_VARIANT_QUALITY = int(os.environ.get('PHOTO_VARIANT_QUALITY', 80))
+    PHOTO_VARIANT_WORKERS = int(os.environ.get('PHOTO_VARIANT_WORKERS', 2))
+    PHOTO_VARIANT_TIMEOUT = float(os.environ.get('PHOTO_VARIANT_TIMEOUT', 60))
+    
+    # Analytics cache ('memory', 'redis' or 'none')
+    ANALYTICS_CACHE_BACKEND = os.environ.get('ANALYTICS_CACHE_BACKEND', 'memory')
+    ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 60))
+    ANALYTICS_CACHE_MAX_ENTRIES = int(os.environ.get('ANALYTICS_CACHE_MAX_ENTRIES', 1024))
+    REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379/0')
+    
+    # List endpoints ('exact', 'capped', 'estimate' or 'none' counts)
+    LIST_COUNT_STRATEGY = os.environ.get('LIST_COUNT_STRATEGY', 'capped')
+    LIST_COUNT_CAP = int(os.environ.get('LIST_COUNT_CAP', 10000))
+    LIST_MAX_PER_PAGE = int(os.environ.get('LIST_MAX_PER_PAGE', 100))
+    
+    # Most visits one offline sync request may carry
+    VISIT_SYNC_MAX_BATCH = int(os.environ.get('VISIT_SYNC_MAX_BATCH', 500))
+    
+    # Most shelf quadrants one photo may be submitted with
+    SHELF_QUADRANT_MAX_BATCH = int(os.environ.get('SHELF_QUADRANT_MAX_BATCH', 200))
+    
+    # JSON encoder for streamed collections ('json' or 'orjson')
+    JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'json')
+    
+    # OpenAPI spec (built on the first docs request unless prebuilt at startup)
+    API_DOCS_PREBUILD = os.environ.get('API_DOCS_PREBUILD', 'false').lower() == 'true'
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -36,6 +104,13 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///test.db')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=5)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(seconds=10)
+    BCRYPT_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    ANALYTICS_CACHE_BACKEND = 'memory'
+    TOKEN_BLOCKLIST_BACKEND = 'memory'
+    PHOTO_UPLOAD_WORKERS = 0
+    PHOTO_VARIANT_WORKERS = 0
+    DATABASE_REPLICA_URLS = os.environ.get('TEST_DATABASE_REPLICA_URLS', '')
 
 
 class ProductionConfig(Config):
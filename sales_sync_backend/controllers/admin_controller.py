@@ -1,14 +1,18 @@
+import os
+
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required
 from datetime import datetime
 
 from services.admin_service import (
     get_user_activity,
     get_survey_completion_rates,
+    get_audit_logs_query,
     get_audit_logs
 )
-from utils.auth_decorators import admin_required, super_admin_required
+from utils.auth_decorators import jwt_required, admin_required, super_admin_required
+from utils.database import get_pool_stats, get_read_session, read_with_retry
 from utils.request_utils import get_tenant_id_from_jwt
+from utils.streaming import stream_query, wants_stream
 
 
 @jwt_required()
@@ -29,8 +33,8 @@ def get_user_activity_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get user activity
-    activity = get_user_activity(
-        request.app.db_session,
+    activity = read_with_retry(
+        get_user_activity,
         tenant_id,
         start_date,
         end_date
@@ -58,8 +62,8 @@ def get_survey_completion_rates_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get survey completion rates
-    rates = get_survey_completion_rates(
-        request.app.db_session,
+    rates = read_with_retry(
+        get_survey_completion_rates,
         tenant_id,
         start_date,
         end_date
@@ -92,13 +96,26 @@ def get_tenant_audit_logs_handler():
     if request.args.get('end_date'):
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
+    # Stream every matching log if requested
+    if wants_stream():
+        return stream_query(get_audit_logs_query(
+            get_read_session(),
+            tenant_id,
+            user_id,
+            action,
+            object_type,
+            object_id,
+            start_date,
+            end_date
+        ), items_key='logs')
+    
     # Parse pagination
     limit = int(request.args.get('limit', 100))
     offset = int(request.args.get('offset', 0))
     
     # Get audit logs
-    logs = get_audit_logs(
-        request.app.db_session,
+    logs = read_with_retry(
+        get_audit_logs,
         tenant_id,
         user_id,
         action,
@@ -135,13 +152,26 @@ def get_all_audit_logs_handler():
     if request.args.get('end_date'):
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
+    # Stream every matching log if requested
+    if wants_stream():
+        return stream_query(get_audit_logs_query(
+            get_read_session(),
+            tenant_id,
+            user_id,
+            action,
+            object_type,
+            object_id,
+            start_date,
+            end_date
+        ), items_key='logs')
+    
     # Parse pagination
     limit = int(request.args.get('limit', 100))
     offset = int(request.args.get('offset', 0))
     
     # Get audit logs
-    logs = get_audit_logs(
-        request.app.db_session,
+    logs = read_with_retry(
+        get_audit_logs,
         tenant_id,
         user_id,
         action,
@@ -154,4 +184,16 @@ def get_all_audit_logs_handler():
     )
     
     # Return logs
-    return jsonify(logs), 200
\ No newline at end of file
+    return jsonify(logs), 200
+
+
+@jwt_required()
+@super_admin_required
+def get_db_pool_stats_handler():
+    """
+    Get connection pool state and checkout metrics for this worker.
+    
+    Each worker process has its own pools, so sample every worker (or
+    aggregate these in monitoring) before resizing DB_POOL_SIZE.
+    """
+    return jsonify({'pid': os.getpid(), 'engines': get_pool_stats()}), 200
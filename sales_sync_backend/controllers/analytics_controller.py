@@ -1,5 +1,5 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt_identity
 from datetime import datetime
 
 from services.analytics_service import (
@@ -8,12 +8,15 @@ from services.analytics_service import (
     get_shelf_share_metrics,
     get_call_cycle_coverage_metrics
 )
-from utils.auth_decorators import tenant_required
+from utils.auth_decorators import jwt_required, tenant_required
+from utils.cache import cached_response
+from utils.database import read_with_retry
 from utils.request_utils import get_tenant_id_from_jwt
 
 
 @jwt_required()
 @tenant_required
+@cached_response('overview')
 def get_overview_handler():
     """
     Get overview metrics for the current tenant.
@@ -33,8 +36,8 @@ def get_overview_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get overview metrics
-    metrics = get_overview_metrics(
-        request.app.db_session,
+    metrics = read_with_retry(
+        get_overview_metrics,
         tenant_id,
         user_id,
         start_date,
@@ -47,6 +50,7 @@ def get_overview_handler():
 
 @jwt_required()
 @tenant_required
+@cached_response('visits')
 def get_visits_handler():
     """
     Get visits metrics for the current tenant.
@@ -67,8 +71,8 @@ def get_visits_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get visits metrics
-    metrics = get_visits_metrics(
-        request.app.db_session,
+    metrics = read_with_retry(
+        get_visits_metrics,
         tenant_id,
         user_id,
         start_date,
@@ -82,6 +86,7 @@ def get_visits_handler():
 
 @jwt_required()
 @tenant_required
+@cached_response('shelf_share')
 def get_shelf_share_handler():
     """
     Get shelf share metrics for the current tenant.
@@ -101,8 +106,8 @@ def get_shelf_share_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get shelf share metrics
-    metrics = get_shelf_share_metrics(
-        request.app.db_session,
+    metrics = read_with_retry(
+        get_shelf_share_metrics,
         tenant_id,
         user_id,
         start_date,
@@ -115,6 +120,7 @@ def get_shelf_share_handler():
 
 @jwt_required()
 @tenant_required
+@cached_response('call_cycle_coverage')
 def get_call_cycle_coverage_handler():
     """
     Get call cycle coverage metrics for the current tenant.
@@ -134,8 +140,8 @@ def get_call_cycle_coverage_handler():
         end_date = datetime.fromisoformat(request.args.get('end_date'))
     
     # Get call cycle coverage metrics
-    metrics = get_call_cycle_coverage_metrics(
-        request.app.db_session,
+    metrics = read_with_retry(
+        get_call_cycle_coverage_metrics,
         tenant_id,
         user_id,
         start_date,
@@ -1,11 +1,12 @@
 from flask import jsonify, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt, decode_token
 from marshmallow import ValidationError
 
 from services.auth_service import (
     register_tenant_and_admin,
     authenticate_user,
-    generate_tokens
+    generate_tokens,
+    refresh_access_token
 )
 from utils.validators import (
     RegisterSchema,
@@ -13,6 +14,8 @@ from utils.validators import (
     ForgotPasswordSchema,
     ResetPasswordSchema
 )
+from utils.passwords import PasswordHasherBusy, password_hasher_busy_response
+from utils.token_blocklist import revoke_token
 
 
 def register():
@@ -51,6 +54,8 @@ def register():
         }), 201
     except ValidationError as e:
         return jsonify({'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        return password_hasher_busy_response(e)
     except Exception as e:
         current_app.logger.error(f"Registration error: {str(e)}")
         return jsonify({'error': 'Registration failed'}), 500
@@ -89,6 +94,8 @@ def login():
         }), 200
     except ValidationError as e:
         return jsonify({'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        return password_hasher_busy_response(e)
     except Exception as e:
         current_app.logger.error(f"Login error: {str(e)}")
         return jsonify({'error': 'Login failed'}), 500
@@ -111,12 +118,7 @@ def refresh():
         
         # Create new access token with same claims
         access_token = {
-            'access_token': generate_tokens({
-                'id': user_id,
-                'tenant_id': claims['tenant_id'],
-                'roles': claims['roles'],
-                'email': claims['email']
-            })['access_token']
+            'access_token': refresh_access_token(user_id, claims)
         }
         
         # Return response
@@ -132,14 +134,26 @@ def refresh():
 @jwt_required()
 def logout():
     """
-    Logout user by revoking refresh token.
+    Logout user by revoking the access token and, if given, the refresh token.
     
     Returns:
         JSON response with success message
     """
     try:
-        # In a real application, you would add the token to a blocklist
-        # For simplicity, we'll just return success
+        # Revoke the refresh token from the request body
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                refresh_claims = decode_token(refresh_token)
+            except Exception:
+                return jsonify({'error': 'Invalid refresh token'}), 400
+            if refresh_claims.get('type') != 'refresh' or refresh_claims.get('sub') != get_jwt_identity():
+                return jsonify({'error': 'Invalid refresh token'}), 400
+            revoke_token(refresh_claims)
+        
+        # Revoke the access token
+        revoke_token(get_jwt())
+        
         return jsonify({'message': 'Logout successful'}), 200
     except Exception as e:
         current_app.logger.error(f"Logout error: {str(e)}")
@@ -16,6 +16,7 @@ from utils.validators import (
     BrandInfographicSchema
 )
 from utils.auth_decorators import admin_required, tenant_required
+from utils.request_utils import get_list_params
 
 
 @tenant_required
@@ -35,12 +36,13 @@ def get_brands_handler():
             filters['active'] = request.args.get('active').lower() == 'true'
         
         # Get brands
-        brands = get_brands(current_app.db_session, g.tenant_id, filters)
+        try:
+            brands = get_brands(current_app.db_session, g.tenant_id, filters, get_list_params())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Return response
-        return jsonify({
-            'brands': [brand.to_dict() for brand in brands]
-        }), 200
+        return jsonify(brands.to_response('brands')), 200
     except Exception as e:
         current_app.logger.error(f"Get brands error: {str(e)}")
         return jsonify({'error': 'Failed to get brands'}), 500
@@ -1,5 +1,5 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
 
 from services.call_cycle_service import (
     get_call_cycles,
@@ -13,8 +13,8 @@ from services.call_cycle_service import (
     update_call_cycle_location_order,
     get_call_cycle_status
 )
-from utils.auth_decorators import manager_required, tenant_required
-from utils.request_utils import get_tenant_id_from_jwt
+from utils.auth_decorators import jwt_required, manager_required, tenant_required
+from utils.request_utils import get_tenant_id_from_jwt, get_list_params
 
 
 @jwt_required()
@@ -22,6 +22,9 @@ from utils.request_utils import get_tenant_id_from_jwt
 def get_call_cycles_handler():
     """
     Get call cycles for the current tenant.
+    
+    ?fields= limits the returned fields and ?include=locations embeds each
+    item's locations.
     """
     # Get tenant ID from JWT
     tenant_id = get_tenant_id_from_jwt()
@@ -36,10 +39,13 @@ def get_call_cycles_handler():
         filters['created_by'] = request.args.get('created_by')
     
     # Get call cycles
-    call_cycles = get_call_cycles(request.app.db_session, tenant_id, filters)
+    try:
+        call_cycles = get_call_cycles(current_app.db_session, tenant_id, filters, get_list_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return call cycles
-    return jsonify([call_cycle.to_dict() for call_cycle in call_cycles]), 200
+    return jsonify(call_cycles.to_response('call_cycles')), 200
 
 
 @jwt_required()
@@ -52,7 +58,7 @@ def get_call_cycle_handler(call_cycle_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle
-    call_cycle = get_call_cycle_by_id(request.app.db_session, tenant_id, call_cycle_id)
+    call_cycle = get_call_cycle_by_id(current_app.db_session, tenant_id, call_cycle_id)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
@@ -85,7 +91,7 @@ def create_call_cycle_handler():
     
     # Create call cycle
     call_cycle = create_call_cycle(
-        request.app.db_session,
+        current_app.db_session,
         tenant_id,
         data.get('name'),
         data.get('frequency'),
@@ -109,7 +115,7 @@ def update_call_cycle_handler(call_cycle_id):
     data = request.get_json()
     
     # Update call cycle
-    call_cycle = update_call_cycle(request.app.db_session, tenant_id, call_cycle_id, data)
+    call_cycle = update_call_cycle(current_app.db_session, tenant_id, call_cycle_id, data)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
@@ -127,7 +133,7 @@ def delete_call_cycle_handler(call_cycle_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Delete call cycle
-    success = delete_call_cycle(request.app.db_session, tenant_id, call_cycle_id)
+    success = delete_call_cycle(current_app.db_session, tenant_id, call_cycle_id)
     if not success:
         return jsonify({'error': 'Call cycle not found'}), 404
     
@@ -145,12 +151,12 @@ def get_call_cycle_locations_handler(call_cycle_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle
-    call_cycle = get_call_cycle_by_id(request.app.db_session, tenant_id, call_cycle_id)
+    call_cycle = get_call_cycle_by_id(current_app.db_session, tenant_id, call_cycle_id)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
     # Get call cycle locations
-    locations = get_call_cycle_locations(request.app.db_session, tenant_id, call_cycle_id)
+    locations = get_call_cycle_locations(current_app.db_session, tenant_id, call_cycle_id)
     
     # Return call cycle locations
     return jsonify([location.to_dict() for location in locations]), 200
@@ -166,7 +172,7 @@ def add_call_cycle_location_handler(call_cycle_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle
-    call_cycle = get_call_cycle_by_id(request.app.db_session, tenant_id, call_cycle_id)
+    call_cycle = get_call_cycle_by_id(current_app.db_session, tenant_id, call_cycle_id)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
@@ -179,7 +185,7 @@ def add_call_cycle_location_handler(call_cycle_id):
     
     # Add location to call cycle
     location = add_call_cycle_location(
-        request.app.db_session,
+        current_app.db_session,
         call_cycle_id,
         data.get('location'),
         data.get('shop_id'),
@@ -200,13 +206,13 @@ def remove_call_cycle_location_handler(call_cycle_id, location_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle
-    call_cycle = get_call_cycle_by_id(request.app.db_session, tenant_id, call_cycle_id)
+    call_cycle = get_call_cycle_by_id(current_app.db_session, tenant_id, call_cycle_id)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
     # Remove location from call cycle
     success = remove_call_cycle_location(
-        request.app.db_session,
+        current_app.db_session,
         call_cycle_id,
         location_id
     )
@@ -228,7 +234,7 @@ def update_call_cycle_location_order_handler(call_cycle_id, location_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle
-    call_cycle = get_call_cycle_by_id(request.app.db_session, tenant_id, call_cycle_id)
+    call_cycle = get_call_cycle_by_id(current_app.db_session, tenant_id, call_cycle_id)
     if not call_cycle:
         return jsonify({'error': 'Call cycle not found'}), 404
     
@@ -241,7 +247,7 @@ def update_call_cycle_location_order_handler(call_cycle_id, location_id):
     
     # Update call cycle location order
     location = update_call_cycle_location_order(
-        request.app.db_session,
+        current_app.db_session,
         call_cycle_id,
         location_id,
         data.get('order_num')
@@ -264,7 +270,7 @@ def get_call_cycle_status_handler(call_cycle_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get call cycle status
-    status = get_call_cycle_status(request.app.db_session, tenant_id, call_cycle_id)
+    status = get_call_cycle_status(current_app.db_session, tenant_id, call_cycle_id)
     if not status:
         return jsonify({'error': 'Call cycle not found'}), 404
     
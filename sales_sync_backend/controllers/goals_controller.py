@@ -1,5 +1,4 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required
+from flask import request, jsonify, current_app
 
 from services.goal_service import (
     get_goals,
@@ -13,8 +12,8 @@ from services.goal_service import (
     update_goal_progress,
     get_goal_progress
 )
-from utils.auth_decorators import admin_required, manager_required, tenant_required
-from utils.request_utils import get_tenant_id_from_jwt
+from utils.auth_decorators import jwt_required, admin_required, manager_required, tenant_required
+from utils.request_utils import get_tenant_id_from_jwt, get_list_params
 
 
 @jwt_required()
@@ -22,6 +21,9 @@ from utils.request_utils import get_tenant_id_from_jwt
 def get_goals_handler():
     """
     Get goals for the current tenant.
+    
+    ?fields= limits the returned fields and ?include=assignments embeds each
+    item's assignments.
     """
     # Get tenant ID from JWT
     tenant_id = get_tenant_id_from_jwt()
@@ -40,10 +42,13 @@ def get_goals_handler():
         filters['end_date'] = request.args.get('end_date')
     
     # Get goals
-    goals = get_goals(request.app.db_session, tenant_id, filters)
+    try:
+        goals = get_goals(current_app.db_session, tenant_id, filters, get_list_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return goals
-    return jsonify([goal.to_dict() for goal in goals]), 200
+    return jsonify(goals.to_response('goals')), 200
 
 
 @jwt_required()
@@ -56,7 +61,7 @@ def get_goal_handler(goal_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal
-    goal = get_goal_by_id(request.app.db_session, tenant_id, goal_id)
+    goal = get_goal_by_id(current_app.db_session, tenant_id, goal_id)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -91,7 +96,7 @@ def create_goal_handler():
     
     # Create goal
     goal = create_goal(
-        request.app.db_session,
+        current_app.db_session,
         tenant_id,
         data.get('name'),
         data.get('metric'),
@@ -119,7 +124,7 @@ def update_goal_handler(goal_id):
     data = request.get_json()
     
     # Update goal
-    goal = update_goal(request.app.db_session, tenant_id, goal_id, data)
+    goal = update_goal(current_app.db_session, tenant_id, goal_id, data)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -138,7 +143,7 @@ def delete_goal_handler(goal_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Delete goal
-    success = delete_goal(request.app.db_session, tenant_id, goal_id)
+    success = delete_goal(current_app.db_session, tenant_id, goal_id)
     if not success:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -156,12 +161,12 @@ def get_goal_assignments_handler(goal_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal
-    goal = get_goal_by_id(request.app.db_session, tenant_id, goal_id)
+    goal = get_goal_by_id(current_app.db_session, tenant_id, goal_id)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
     # Get goal assignments
-    assignments = get_goal_assignments(request.app.db_session, tenant_id, goal_id)
+    assignments = get_goal_assignments(current_app.db_session, tenant_id, goal_id)
     
     # Return goal assignments
     return jsonify([assignment.to_dict() for assignment in assignments]), 200
@@ -178,7 +183,7 @@ def assign_goal_handler(goal_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal
-    goal = get_goal_by_id(request.app.db_session, tenant_id, goal_id)
+    goal = get_goal_by_id(current_app.db_session, tenant_id, goal_id)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -195,7 +200,7 @@ def assign_goal_handler(goal_id):
     
     # Assign goal
     assignment = assign_goal(
-        request.app.db_session,
+        current_app.db_session,
         goal_id,
         data.get('assignee_type'),
         data.get('assignee_id'),
@@ -217,13 +222,13 @@ def unassign_goal_handler(goal_id, assignee_type, assignee_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal
-    goal = get_goal_by_id(request.app.db_session, tenant_id, goal_id)
+    goal = get_goal_by_id(current_app.db_session, tenant_id, goal_id)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
     # Unassign goal
     success = unassign_goal(
-        request.app.db_session,
+        current_app.db_session,
         goal_id,
         assignee_type,
         assignee_id
@@ -247,7 +252,7 @@ def update_goal_progress_handler(goal_id, assignee_type, assignee_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal
-    goal = get_goal_by_id(request.app.db_session, tenant_id, goal_id)
+    goal = get_goal_by_id(current_app.db_session, tenant_id, goal_id)
     if not goal:
         return jsonify({'error': 'Goal not found'}), 404
     
@@ -260,7 +265,7 @@ def update_goal_progress_handler(goal_id, assignee_type, assignee_id):
     
     # Update goal progress
     assignment = update_goal_progress(
-        request.app.db_session,
+        current_app.db_session,
         goal_id,
         assignee_type,
         assignee_id,
@@ -284,7 +289,7 @@ def get_goal_progress_handler(goal_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get goal progress
-    progress = get_goal_progress(request.app.db_session, tenant_id, goal_id)
+    progress = get_goal_progress(current_app.db_session, tenant_id, goal_id)
     if not progress:
         return jsonify({'error': 'Goal not found'}), 404
     
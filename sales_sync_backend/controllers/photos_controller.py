@@ -1,16 +1,25 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import uuid
+
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
 
 from services.photo_service import (
+    get_photos_query,
     get_photos,
     get_photo_by_id,
-    create_photo,
+    get_photo_frame,
+    create_photo_upload,
+    create_photo_from_hash,
     get_shelf_quadrants,
-    create_shelf_quadrant
+    create_shelf_quadrant,
+    replace_shelf_quadrants,
+    ShelfQuadrantValidationError
 )
-from utils.auth_decorators import agent_required, tenant_required
-from utils.request_utils import get_tenant_id_from_jwt
-from utils.image_utils import upload_file_to_s3
+from services.visit_service import get_visit_by_id
+from utils.auth_decorators import jwt_required, agent_required, tenant_required
+from utils.request_utils import get_tenant_id_from_jwt, get_list_params, get_fieldset_params
+from utils.photo_uploads import spool_upload
+from utils.streaming import stream_query, wants_stream
 
 
 @jwt_required()
@@ -18,6 +27,9 @@ from utils.image_utils import upload_file_to_s3
 def get_photos_handler():
     """
     Get photos for the current tenant.
+    
+    ?fields= limits the returned fields and ?include=shelf_quadrants embeds
+    each photo's quadrants.
     """
     # Get tenant ID from JWT
     tenant_id = get_tenant_id_from_jwt()
@@ -29,11 +41,21 @@ def get_photos_handler():
     if request.args.get('purpose'):
         filters['purpose'] = request.args.get('purpose')
     
+    # Stream every matching photo if requested
+    if wants_stream():
+        try:
+            return stream_query(get_photos_query(current_app.db_session, tenant_id, filters), items_key='photos', **get_fieldset_params())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
     # Get photos
-    photos = get_photos(request.app.db_session, tenant_id, filters)
+    try:
+        photos = get_photos(current_app.db_session, tenant_id, filters, get_list_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return photos
-    return jsonify([photo.to_dict() for photo in photos]), 200
+    return jsonify(photos.to_response('photos')), 200
 
 
 @jwt_required()
@@ -46,7 +68,7 @@ def get_photo_handler(photo_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get photo
-    photo = get_photo_by_id(request.app.db_session, tenant_id, photo_id)
+    photo = get_photo_by_id(current_app.db_session, tenant_id, photo_id)
     if not photo:
         return jsonify({'error': 'Photo not found'}), 404
     
@@ -58,11 +80,43 @@ def get_photo_handler(photo_id):
 @agent_required
 def create_photo_handler():
     """
-    Create a new photo.
+    Upload a photo.
+    
+    The file is spooled to disk and stored in the background, so the
+    response is 202 with the photo's status set to 'pending'; it becomes
+    'ready' (or 'failed') once the file is in storage. A file the tenant
+    has uploaded before is not stored again.
+    
+    Instead of a file, clients may send content_hash, the file's SHA-256;
+    if the tenant already has that content the photo links to it, and
+    otherwise the response is 404 and the file has to be uploaded.
     """
     # Get tenant ID from JWT
     tenant_id = get_tenant_id_from_jwt()
     
+    # Get form data
+    visit_id = request.form.get('visit_id')
+    if not visit_id:
+        return jsonify({'error': 'Visit ID is required'}), 400
+    try:
+        visit_id = uuid.UUID(visit_id)
+    except ValueError:
+        return jsonify({'error': 'Invalid visit ID'}), 400
+    
+    # Check the visit before spooling anything
+    if not get_visit_by_id(current_app.db_session, tenant_id, visit_id):
+        return jsonify({'error': 'Visit not found'}), 404
+    
+    purpose = request.form.get('purpose')
+    
+    # Link to already uploaded content
+    content_hash = request.form.get('content_hash')
+    if 'file' not in request.files and content_hash:
+        photo = create_photo_from_hash(current_app.db_session, tenant_id, visit_id, content_hash, purpose)
+        if not photo:
+            return jsonify({'error': 'Photo content not found'}), 404
+        return jsonify(photo.to_dict()), 202
+    
     # Get request data
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
@@ -71,29 +125,20 @@ def create_photo_handler():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
     
-    # Get form data
-    visit_id = request.form.get('visit_id')
-    if not visit_id:
-        return jsonify({'error': 'Visit ID is required'}), 400
-    
-    purpose = request.form.get('purpose')
-    metadata = {}
+    # Spool the upload to disk in chunks
+    spooled = spool_upload(file)
     
-    # Upload image
-    file_url = upload_file_to_s3(file)
-    
-    # Create photo
-    photo = create_photo(
-        request.app.db_session,
+    # Create photo and queue the file for storage
+    photo = create_photo_upload(
+        current_app.db_session,
         tenant_id,
         visit_id,
-        file_url,
-        purpose,
-        metadata
+        spooled,
+        purpose
     )
     
     # Return photo
-    return jsonify(photo.to_dict()), 201
+    return jsonify(photo.to_dict()), 202
 
 
 @jwt_required()
@@ -106,12 +151,12 @@ def get_shelf_quadrants_handler(photo_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get photo
-    photo = get_photo_by_id(request.app.db_session, tenant_id, photo_id)
+    photo = get_photo_by_id(current_app.db_session, tenant_id, photo_id)
     if not photo:
         return jsonify({'error': 'Photo not found'}), 404
     
     # Get shelf quadrants
-    shelf_quadrants = get_shelf_quadrants(request.app.db_session, tenant_id, photo_id)
+    shelf_quadrants = get_shelf_quadrants(current_app.db_session, tenant_id, photo_id)
     
     # Return shelf quadrants
     return jsonify([sq.to_dict() for sq in shelf_quadrants]), 200
@@ -127,7 +172,7 @@ def create_shelf_quadrant_handler(photo_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get photo
-    photo = get_photo_by_id(request.app.db_session, tenant_id, photo_id)
+    photo = get_photo_by_id(current_app.db_session, tenant_id, photo_id)
     if not photo:
         return jsonify({'error': 'Photo not found'}), 404
     
@@ -140,15 +185,64 @@ def create_shelf_quadrant_handler(photo_id):
     if not data.get('quadrant_coords'):
         return jsonify({'error': 'Quadrant coordinates are required'}), 400
     
-    # Create shelf quadrant
-    shelf_quadrant = create_shelf_quadrant(
-        request.app.db_session,
-        tenant_id,
-        photo_id,
-        data.get('brand_id'),
-        data.get('quadrant_coords'),
-        data.get('area_percentage')
-    )
+    # Create shelf quadrant, measuring its area against the photo
+    try:
+        shelf_quadrant = create_shelf_quadrant(
+            current_app.db_session,
+            tenant_id,
+            photo_id,
+            data.get('brand_id'),
+            data.get('quadrant_coords'),
+            data.get('area_percentage'),
+            frame=get_photo_frame(photo)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return shelf quadrant
-    return jsonify(shelf_quadrant.to_dict()), 201
\ No newline at end of file
+    return jsonify(shelf_quadrant.to_dict()), 201
+
+
+@jwt_required()
+@agent_required
+def replace_shelf_quadrants_handler(photo_id):
+    """
+    Replace all shelf quadrants of a photo.
+    
+    Expects {"quadrants": [...]}, one entry per brand with brand_id,
+    quadrant_coords and an optional area_percentage. The photo's existing
+    quadrants are replaced atomically; if any entry is invalid nothing
+    changes and quadrant_errors lists the problems by index.
+    """
+    # Get tenant ID from JWT
+    tenant_id = get_tenant_id_from_jwt()
+    
+    # Get photo
+    photo = get_photo_by_id(current_app.db_session, tenant_id, photo_id)
+    if not photo:
+        return jsonify({'error': 'Photo not found'}), 404
+    
+    # Get request data
+    data = request.get_json() or {}
+    
+    # Validate request data
+    quadrants = data.get('quadrants')
+    if not isinstance(quadrants, list):
+        return jsonify({'error': 'Quadrants must be a list'}), 400
+    max_batch = current_app.config.get('SHELF_QUADRANT_MAX_BATCH', 200)
+    if len(quadrants) > max_batch:
+        return jsonify({'error': f'At most {max_batch} quadrants can be submitted per photo'}), 400
+    
+    # Replace the quadrants of the photo loaded above
+    try:
+        shelf_quadrants = replace_shelf_quadrants(
+            current_app.db_session,
+            tenant_id,
+            photo,
+            quadrants
+        )
+    except ShelfQuadrantValidationError as e:
+        return jsonify({'error': str(e), 'quadrant_errors': e.errors}), 400
+    
+    # Return shelf quadrants
+    return jsonify([sq.to_dict() for sq in shelf_quadrants]), 200
@@ -1,8 +1,7 @@
 from flask import request, jsonify
-from flask_jwt_extended import jwt_required
 
 from models.role import Role
-from utils.auth_decorators import admin_required
+from utils.auth_decorators import jwt_required, admin_required
 
 
 @jwt_required()
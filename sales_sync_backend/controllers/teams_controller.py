@@ -1,5 +1,5 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
 
 from services.team_service import (
     get_teams,
@@ -10,8 +10,8 @@ from services.team_service import (
     add_team_member,
     remove_team_member
 )
-from utils.auth_decorators import admin_required, area_manager_required, team_leader_required, tenant_required
-from utils.request_utils import get_tenant_id_from_jwt
+from utils.auth_decorators import jwt_required, admin_required, area_manager_required, team_leader_required, tenant_required
+from utils.request_utils import get_tenant_id_from_jwt, get_list_params
 
 
 @jwt_required()
@@ -31,10 +31,13 @@ def get_teams_handler():
         filters['manager_id'] = request.args.get('manager_id')
     
     # Get teams
-    teams = get_teams(request.app.db_session, tenant_id, filters)
+    try:
+        teams = get_teams(current_app.db_session, tenant_id, filters, get_list_params())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return teams
-    return jsonify([team.to_dict() for team in teams]), 200
+    return jsonify(teams.to_response('teams')), 200
 
 
 @jwt_required()
@@ -47,7 +50,7 @@ def get_team_handler(team_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get team
-    team = get_team_by_id(request.app.db_session, tenant_id, team_id)
+    team = get_team_by_id(current_app.db_session, tenant_id, team_id)
     if not team:
         return jsonify({'error': 'Team not found'}), 404
     
@@ -74,7 +77,7 @@ def create_team_handler():
     
     # Create team
     team = create_team(
-        request.app.db_session,
+        current_app.db_session,
         tenant_id,
         data.get('name'),
         data.get('manager_id')
@@ -98,7 +101,7 @@ def update_team_handler(team_id):
     data = request.get_json()
     
     # Update team
-    team = update_team(request.app.db_session, tenant_id, team_id, data)
+    team = update_team(current_app.db_session, tenant_id, team_id, data)
     if not team:
         return jsonify({'error': 'Team not found'}), 404
     
@@ -116,12 +119,12 @@ def get_team_members_handler(team_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get team
-    team = get_team_by_id(request.app.db_session, tenant_id, team_id)
+    team = get_team_by_id(current_app.db_session, tenant_id, team_id)
     if not team:
         return jsonify({'error': 'Team not found'}), 404
     
     # Get team members
-    members = get_team_members(request.app.db_session, tenant_id, team_id)
+    members = get_team_members(current_app.db_session, tenant_id, team_id)
     
     # Return team members
     return jsonify([member.to_dict() for member in members]), 200
@@ -138,7 +141,7 @@ def add_team_member_handler(team_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get team
-    team = get_team_by_id(request.app.db_session, tenant_id, team_id)
+    team = get_team_by_id(current_app.db_session, tenant_id, team_id)
     if not team:
         return jsonify({'error': 'Team not found'}), 404
     
@@ -151,7 +154,7 @@ def add_team_member_handler(team_id):
     
     # Add user to team
     user_team = add_team_member(
-        request.app.db_session,
+        current_app.db_session,
         team_id,
         data.get('user_id')
     )
@@ -171,13 +174,13 @@ def remove_team_member_handler(team_id, user_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get team
-    team = get_team_by_id(request.app.db_session, tenant_id, team_id)
+    team = get_team_by_id(current_app.db_session, tenant_id, team_id)
     if not team:
         return jsonify({'error': 'Team not found'}), 404
     
     # Remove user from team
     success = remove_team_member(
-        request.app.db_session,
+        current_app.db_session,
         team_id,
         user_id
     )
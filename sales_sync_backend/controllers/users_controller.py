@@ -15,6 +15,8 @@ from utils.validators import (
     UserUpdateSchema
 )
 from utils.auth_decorators import admin_required, tenant_required
+from utils.request_utils import get_list_params
+from utils.passwords import PasswordHasherBusy, password_hasher_busy_response
 
 
 @tenant_required
@@ -50,6 +52,8 @@ def create_user_handler():
         }), 201
     except ValidationError as e:
         return jsonify({'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        return password_hasher_busy_response(e)
     except Exception as e:
         current_app.logger.error(f"User creation error: {str(e)}")
         return jsonify({'error': 'User creation failed'}), 500
@@ -72,12 +76,13 @@ def get_users_handler():
             filters['is_active'] = request.args.get('is_active').lower() == 'true'
         
         # Get users
-        users = get_users(current_app.db_session, g.tenant_id, filters)
+        try:
+            users = get_users(current_app.db_session, g.tenant_id, filters, get_list_params())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Return response
-        return jsonify({
-            'users': [user.to_dict() for user in users]
-        }), 200
+        return jsonify(users.to_response('users')), 200
     except Exception as e:
         current_app.logger.error(f"Get users error: {str(e)}")
         return jsonify({'error': 'Failed to get users'}), 500
@@ -140,6 +145,8 @@ def update_user_handler(user_id):
         }), 200
     except ValidationError as e:
         return jsonify({'error': 'Validation error', 'details': e.messages}), 400
+    except PasswordHasherBusy as e:
+        return password_hasher_busy_response(e)
     except Exception as e:
         current_app.logger.error(f"User update error: {str(e)}")
         return jsonify({'error': 'User update failed'}), 500
@@ -1,23 +1,41 @@
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
 
 from services.visit_service import (
-    get_visits,
+    get_visits_query,
+    get_visits_page,
     get_visit_by_id,
     create_visit,
     complete_visit,
+    sync_visits,
+    AnswerValidationError,
     get_visit_answers,
     get_visit_photos
 )
-from utils.auth_decorators import agent_required, tenant_required
-from utils.request_utils import get_tenant_id_from_jwt
+from utils.auth_decorators import jwt_required, agent_required, tenant_required
+from utils.request_utils import (
+    get_tenant_id_from_jwt,
+    get_cursor_params,
+    get_fieldset_params,
+    encode_cursor,
+    decode_cursor,
+    paginate_response
+)
+from models.visit import Visit
+from utils.serializers import make_serializer
+from utils.streaming import stream_query, wants_stream
 
 
 @jwt_required()
 @tenant_required
 def get_visits_handler():
     """
-    Get visits for the current tenant.
+    Get visits for the current tenant, one keyset page at a time.
+    
+    Pass the returned next_cursor back as ?cursor= to get the following page.
+    With ?stream=true or Accept: application/x-ndjson all matching visits
+    are streamed instead. ?fields= limits the returned visit fields and
+    ?include=answers,photos embeds related rows without extra requests.
     """
     # Get tenant ID from JWT
     tenant_id = get_tenant_id_from_jwt()
@@ -39,11 +57,40 @@ def get_visits_handler():
     if request.args.get('completed'):
         filters['completed'] = request.args.get('completed').lower() == 'true'
     
+    # Get fieldset params
+    fieldset = get_fieldset_params()
+    
+    # Stream every matching visit if requested
+    if wants_stream():
+        try:
+            return stream_query(get_visits_query(current_app.db_session, tenant_id, filters), items_key='visits', **fieldset)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    
+    # Get pagination params
+    cursor, limit = get_cursor_params()
+    
     # Get visits
-    visits = get_visits(request.app.db_session, tenant_id, filters)
+    try:
+        visits, next_cursor = get_visits_page(
+            current_app.db_session,
+            tenant_id,
+            filters,
+            limit,
+            decode_cursor(cursor) if cursor else None,
+            **fieldset
+        )
+        serialize = make_serializer(Visit, **fieldset)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     # Return visits
-    return jsonify([visit.to_dict() for visit in visits]), 200
+    return jsonify(paginate_response(
+        [serialize(visit) for visit in visits],
+        per_page=limit,
+        next_cursor=encode_cursor(next_cursor) if next_cursor else None,
+        items_key='visits'
+    )), 200
 
 
 @jwt_required()
@@ -56,7 +103,7 @@ def get_visit_handler(visit_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get visit
-    visit = get_visit_by_id(request.app.db_session, tenant_id, visit_id)
+    visit = get_visit_by_id(current_app.db_session, tenant_id, visit_id)
     if not visit:
         return jsonify({'error': 'Visit not found'}), 404
     
@@ -89,7 +136,7 @@ def create_visit_handler():
     
     # Create visit
     visit = create_visit(
-        request.app.db_session,
+        current_app.db_session,
         tenant_id,
         user_id,
         data.get('survey_id'),
@@ -102,6 +149,47 @@ def create_visit_handler():
     return jsonify(visit.to_dict()), 201
 
 
+@jwt_required()
+@agent_required
+def sync_visits_handler():
+    """
+    Create a batch of visits recorded offline.
+    
+    Expects {"visits": [...]} where each visit has a client-generated id,
+    survey_id, visit_type and optional shop_id, geocode, started_at,
+    completed_at and answers. Replaying a batch is safe: every visit gets
+    its own status ('created', 'exists' or 'invalid') in the response.
+    """
+    # Get tenant ID from JWT
+    tenant_id = get_tenant_id_from_jwt()
+    
+    # Get user ID from JWT
+    user_id = get_jwt_identity()
+    
+    # Get request data
+    data = request.get_json() or {}
+    
+    # Validate request data
+    visits = data.get('visits')
+    if not isinstance(visits, list):
+        return jsonify({'error': 'Visits must be a list'}), 400
+    max_batch = current_app.config.get('VISIT_SYNC_MAX_BATCH', 500)
+    if len(visits) > max_batch:
+        return jsonify({'error': f'At most {max_batch} visits can be synced per request'}), 400
+    
+    # Sync visits
+    results = sync_visits(current_app.db_session, tenant_id, user_id, visits)
+    
+    # Return per-visit results
+    statuses = [result['status'] for result in results]
+    return jsonify({
+        'results': results,
+        'created': statuses.count('created'),
+        'existing': statuses.count('exists'),
+        'invalid': statuses.count('invalid')
+    }), 200
+
+
 @jwt_required()
 @agent_required
 def complete_visit_handler(visit_id):
@@ -115,7 +203,7 @@ def complete_visit_handler(visit_id):
     user_id = get_jwt_identity()
     
     # Get visit
-    visit = get_visit_by_id(request.app.db_session, tenant_id, visit_id)
+    visit = get_visit_by_id(current_app.db_session, tenant_id, visit_id)
     if not visit:
         return jsonify({'error': 'Visit not found'}), 404
     
@@ -128,15 +216,23 @@ def complete_visit_handler(visit_id):
         return jsonify({'error': 'Visit is already completed'}), 400
     
     # Get request data
-    data = request.get_json()
+    data = request.get_json() or {}
     
-    # Complete visit
-    visit = complete_visit(
-        request.app.db_session,
-        tenant_id,
-        visit_id,
-        data.get('answers')
-    )
+    # Validate request data
+    answers = data.get('answers')
+    if answers is not None and not isinstance(answers, list):
+        return jsonify({'error': 'Answers must be a list'}), 400
+    
+    # Complete the visit loaded above
+    try:
+        visit = complete_visit(
+            current_app.db_session,
+            tenant_id,
+            visit,
+            answers
+        )
+    except AnswerValidationError as e:
+        return jsonify({'error': str(e), 'answer_errors': e.errors}), 400
     
     # Return visit
     return jsonify(visit.to_dict()), 200
@@ -152,15 +248,15 @@ def get_visit_answers_handler(visit_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get visit
-    visit = get_visit_by_id(request.app.db_session, tenant_id, visit_id)
+    visit = get_visit_by_id(current_app.db_session, tenant_id, visit_id)
     if not visit:
         return jsonify({'error': 'Visit not found'}), 404
     
     # Get answers
-    answers = get_visit_answers(request.app.db_session, tenant_id, visit_id)
+    answers = get_visit_answers(current_app.db_session, tenant_id, visit_id)
     
     # Return answers
-    return jsonify([answer.to_dict() for answer in answers]), 200
+    return stream_query(answers)
 
 
 @jwt_required()
@@ -173,12 +269,12 @@ def get_visit_photos_handler(visit_id):
     tenant_id = get_tenant_id_from_jwt()
     
     # Get visit
-    visit = get_visit_by_id(request.app.db_session, tenant_id, visit_id)
+    visit = get_visit_by_id(current_app.db_session, tenant_id, visit_id)
     if not visit:
         return jsonify({'error': 'Visit not found'}), 404
     
     # Get photos
-    photos = get_visit_photos(request.app.db_session, tenant_id, visit_id)
+    photos = get_visit_photos(current_app.db_session, tenant_id, visit_id)
     
     # Return photos
-    return jsonify([photo.to_dict() for photo in photos]), 200
\ No newline at end of file
+    return stream_query(photos)
\ No newline at end of file
@@ -2,33 +2,29 @@
 import os
 import uuid
 import click
+from flask import current_app
 from flask.cli import FlaskGroup
 
 from app import create_app
 from models import Base
-from models.role import Role
+from models.role import ROLE_NAMES, Role
 from models.tenant import Tenant
 from models.user import User
 from models.brand import Brand
 from models.survey import Survey
-from models.question import Question
+from models.survey import SurveyQuestion as Question
 from services.auth_service import create_tenant, create_user
 
 
-app = create_app()
-cli = FlaskGroup(create_app=lambda: app)
+# The app is created when a command runs, not when this module is imported
+cli = FlaskGroup(create_app=create_app)
 
 
 @cli.command('init-db')
 def init_db():
     """Initialize the database."""
-    from sqlalchemy import create_engine
-    
-    # Create engine
-    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
-    
-    # Create tables
-    Base.metadata.create_all(engine)
+    # Create tables with the app's shared engine
+    Base.metadata.create_all(current_app.db_engine)
     
     click.echo('Initialized the database.')
 
@@ -46,11 +42,10 @@ def seed_db():
 def seed_roles():
     """Seed roles."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Seed roles
-    roles = ['agent', 'team_leader', 'area_manager', 'regional_manager', 'national_manager', 'admin', 'super_admin']
-    for role_name in roles:
+    for role_name in ROLE_NAMES:
         role = session.query(Role).filter_by(name=role_name).first()
         if not role:
             role = Role(name=role_name)
@@ -60,6 +55,65 @@ def seed_roles():
     click.echo('Seeded roles.')
 
 
+@cli.command('rebuild-visit-rollup')
+@click.option('--tenant-id', default=None, help='Tenant ID (optional, defaults to all tenants)')
+def rebuild_visit_rollup_command(tenant_id):
+    """Backfill or rebuild the daily visit rollup table."""
+    from services.visit_rollup_service import rebuild_visit_rollup
+    
+    # Get session
+    session = current_app.db_session
+    
+    # Rebuild rollup
+    written = rebuild_visit_rollup(session, tenant_id)
+    
+    click.echo(f'Rebuilt visit rollup: {written} daily buckets written.')
+
+
+@cli.command('benchmark-serializers')
+@click.option('--rows', default=50000, help='Number of visits to serialize')
+def benchmark_serializers_command(rows):
+    """Compare to_dict() with the compiled row serializer on an in-memory database."""
+    import time
+    from datetime import datetime
+    from flask import json
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models.visit import Visit
+    from utils.serializers import get_encoder, get_serializer
+    
+    # Seed a throwaway database
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    tenant_id, now = uuid.uuid4(), datetime.utcnow()
+    session.execute(Visit.__table__.insert(), [
+        {'id': uuid.uuid4(), 'tenant_id': tenant_id, 'survey_id': uuid.uuid4(), 'user_id': uuid.uuid4(),
+         'visit_type': 'shop', 'shop_id': uuid.uuid4() if index % 2 else None, 'started_at': now,
+         'completed_at': now if index % 3 else None, 'created_at': now}
+        for index in range(rows)
+    ])
+    session.commit()
+    query = session.query(Visit).filter(Visit.tenant_id == tenant_id).order_by(Visit.id)
+    
+    with current_app.app_context():
+        # ORM instances, to_dict() and the Flask encoder
+        start = time.perf_counter()
+        orm_body = ','.join(json.dumps(visit.to_dict()) for visit in query.all())
+        orm_elapsed = time.perf_counter() - start
+        session.expunge_all()
+        
+        # Column tuples, compiled serializer and the fast encoder
+        serializer, encode = get_serializer(Visit), get_encoder()
+        start = time.perf_counter()
+        row_body = ','.join(encode(serializer.from_row(row)) for row in serializer.rows(query))
+        row_elapsed = time.perf_counter() - start
+    
+    click.echo(f'to_dict:             {orm_elapsed:.3f}s ({rows / orm_elapsed:,.0f} rows/s)')
+    click.echo(f'compiled serializer: {row_elapsed:.3f}s ({rows / row_elapsed:,.0f} rows/s)')
+    click.echo(f'speedup: {orm_elapsed / row_elapsed:.1f}x, identical output: {orm_body == row_body}')
+
+
 @cli.command('create-superadmin')
 @click.option('--email', prompt=True, help='Superadmin email')
 @click.option('--password', prompt=True, hide_input=True, confirmation_prompt=True, help='Superadmin password')
@@ -68,7 +122,7 @@ def seed_roles():
 def create_superadmin(email, password, first_name, last_name):
     """Create a superadmin user."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Create tenant
     tenant = create_tenant(session, 'System', 'system')
@@ -98,7 +152,7 @@ def create_superadmin(email, password, first_name, last_name):
 def create_tenant_admin(tenant_name, subdomain, email, password, first_name, last_name):
     """Create a tenant and admin user."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Create tenant
     tenant = create_tenant(session, tenant_name, subdomain)
@@ -128,7 +182,7 @@ def create_tenant_admin(tenant_name, subdomain, email, password, first_name, las
 def create_agent(tenant_id, email, password, first_name, last_name, phone):
     """Create an agent user."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Create agent
     user = create_user(
@@ -152,7 +206,7 @@ def create_agent(tenant_id, email, password, first_name, last_name, phone):
 def create_brand(tenant_id, name, slug):
     """Create a brand."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Check if brand already exists
     brand = session.query(Brand).filter_by(tenant_id=tenant_id, name=name).first()
@@ -182,7 +236,7 @@ def create_brand(tenant_id, name, slug):
 def create_survey(tenant_id, name, type, brand_id, created_by):
     """Create a survey."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Check if survey already exists
     survey = session.query(Survey).filter_by(tenant_id=tenant_id, name=name).first()
@@ -214,7 +268,7 @@ def create_survey(tenant_id, name, type, brand_id, created_by):
 def add_question(tenant_id, survey_id, question_text, input_type, order_num):
     """Add a question to a survey."""
     # Get session
-    session = app.db_session
+    session = current_app.db_session
     
     # Create question
     question = Question(
@@ -230,5 +284,266 @@ def add_question(tenant_id, survey_id, question_text, input_type, order_num):
     click.echo(f'Added question to survey with ID: {question.id}')
 
 
+@cli.command('benchmark-login')
+@click.option('--logins', default=200, help='Number of password verifications')
+@click.option('--concurrency', default=16, help='Concurrent login requests')
+@click.option('--rounds', default=None, type=int, help='bcrypt cost factor (defaults to BCRYPT_ROUNDS)')
+def benchmark_login_command(logins, concurrency, rounds):
+    """Measure password verification throughput inline and through the hashing pool."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.passwords import PasswordHasher, PasswordHasherBusy
+    
+    rounds = rounds or current_app.config['BCRYPT_ROUNDS']
+    workers = current_app.config['PASSWORD_HASH_WORKERS'] or os.cpu_count()
+    password_hash = PasswordHasher(rounds=rounds).hash('Password123')
+    
+    def run(hasher):
+        latencies, rejected = [], 0
+        
+        def login(_):
+            start = time.perf_counter()
+            try:
+                hasher.verify('Password123', password_hash)
+            except PasswordHasherBusy:
+                return None
+            return time.perf_counter() - start
+        
+        # Warm up the pool processes
+        hasher.verify('Password123', password_hash)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            for latency in executor.map(login, range(logins)):
+                if latency is None:
+                    rejected += 1
+                else:
+                    latencies.append(latency)
+        elapsed = time.perf_counter() - start
+        hasher.shutdown()
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        return len(latencies) / elapsed, p95, rejected
+    
+    for label, hasher in [
+        ('inline', PasswordHasher(rounds=rounds)),
+        (f'pool ({workers} workers)', PasswordHasher(rounds=rounds, workers=workers, max_queue=current_app.config['PASSWORD_HASH_MAX_QUEUE']))
+    ]:
+        throughput, p95, rejected = run(hasher)
+        click.echo(f'{label:<22} {throughput:8.1f} logins/s  p95 {p95 * 1000:7.1f}ms  rejected {rejected}')
+
+
+@cli.command('benchmark-auth')
+@click.option('--requests', 'count', default=2000, help='Number of requests per decorator chain')
+def benchmark_auth_command(count):
+    """Compare JWT decodes and throughput of the previous and the shared auth context decorator chains."""
+    import time
+    from unittest import mock
+    import flask_jwt_extended.view_decorators as view_decorators
+    from flask_jwt_extended import create_access_token, get_jwt, verify_jwt_in_request
+    from flask_jwt_extended import jwt_required as library_jwt_required
+    from models.role import ROLE_BITS
+    from utils.auth_context import ROLE_MASK_CLAIM
+    from utils.auth_decorators import admin_required, jwt_required, tenant_required
+    
+    bench_app = create_app()
+    
+    def previous_check(fn):
+        # Previous tenant_required and role_required: verify and decode again
+        def wrapper(*args, **kwargs):
+            for _ in range(2):
+                verify_jwt_in_request()
+                get_jwt()
+            return fn(*args, **kwargs)
+        return wrapper
+    
+    bench_app.add_url_rule('/_bench/previous', 'bench_previous', library_jwt_required()(previous_check(lambda: '')))
+    bench_app.add_url_rule('/_bench/shared', 'bench_shared', jwt_required()(tenant_required(admin_required(lambda: ''))))
+    
+    with bench_app.app_context():
+        token = create_access_token(identity=str(uuid.uuid4()), additional_claims={'tenant_id': str(uuid.uuid4()), ROLE_MASK_CLAIM: ROLE_BITS['admin']})
+    headers = {'Authorization': f'Bearer {token}'}
+    client = bench_app.test_client()
+    
+    decodes = []
+    decode_token = view_decorators.decode_token
+    
+    def counting_decode_token(*args, **kwargs):
+        decodes.append(1)
+        return decode_token(*args, **kwargs)
+    
+    with mock.patch.object(view_decorators, 'decode_token', counting_decode_token):
+        # Both chains run behind the tenant middleware, which decodes once
+        for label, path in [('previous', '/_bench/previous'), ('shared context', '/_bench/shared')]:
+            decodes.clear()
+            start = time.perf_counter()
+            for _ in range(count):
+                client.get(path, headers=headers)
+            elapsed = time.perf_counter() - start
+            click.echo(f'{label:<16} {len(decodes) / count:.1f} decodes/request  {count / elapsed:8.0f} requests/s')
+
+
+@cli.command('benchmark-blocklist')
+@click.option('--checks', default=100000, help='Number of revocation checks')
+@click.option('--revoked', default=10000, help='Number of revoked tokens')
+def benchmark_blocklist_command(checks, revoked):
+    """Measure the per-request cost of the token revocation check."""
+    import time
+    from utils.token_blocklist import MemoryBlocklistBackend, TokenBlocklist
+    
+    class CountingBackend(MemoryBlocklistBackend):
+        """Memory backend that counts lookups, which would be Redis round trips."""
+        lookups = 0
+        
+        def contains(self, jti):
+            CountingBackend.lookups += 1
+            return super().contains(jti)
+    
+    blocklist = TokenBlocklist(CountingBackend(), sync_interval=60)
+    expires_at = time.time() + 3600
+    for _ in range(revoked):
+        blocklist.revoke(str(uuid.uuid4()), expires_at)
+    jtis = [str(uuid.uuid4()) for _ in range(checks)]
+    
+    start = time.perf_counter()
+    for jti in jtis:
+        blocklist.is_revoked(jti)
+    elapsed = time.perf_counter() - start
+    
+    click.echo(f'{checks} checks against {revoked} revoked tokens: {elapsed / checks * 1e6:.2f}us per check')
+    click.echo(f'store lookups: {CountingBackend.lookups} ({CountingBackend.lookups / checks:.3%} bloom false positives)')
+
+
+@cli.command('export-openapi')
+@click.option('--output', default='static/openapi.json', help='Path of the JSON file to write')
+@click.option('--gzip/--no-gzip', 'write_gzip', default=True, help='Also write a precompressed .gz copy')
+def export_openapi_command(output, write_gzip):
+    """Write the OpenAPI spec to a static file for the web server to serve."""
+    from utils.api_docs import get_spec_document
+    
+    document = get_spec_document(current_app._get_current_object())
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'wb') as f:
+        f.write(document.body)
+    click.echo(f'Wrote {output} ({len(document.body)} bytes, ETag "{document.etag}")')
+    
+    # For nginx gzip_static
+    if write_gzip:
+        with open(f'{output}.gz', 'wb') as f:
+            f.write(document.gzipped)
+        click.echo(f'Wrote {output}.gz ({len(document.gzipped)} bytes)')
+
+
+@cli.command('benchmark-sync')
+@click.option('--visits', 'count', default=500, help='Number of offline visits to sync')
+@click.option('--answers', default=10, help='Answers per visit')
+def benchmark_sync_command(count, answers):
+    """Compare replaying offline visits one by one with the batch sync on an in-memory database."""
+    import time
+    from datetime import datetime
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from services.visit_service import complete_visit, create_visit, sync_visits
+    
+    def seed():
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        survey = Survey(tenant_id=tenant_id, name='Benchmark', type='shop')
+        session.add(survey)
+        session.flush()
+        questions = [Question(tenant_id=tenant_id, survey_id=survey.id, question_text=f'Q{index}', input_type='text')
+                     for index in range(answers)]
+        session.add_all(questions)
+        session.commit()
+        return session, survey.id, [question.id for question in questions]
+    
+    tenant_id, user_id = uuid.uuid4(), uuid.uuid4()
+    
+    # One create and one complete request per visit
+    session, survey_id, question_ids = seed()
+    payload = [{'question_id': question_id, 'answer_text': 'yes'} for question_id in question_ids]
+    start = time.perf_counter()
+    for _ in range(count):
+        visit = create_visit(session, tenant_id, user_id, survey_id, 'shop')
+        complete_visit(session, tenant_id, visit, payload)
+    replay_elapsed = time.perf_counter() - start
+    
+    # One sync request for the whole batch
+    session, survey_id, question_ids = seed()
+    now = datetime.utcnow().isoformat()
+    visits = [
+        {'id': str(uuid.uuid4()), 'survey_id': str(survey_id), 'visit_type': 'shop', 'started_at': now, 'completed_at': now,
+         'answers': [{'question_id': str(question_id), 'answer_text': 'yes'} for question_id in question_ids]}
+        for _ in range(count)
+    ]
+    start = time.perf_counter()
+    results = sync_visits(session, tenant_id, user_id, visits)
+    sync_elapsed = time.perf_counter() - start
+    
+    created = sum(1 for result in results if result['status'] == 'created')
+    click.echo(f'one by one: {replay_elapsed:.3f}s for {count} visits with {answers} answers each')
+    click.echo(f'batch sync: {sync_elapsed:.3f}s ({created} created), speedup {replay_elapsed / sync_elapsed:.1f}x')
+
+
+@cli.command('cleanup-photo-blobs')
+@click.option('--tenant-id', default=None, help='Tenant ID (optional, defaults to all tenants)')
+@click.option('--dry-run', is_flag=True, help='List unreferenced files without deleting them')
+def cleanup_photo_blobs_command(tenant_id, dry_run):
+    """Delete stored photo files that no photo references."""
+    from services.photo_service import cleanup_photo_blobs
+    
+    # Get session
+    session = current_app.db_session
+    
+    # Delete unreferenced blobs
+    keys = cleanup_photo_blobs(session, tenant_id, dry_run=dry_run)
+    
+    for key in keys:
+        click.echo(key)
+    click.echo(f"{'Found' if dry_run else 'Deleted'} {len(keys)} unreferenced photo files.")
+
+
+@cli.command('fail-stale-photo-blobs')
+@click.option('--tenant-id', default=None, help='Tenant ID (optional, defaults to all tenants; spool files are only swept for all tenants)')
+@click.option('--dry-run', is_flag=True, help='Count stale uploads without changing them')
+def fail_stale_photo_blobs_command(tenant_id, dry_run):
+    """Mark photo uploads pending longer than PHOTO_BLOB_CLAIM_TIMEOUT as failed and delete their spool files."""
+    from services.photo_service import DEFAULT_BLOB_CLAIM_TIMEOUT, fail_stale_photo_blobs
+    from utils.photo_uploads import sweep_spool_folder
+    
+    # Get session
+    session = current_app.db_session
+    
+    # Fail stale blobs
+    count = fail_stale_photo_blobs(session, tenant_id, dry_run=dry_run)
+    
+    click.echo(f"{'Found' if dry_run else 'Failed'} {count} stale photo uploads.")
+    
+    # Spool files are shared by all tenants
+    if tenant_id:
+        return
+    timeout = current_app.config.get('PHOTO_BLOB_CLAIM_TIMEOUT', DEFAULT_BLOB_CLAIM_TIMEOUT)
+    paths = sweep_spool_folder(current_app.config, timeout, dry_run=dry_run)
+    
+    click.echo(f"{'Found' if dry_run else 'Deleted'} {len(paths)} stale spool files.")
+
+
+@cli.command('recompute-shelf-areas')
+@click.option('--tenant-id', default=None, help='Tenant ID (optional, defaults to all tenants)')
+def recompute_shelf_areas_command(tenant_id):
+    """Recalculate shelf quadrant area percentages from their coordinates."""
+    from services.photo_service import recompute_shelf_areas
+    
+    # Get session
+    session = current_app.db_session
+    
+    # Recompute areas
+    updated, skipped = recompute_shelf_areas(session, tenant_id)
+    
+    click.echo(f'Recomputed {updated} shelf quadrants, skipped {skipped}.')
+
+
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
@@ -11,6 +11,7 @@ from models import Base
 # Custom JSONB type that works with both PostgreSQL and SQLite
 class JSONB(TypeDecorator):
     impl = Text
+    cache_ok = True
     
     def process_bind_param(self, value, dialect):
         if value is None:
@@ -25,6 +26,7 @@ class JSONB(TypeDecorator):
 # Custom Geography type that works with both PostgreSQL and SQLite
 class Geography(TypeDecorator):
     impl = Text
+    cache_ok = True
     
     def __init__(self, geometry_type='POINT', srid=4326, **kwargs):
         self.geometry_type = geometry_type
@@ -44,6 +46,7 @@ class Geography(TypeDecorator):
 # Custom UUID type that works with both PostgreSQL and SQLite
 class UUID(TypeDecorator):
     impl = String
+    cache_ok = True
     
     def __init__(self, as_uuid=False):
         self.as_uuid = as_uuid
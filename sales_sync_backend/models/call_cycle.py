@@ -36,9 +36,9 @@ class CallCycleLocation(BaseModel):
     """Call cycle location model."""
     __tablename__ = 'call_cycle_locations'
     
-    call_cycle_id = Column(UUID(as_uuid=True), ForeignKey('call_cycles.id', ondelete='CASCADE'), nullable=False)
+    call_cycle_id = Column(UUID(as_uuid=True), ForeignKey('call_cycles.id', ondelete='CASCADE'), nullable=False, index=True)
     location = Column(Geography('POINT', srid=4326), nullable=True)
-    shop_id = Column(UUID(as_uuid=True), nullable=True)  # Optional reference to shop
+    shop_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # Optional reference to shop
     order_num = Column(Integer, default=0)
     
     # Relationships
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, Numeric
+from sqlalchemy import Column, String, ForeignKey, Numeric, BigInteger, DateTime, Index, UniqueConstraint
 from models.base import UUID, JSONB
 from sqlalchemy.orm import relationship
 
@@ -13,11 +13,18 @@ class Photo(BaseModel, TenantScopedMixin):
     file_url = Column(String, nullable=False)
     purpose = Column(String, nullable=True)  # 'id', 'shelf', 'outside', 'board'
     image_metadata = Column(JSONB, nullable=True)  # width/height/orientation etc
+    status = Column(String, nullable=False, default='ready', server_default='ready')  # 'pending', 'ready', 'failed'
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the file, see PhotoBlob
+    variants = Column(JSONB, nullable=True)  # resized copies, variant name -> URL
     
     # Relationships
     visit = relationship('Visit', back_populates='photos')
     shelf_quadrants = relationship('ShelfQuadrant', back_populates='photo', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        Index('ix_photos_tenant_content_hash', 'tenant_id', 'content_hash'),
+    )
+    
     def to_dict(self, include_quadrants=False):
         """Convert model to dictionary."""
         result = {
@@ -27,6 +34,9 @@ class Photo(BaseModel, TenantScopedMixin):
             'file_url': self.file_url,
             'purpose': self.purpose,
             'metadata': self.image_metadata,
+            'status': self.status,
+            'content_hash': self.content_hash,
+            'variants': self.variants,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
         
@@ -36,6 +46,24 @@ class Photo(BaseModel, TenantScopedMixin):
         return result
 
 
+class PhotoBlob(BaseModel, TenantScopedMixin):
+    """Stored photo file, shared by every photo of the tenant with the same content."""
+    __tablename__ = 'photo_blobs'
+    
+    content_hash = Column(String(64), nullable=False)  # SHA-256 hex digest
+    storage_key = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=True)
+    status = Column(String, nullable=False, default='pending')  # 'pending', 'ready', 'failed'
+    claimed_at = Column(DateTime, nullable=True)  # when the storing upload claimed it, refreshed when its job starts
+    image_metadata = Column(JSONB, nullable=True)  # width/height/orientation, copied to photos
+    variants = Column(JSONB, nullable=True)  # resized copies, variant name -> storage key
+    
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'content_hash', name='uq_photo_blobs_tenant_hash'),
+    )
+
+
 class ShelfQuadrant(BaseModel, TenantScopedMixin):
     """Shelf quadrant model."""
     __tablename__ = 'shelf_quadrants'
@@ -3,6 +3,51 @@ from sqlalchemy.orm import relationship
 
 from models.base import BaseModel, UUID
 
+# Seeded roles from lowest to highest rank; a role's bit is 1 << rank
+ROLE_NAMES = (
+    'agent',
+    'team_leader',
+    'area_manager',
+    'regional_manager',
+    'national_manager',
+    'admin',
+    'super_admin'
+)
+ROLE_RANKS = {name: rank for rank, name in enumerate(ROLE_NAMES)}
+ROLE_BITS = {name: 1 << rank for rank, name in enumerate(ROLE_NAMES)}
+
+# Mask of every role at or above each role
+ROLE_MASKS_AT_LEAST = {name: sum(ROLE_BITS[other] for other in ROLE_NAMES[rank:]) for rank, name in enumerate(ROLE_NAMES)}
+
+
+def roles_to_mask(names):
+    """
+    Convert role names to a role bitmask, ignoring unknown names.
+    
+    Args:
+        names: Iterable of role names
+    
+    Returns:
+        int: Role bitmask
+    """
+    mask = 0
+    for name in names or ():
+        mask |= ROLE_BITS.get(name, 0)
+    return mask
+
+
+def mask_to_roles(mask):
+    """
+    Convert a role bitmask to role names, lowest rank first.
+    
+    Args:
+        mask: Role bitmask
+    
+    Returns:
+        list: Role names
+    """
+    return [name for name in ROLE_NAMES if mask & ROLE_BITS[name]]
+
 
 class Role(BaseModel):
     """Role model."""
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel, TenantScopedMixin, UUID, JSONB, Geography
@@ -20,6 +20,11 @@ class Visit(BaseModel, TenantScopedMixin):
     answers = relationship('VisitAnswer', back_populates='visit', cascade='all, delete-orphan')
     photos = relationship('Photo', back_populates='visit', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        Index('ix_visits_tenant_started_at_id', 'tenant_id', 'started_at', 'id'),
+        Index('ix_visits_tenant_shop_started_at', 'tenant_id', 'shop_id', 'started_at'),
+    )
+    
     def to_dict(self, include_answers=False, include_photos=False):
         """Convert model to dictionary."""
         result = {
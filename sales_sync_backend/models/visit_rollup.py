@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Date, Integer, UniqueConstraint
+
+from models.base import BaseModel, TenantScopedMixin, UUID, TimestampMixin
+
+
+class VisitDailyRollup(BaseModel, TenantScopedMixin, TimestampMixin):
+    """Pre-aggregated visit counts per tenant, user, survey and day."""
+    __tablename__ = 'visit_daily_rollup'
+
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    survey_id = Column(UUID(as_uuid=True), nullable=False)
+    day = Column(Date, nullable=False)
+    total_visits = Column(Integer, nullable=False, default=0)
+    completed_visits = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('tenant_id', 'user_id', 'survey_id', 'day', name='uq_visit_daily_rollup_key'),
+    )
+
+    def to_dict(self):
+        """Convert model to dictionary."""
+        return {
+            'id': str(self.id),
+            'tenant_id': str(self.tenant_id),
+            'user_id': str(self.user_id),
+            'survey_id': str(self.survey_id),
+            'day': self.day.isoformat() if self.day else None,
+            'total_visits': self.total_visits,
+            'completed_visits': self.completed_visits,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
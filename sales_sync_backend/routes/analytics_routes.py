@@ -1,17 +1,15 @@
 from flask import Blueprint
 
-from controllers.analytics_controller import (
-    get_overview_handler,
-    get_visits_handler,
-    get_shelf_share_handler,
-    get_call_cycle_coverage_handler
-)
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.analytics_controller'
 
 # Create blueprint
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
 
 # Register routes
-analytics_bp.route('/overview', methods=['GET'])(get_overview_handler)
-analytics_bp.route('/visits', methods=['GET'])(get_visits_handler)
-analytics_bp.route('/shelf_share', methods=['GET'])(get_shelf_share_handler)
-analytics_bp.route('/call_cycle_coverage', methods=['GET'])(get_call_cycle_coverage_handler)
\ No newline at end of file
+analytics_bp.route('/overview', methods=['GET'])(LazyView(CONTROLLER, 'get_overview_handler'))
+analytics_bp.route('/visits', methods=['GET'])(LazyView(CONTROLLER, 'get_visits_handler'))
+analytics_bp.route('/shelf_share', methods=['GET'])(LazyView(CONTROLLER, 'get_shelf_share_handler'))
+analytics_bp.route('/call_cycle_coverage', methods=['GET'])(LazyView(CONTROLLER, 'get_call_cycle_coverage_handler'))
\ No newline at end of file
@@ -1,23 +1,18 @@
 from flask import Blueprint
 
-from controllers.brands_controller import (
-    get_brands_handler,
-    create_brand_handler,
-    get_brand_handler,
-    update_brand_handler,
-    delete_brand_handler,
-    get_brand_infographics_handler,
-    create_brand_infographic_handler
-)
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.brands_controller'
 
 # Create blueprint
 brands_bp = Blueprint('brands', __name__, url_prefix='/api/brands')
 
 # Register routes
-brands_bp.route('', methods=['GET'])(get_brands_handler)
-brands_bp.route('', methods=['POST'])(create_brand_handler)
-brands_bp.route('/<uuid:brand_id>', methods=['GET'])(get_brand_handler)
-brands_bp.route('/<uuid:brand_id>', methods=['PUT'])(update_brand_handler)
-brands_bp.route('/<uuid:brand_id>', methods=['DELETE'])(delete_brand_handler)
-brands_bp.route('/<uuid:brand_id>/infographics', methods=['GET'])(get_brand_infographics_handler)
-brands_bp.route('/<uuid:brand_id>/infographics', methods=['POST'])(create_brand_infographic_handler)
\ No newline at end of file
+brands_bp.route('', methods=['GET'])(LazyView(CONTROLLER, 'get_brands_handler'))
+brands_bp.route('', methods=['POST'])(LazyView(CONTROLLER, 'create_brand_handler'))
+brands_bp.route('/<uuid:brand_id>', methods=['GET'])(LazyView(CONTROLLER, 'get_brand_handler'))
+brands_bp.route('/<uuid:brand_id>', methods=['PUT'])(LazyView(CONTROLLER, 'update_brand_handler'))
+brands_bp.route('/<uuid:brand_id>', methods=['DELETE'])(LazyView(CONTROLLER, 'delete_brand_handler'))
+brands_bp.route('/<uuid:brand_id>/infographics', methods=['GET'])(LazyView(CONTROLLER, 'get_brand_infographics_handler'))
+brands_bp.route('/<uuid:brand_id>/infographics', methods=['POST'])(LazyView(CONTROLLER, 'create_brand_infographic_handler'))
\ No newline at end of file
@@ -1,29 +1,21 @@
 from flask import Blueprint
 
-from controllers.goals_controller import (
-    get_goals_handler,
-    get_goal_handler,
-    create_goal_handler,
-    update_goal_handler,
-    delete_goal_handler,
-    get_goal_assignments_handler,
-    assign_goal_handler,
-    unassign_goal_handler,
-    update_goal_progress_handler,
-    get_goal_progress_handler
-)
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.goals_controller'
 
 # Create blueprint
 goals_bp = Blueprint('goals', __name__, url_prefix='/api/goals')
 
 # Register routes
-goals_bp.route('', methods=['GET'])(get_goals_handler)
-goals_bp.route('', methods=['POST'])(create_goal_handler)
-goals_bp.route('/<uuid:goal_id>', methods=['GET'])(get_goal_handler)
-goals_bp.route('/<uuid:goal_id>', methods=['PUT'])(update_goal_handler)
-goals_bp.route('/<uuid:goal_id>', methods=['DELETE'])(delete_goal_handler)
-goals_bp.route('/<uuid:goal_id>/assignments', methods=['GET'])(get_goal_assignments_handler)
-goals_bp.route('/<uuid:goal_id>/assign', methods=['POST'])(assign_goal_handler)
-goals_bp.route('/<uuid:goal_id>/unassign/<string:assignee_type>/<uuid:assignee_id>', methods=['DELETE'])(unassign_goal_handler)
-goals_bp.route('/<uuid:goal_id>/progress/<string:assignee_type>/<uuid:assignee_id>', methods=['PUT'])(update_goal_progress_handler)
-goals_bp.route('/<uuid:goal_id>/progress', methods=['GET'])(get_goal_progress_handler)
\ No newline at end of file
+goals_bp.route('', methods=['GET'])(LazyView(CONTROLLER, 'get_goals_handler'))
+goals_bp.route('', methods=['POST'])(LazyView(CONTROLLER, 'create_goal_handler'))
+goals_bp.route('/<uuid:goal_id>', methods=['GET'])(LazyView(CONTROLLER, 'get_goal_handler'))
+goals_bp.route('/<uuid:goal_id>', methods=['PUT'])(LazyView(CONTROLLER, 'update_goal_handler'))
+goals_bp.route('/<uuid:goal_id>', methods=['DELETE'])(LazyView(CONTROLLER, 'delete_goal_handler'))
+goals_bp.route('/<uuid:goal_id>/assignments', methods=['GET'])(LazyView(CONTROLLER, 'get_goal_assignments_handler'))
+goals_bp.route('/<uuid:goal_id>/assign', methods=['POST'])(LazyView(CONTROLLER, 'assign_goal_handler'))
+goals_bp.route('/<uuid:goal_id>/unassign/<string:assignee_type>/<uuid:assignee_id>', methods=['DELETE'])(LazyView(CONTROLLER, 'unassign_goal_handler'))
+goals_bp.route('/<uuid:goal_id>/progress/<string:assignee_type>/<uuid:assignee_id>', methods=['PUT'])(LazyView(CONTROLLER, 'update_goal_progress_handler'))
+goals_bp.route('/<uuid:goal_id>/progress', methods=['GET'])(LazyView(CONTROLLER, 'get_goal_progress_handler'))
\ No newline at end of file
@@ -1,9 +1,12 @@
 from flask import Blueprint
 
-from controllers.roles_controller import get_roles_handler
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.roles_controller'
 
 # Create blueprint
 roles_bp = Blueprint('roles', __name__, url_prefix='/api/roles')
 
 # Register routes
-roles_bp.route('', methods=['GET'])(get_roles_handler)
\ No newline at end of file
+roles_bp.route('', methods=['GET'])(LazyView(CONTROLLER, 'get_roles_handler'))
\ No newline at end of file
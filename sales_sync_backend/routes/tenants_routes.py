@@ -1,17 +1,15 @@
 from flask import Blueprint
 
-from controllers.tenants_controller import (
-    get_tenants_handler,
-    create_tenant_handler,
-    get_tenant_handler,
-    update_tenant_handler
-)
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.tenants_controller'
 
 # Create blueprint
 tenants_bp = Blueprint('tenants', __name__, url_prefix='/api/tenants')
 
 # Register routes
-tenants_bp.route('', methods=['GET'])(get_tenants_handler)
-tenants_bp.route('', methods=['POST'])(create_tenant_handler)
-tenants_bp.route('/<uuid:tenant_id>', methods=['GET'])(get_tenant_handler)
-tenants_bp.route('/<uuid:tenant_id>', methods=['PUT'])(update_tenant_handler)
\ No newline at end of file
+tenants_bp.route('', methods=['GET'])(LazyView(CONTROLLER, 'get_tenants_handler'))
+tenants_bp.route('', methods=['POST'])(LazyView(CONTROLLER, 'create_tenant_handler'))
+tenants_bp.route('/<uuid:tenant_id>', methods=['GET'])(LazyView(CONTROLLER, 'get_tenant_handler'))
+tenants_bp.route('/<uuid:tenant_id>', methods=['PUT'])(LazyView(CONTROLLER, 'update_tenant_handler'))
\ No newline at end of file
@@ -1,21 +1,18 @@
 from flask import Blueprint
 
-from controllers.visits_controller import (
-    get_visits_handler,
-    get_visit_handler,
-    create_visit_handler,
-    complete_visit_handler,
-    get_visit_answers_handler,
-    get_visit_photos_handler
-)
+from utils.lazy_views import LazyView
+
+# Handlers are imported on the first request they serve
+CONTROLLER = 'controllers.visits_controller'
 
 # Create blueprint
 visits_bp = Blueprint('visits', __name__, url_prefix='/api/visits')
 
 # Register routes
-visits_bp.route('', methods=['GET'])(get_visits_handler)
-visits_bp.route('', methods=['POST'])(create_visit_handler)
-visits_bp.route('/<uuid:visit_id>', methods=['GET'])(get_visit_handler)
-visits_bp.route('/<uuid:visit_id>/complete', methods=['PUT'])(complete_visit_handler)
-visits_bp.route('/<uuid:visit_id>/answers', methods=['GET'])(get_visit_answers_handler)
-visits_bp.route('/<uuid:visit_id>/photos', methods=['GET'])(get_visit_photos_handler)
\ No newline at end of file
+visits_bp.route('', methods=['GET'])(LazyView(CONTROLLER, 'get_visits_handler'))
+visits_bp.route('', methods=['POST'])(LazyView(CONTROLLER, 'create_visit_handler'))
+visits_bp.route('/sync', methods=['POST'])(LazyView(CONTROLLER, 'sync_visits_handler'))
+visits_bp.route('/<uuid:visit_id>', methods=['GET'])(LazyView(CONTROLLER, 'get_visit_handler'))
+visits_bp.route('/<uuid:visit_id>/complete', methods=['PUT'])(LazyView(CONTROLLER, 'complete_visit_handler'))
+visits_bp.route('/<uuid:visit_id>/answers', methods=['GET'])(LazyView(CONTROLLER, 'get_visit_answers_handler'))
+visits_bp.route('/<uuid:visit_id>/photos', methods=['GET'])(LazyView(CONTROLLER, 'get_visit_photos_handler'))
\ No newline at end of file
@@ -134,9 +134,9 @@ def get_survey_completion_rates(session, tenant_id, start_date=None, end_date=No
     }
 
 
-def get_audit_logs(session, tenant_id=None, user_id=None, action=None, object_type=None, object_id=None, start_date=None, end_date=None, limit=100, offset=0):
+def get_audit_logs_query(session, tenant_id=None, user_id=None, action=None, object_type=None, object_id=None, start_date=None, end_date=None):
     """
-    Get audit logs.
+    Build the query for audit logs, newest first.
     
     Args:
         session: SQLAlchemy session
@@ -147,11 +147,9 @@ def get_audit_logs(session, tenant_id=None, user_id=None, action=None, object_ty
         object_id: Object ID (optional)
         start_date: Start date (optional)
         end_date: End date (optional)
-        limit: Limit (optional)
-        offset: Offset (optional)
     
     Returns:
-        list: Audit logs
+        Query: Audit logs query
     """
     # Build base query
     query = session.query(AuditLog)
@@ -172,33 +170,38 @@ def get_audit_logs(session, tenant_id=None, user_id=None, action=None, object_ty
     if end_date:
         query = query.filter(AuditLog.created_at <= end_date)
     
-    # Apply pagination
-    query = query.order_by(AuditLog.created_at.desc()).limit(limit).offset(offset)
+    return query.order_by(AuditLog.created_at.desc())
+
+
+def get_audit_logs(session, tenant_id=None, user_id=None, action=None, object_type=None, object_id=None, start_date=None, end_date=None, limit=100, offset=0):
+    """
+    Get audit logs.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID (optional)
+        user_id: User ID (optional)
+        action: Action (optional)
+        object_type: Object type (optional)
+        object_id: Object ID (optional)
+        start_date: Start date (optional)
+        end_date: End date (optional)
+        limit: Limit (optional)
+        offset: Offset (optional)
+    
+    Returns:
+        dict: Audit logs with pagination info
+    """
+    query = get_audit_logs_query(session, tenant_id, user_id, action, object_type, object_id, start_date, end_date)
     
     # Get audit logs
-    audit_logs = query.all()
+    audit_logs = query.limit(limit).offset(offset).all()
     
     # Format logs
     formatted_logs = [log.to_dict() for log in audit_logs]
     
     # Get total count (without pagination)
-    total_count_query = session.query(func.count(AuditLog.id))
-    if tenant_id:
-        total_count_query = total_count_query.filter(AuditLog.tenant_id == tenant_id)
-    if user_id:
-        total_count_query = total_count_query.filter(AuditLog.user_id == user_id)
-    if action:
-        total_count_query = total_count_query.filter(AuditLog.action == action)
-    if object_type:
-        total_count_query = total_count_query.filter(AuditLog.object_type == object_type)
-    if object_id:
-        total_count_query = total_count_query.filter(AuditLog.object_id == object_id)
-    if start_date:
-        total_count_query = total_count_query.filter(AuditLog.created_at >= start_date)
-    if end_date:
-        total_count_query = total_count_query.filter(AuditLog.created_at <= end_date)
-    
-    total_count = total_count_query.scalar()
+    total_count = query.order_by(None).count()
     
     # Return audit logs with pagination info
     return {
@@ -209,4 +212,4 @@ def get_audit_logs(session, tenant_id=None, user_id=None, action=None, object_ty
             'offset': offset,
             'has_more': (offset + limit) < total_count
         }
-    }
\ No newline at end of file
+    }
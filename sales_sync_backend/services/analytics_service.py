@@ -1,16 +1,142 @@
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_, extract
+from sqlalchemy import func, and_, case, distinct, true
 
 from models.visit import Visit
 from models.photo import Photo, ShelfQuadrant
 from models.brand import Brand
 from models.call_cycle import CallCycle, CallCycleLocation
+from services.visit_rollup_service import get_daily_visit_counts
+
+# Dialects that run the shelf share GROUP BY aggregate in the database
+SQL_AGGREGATE_DIALECTS = ('postgresql', 'sqlite', 'mysql')
+
+
+def _visit_filters(tenant_id, user_id, start_date, end_date):
+    """
+    Build the visit filter criteria shared by the analytics queries.
+    
+    Args:
+        tenant_id: Tenant ID
+        user_id: User ID (optional)
+        start_date: Start date
+        end_date: End date
+    
+    Returns:
+        list: SQLAlchemy filter criteria
+    """
+    criteria = [
+        Visit.tenant_id == tenant_id,
+        Visit.started_at >= start_date,
+        Visit.started_at <= end_date
+    ]
+    
+    # Filter by user if provided
+    if user_id:
+        criteria.append(Visit.user_id == user_id)
+    
+    return criteria
+
+
+def _shelf_quadrants_subquery(session, tenant_id, user_id, start_date, end_date):
+    """
+    Build a subquery of shelf quadrants on shelf photos taken during matching visits.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        user_id: User ID (optional)
+        start_date: Start date
+        end_date: End date
+    
+    Returns:
+        Subquery: Columns brand_id, photo_id, area_percentage
+    """
+    return session.query(
+        ShelfQuadrant.brand_id.label('brand_id'),
+        ShelfQuadrant.photo_id.label('photo_id'),
+        ShelfQuadrant.area_percentage.label('area_percentage')
+    ).join(
+        Photo, ShelfQuadrant.photo_id == Photo.id
+    ).join(
+        Visit, Photo.visit_id == Visit.id
+    ).filter(
+        ShelfQuadrant.tenant_id == tenant_id,
+        Photo.tenant_id == tenant_id,
+        Photo.purpose == 'shelf',
+        *_visit_filters(tenant_id, user_id, start_date, end_date)
+    ).subquery('shelf_quadrants_in_range')
+
+
+def _brand_share_query(session, tenant_id, quadrants):
+    """
+    Build the per-brand shelf share aggregate.
+    
+    Every brand of the tenant is returned, with a NULL average and a zero
+    count when it has no quadrants in range.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        quadrants: Subquery from _shelf_quadrants_subquery
+    
+    Returns:
+        Query: Columns brand_id, brand_name, average_area_percentage, total_photos
+    """
+    return session.query(
+        Brand.id.label('brand_id'),
+        Brand.name.label('brand_name'),
+        func.avg(quadrants.c.area_percentage).label('average_area_percentage'),
+        func.count(quadrants.c.photo_id).label('total_photos')
+    ).outerjoin(
+        quadrants, quadrants.c.brand_id == Brand.id
+    ).filter(
+        Brand.tenant_id == tenant_id
+    ).group_by(Brand.id, Brand.name)
+
+
+def _stream_brand_share(session, tenant_id, quadrants, batch_size=1000):
+    """
+    Compute per-brand shelf share by streaming quadrant rows.
+    
+    Fallback for dialects without a usable GROUP BY aggregate. Rows are
+    fetched in batches and folded into running sums, so memory is bounded
+    by the number of brands rather than the number of quadrants.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        quadrants: Subquery from _shelf_quadrants_subquery
+        batch_size: Rows fetched per batch
+    
+    Returns:
+        list: (brand_id, brand_name, average_area_percentage, total_photos) tuples
+    """
+    sums = {}
+    counts = {}
+    rows = session.query(quadrants.c.brand_id, quadrants.c.area_percentage).yield_per(batch_size)
+    for brand_id, area_percentage in rows:
+        counts[brand_id] = counts.get(brand_id, 0) + 1
+        if area_percentage is not None:
+            sums[brand_id] = sums.get(brand_id, 0.0) + float(area_percentage)
+    
+    brands = session.query(Brand.id, Brand.name).filter(Brand.tenant_id == tenant_id).yield_per(batch_size)
+    return [
+        (brand_id, brand_name, sums[brand_id] / counts[brand_id] if brand_id in sums else None, counts.get(brand_id, 0))
+        for brand_id, brand_name in brands
+    ]
 
 
 def get_overview_metrics(session, tenant_id, user_id=None, start_date=None, end_date=None):
     """
     Get overview metrics for a tenant.
     
+    All figures come from a single aggregate statement: visit totals are a
+    one-row CTE of conditional aggregates, and shelf share is a per-brand
+    GROUP BY outer-joined onto it. No ORM objects are loaded.
+    
+    A conversion is a completed shop visit; the conversion rate is relative
+    to all shop visits in the range.
+    
     Args:
         session: SQLAlchemy session
         tenant_id: Tenant ID
@@ -27,28 +153,54 @@ def get_overview_metrics(session, tenant_id, user_id=None, start_date=None, end_
     if not end_date:
         end_date = datetime.utcnow()
     
-    # Build base query
-    visits_query = session.query(Visit).filter(
-        Visit.tenant_id == tenant_id,
-        Visit.started_at >= start_date,
-        Visit.started_at <= end_date
-    )
-    
-    # Filter by user if provided
-    if user_id:
-        visits_query = visits_query.filter(Visit.user_id == user_id)
-    
-    # Get total visits
-    total_visits = visits_query.count()
-    
-    # Get completed visits
-    completed_visits = visits_query.filter(Visit.completed_at.isnot(None)).count()
+    # Visit totals with conditional aggregates
+    is_shop = Visit.visit_type == 'shop'
+    visit_totals = session.query(
+        func.count(Visit.id).label('total_visits'),
+        func.count(Visit.completed_at).label('completed_visits'),
+        func.coalesce(func.sum(case((is_shop, 1), else_=0)), 0).label('shop_visits'),
+        func.coalesce(func.sum(case((and_(is_shop, Visit.completed_at.isnot(None)), 1), else_=0)), 0).label('conversions')
+    ).filter(
+        *_visit_filters(tenant_id, user_id, start_date, end_date)
+    ).cte('visit_totals')
+    
+    # Shelf share per brand
+    quadrants = _shelf_quadrants_subquery(session, tenant_id, user_id, start_date, end_date)
+    brand_share = _brand_share_query(session, tenant_id, quadrants).cte('brand_share')
+    
+    # One round trip: the visit totals row repeated for each brand row
+    rows = session.query(
+        visit_totals.c.total_visits,
+        visit_totals.c.completed_visits,
+        visit_totals.c.shop_visits,
+        visit_totals.c.conversions,
+        brand_share.c.brand_id,
+        brand_share.c.brand_name,
+        brand_share.c.average_area_percentage,
+        brand_share.c.total_photos
+    ).select_from(visit_totals).outerjoin(brand_share, true()).all()
+    
+    first = rows[0]
+    total_visits = int(first.total_visits or 0)
+    completed_visits = int(first.completed_visits or 0)
+    shop_visits = int(first.shop_visits or 0)
+    conversions = int(first.conversions or 0)
     
-    # Get shelf share metrics
-    shelf_share = get_shelf_share_metrics(session, tenant_id, user_id, start_date, end_date)
+    # Calculate shelf share by brand
+    shelf_share_by_brand = {}
+    for row in rows:
+        if row.brand_id is None:
+            continue
+        shelf_share_by_brand[str(row.brand_id)] = {
+            'brand_id': str(row.brand_id),
+            'brand_name': row.brand_name,
+            'average_area_percentage': float(row.average_area_percentage or 0.0),
+            'total_photos': int(row.total_photos or 0)
+        }
     
-    # Get call cycle coverage
-    call_cycle_coverage = get_call_cycle_coverage_metrics(session, tenant_id, user_id, start_date, end_date)
+    # Average shelf share across all brands
+    total_area_percentage = sum(brand_data['average_area_percentage'] for brand_data in shelf_share_by_brand.values())
+    average_shelf_share = total_area_percentage / len(shelf_share_by_brand) if shelf_share_by_brand else 0.0
     
     # Return overview metrics in the format expected by the tests
     return {
@@ -59,12 +211,12 @@ def get_overview_metrics(session, tenant_id, user_id=None, start_date=None, end_
                 'completion_rate': (completed_visits / total_visits) * 100.0 if total_visits > 0 else 0.0
             },
             'conversions': {
-                'total': 0,  # Placeholder for future implementation
-                'rate': 0.0
+                'total': conversions,
+                'rate': (conversions / shop_visits) * 100.0 if shop_visits > 0 else 0.0
             },
             'shelf_share': {
-                'average': 0.0,  # Placeholder for future implementation
-                'by_brand': {}
+                'average': average_shelf_share,
+                'by_brand': shelf_share_by_brand
             }
         }
     }
@@ -74,6 +226,10 @@ def get_visits_metrics(session, tenant_id, user_id=None, start_date=None, end_da
     """
     Get visits metrics for a tenant.
     
+    Counts are read from the visit_daily_rollup table, so the cost depends on
+    the number of days in the range rather than the number of visits. Weeks
+    and months are folded from the daily buckets.
+    
     Args:
         session: SQLAlchemy session
         tenant_id: Tenant ID
@@ -91,42 +247,21 @@ def get_visits_metrics(session, tenant_id, user_id=None, start_date=None, end_da
     if not end_date:
         end_date = datetime.utcnow()
     
-    # Build base query
-    base_query = session.query(Visit).filter(
-        Visit.tenant_id == tenant_id,
-        Visit.started_at >= start_date,
-        Visit.started_at <= end_date
-    )
+    # Invalid group_by parameter
+    if group_by not in ('day', 'week', 'month'):
+        return []
     
-    # Filter by user if provided
-    if user_id:
-        base_query = base_query.filter(Visit.user_id == user_id)
+    # Get daily buckets from the rollup
+    daily_counts = get_daily_visit_counts(session, tenant_id, start_date, end_date, user_id)
     
     # Group by period
     if group_by == 'day':
-        # Group by day
-        visits_by_day = session.query(
-            func.date(Visit.started_at).label('date'),
-            func.count(Visit.id).label('count')
-        ).filter(
-            Visit.tenant_id == tenant_id,
-            Visit.started_at >= start_date,
-            Visit.started_at <= end_date
-        )
-        
-        # Filter by user if provided
-        if user_id:
-            visits_by_day = visits_by_day.filter(Visit.user_id == user_id)
-        
-        # Group by date
-        visits_by_day = visits_by_day.group_by(func.date(Visit.started_at)).all()
-        
-        # Format results
         results = []
-        for date, count in visits_by_day:
+        for day, total, completed in daily_counts:
             results.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'count': count
+                'date': day.strftime('%Y-%m-%d'),
+                'count': total,
+                'completed': completed
             })
         
         return {
@@ -135,92 +270,48 @@ def get_visits_metrics(session, tenant_id, user_id=None, start_date=None, end_da
         }
     
     elif group_by == 'week':
-        # Group by week
-        visits_by_week = session.query(
-            extract('year', Visit.started_at).label('year'),
-            extract('week', Visit.started_at).label('week'),
-            func.count(Visit.id).label('count')
-        ).filter(
-            Visit.tenant_id == tenant_id,
-            Visit.started_at >= start_date,
-            Visit.started_at <= end_date
-        )
-        
-        # Filter by user if provided
-        if user_id:
-            visits_by_week = visits_by_week.filter(Visit.user_id == user_id)
-        
-        # Group by year and week
-        visits_by_week = visits_by_week.group_by(
-            extract('year', Visit.started_at),
-            extract('week', Visit.started_at)
-        ).all()
-        
-        # Format results
-        results = []
-        for year, week, count in visits_by_week:
-            results.append({
-                'year': int(year),
-                'week': int(week),
-                'count': count
-            })
+        buckets = {}
+        for day, total, completed in daily_counts:
+            year, week, _ = day.isocalendar()
+            bucket = buckets.setdefault((year, week), {'year': year, 'week': week, 'count': 0, 'completed': 0})
+            bucket['count'] += total
+            bucket['completed'] += completed
         
+        results = [buckets[key] for key in sorted(buckets)]
         return {
             'visits_by_week': results,
             'total_visits': sum(item['count'] for item in results)
         }
     
-    elif group_by == 'month':
-        # Group by month
-        visits_by_month = session.query(
-            extract('year', Visit.started_at).label('year'),
-            extract('month', Visit.started_at).label('month'),
-            func.count(Visit.id).label('count')
-        ).filter(
-            Visit.tenant_id == tenant_id,
-            Visit.started_at >= start_date,
-            Visit.started_at <= end_date
-        )
-        
-        # Filter by user if provided
-        if user_id:
-            visits_by_month = visits_by_month.filter(Visit.user_id == user_id)
-        
-        # Group by year and month
-        visits_by_month = visits_by_month.group_by(
-            extract('year', Visit.started_at),
-            extract('month', Visit.started_at)
-        ).all()
-        
-        # Format results
-        results = []
-        for year, month, count in visits_by_month:
-            results.append({
-                'year': int(year),
-                'month': int(month),
-                'count': count
-            })
+    else:
+        buckets = {}
+        for day, total, completed in daily_counts:
+            bucket = buckets.setdefault((day.year, day.month), {'year': day.year, 'month': day.month, 'count': 0, 'completed': 0})
+            bucket['count'] += total
+            bucket['completed'] += completed
         
+        results = [buckets[key] for key in sorted(buckets)]
         return {
             'visits_by_month': results,
             'total_visits': sum(item['count'] for item in results)
         }
-    
-    else:
-        # Invalid group_by parameter
-        return []
 
 
-def get_shelf_share_metrics(session, tenant_id, user_id=None, start_date=None, end_date=None):
+def get_shelf_share_metrics(session, tenant_id, user_id=None, start_date=None, end_date=None, strategy=None):
     """
     Get shelf share metrics for a tenant.
     
+    Per-brand averages are computed in the database with one joined
+    GROUP BY brand query. Dialects outside SQL_AGGREGATE_DIALECTS fall back
+    to streaming quadrant rows and aggregating them in a single pass.
+    
     Args:
         session: SQLAlchemy session
         tenant_id: Tenant ID
         user_id: User ID (optional)
         start_date: Start date (optional)
         end_date: End date (optional)
+        strategy: 'sql' or 'stream' (optional, chosen from the dialect by default)
     
     Returns:
         dict: Shelf share metrics
@@ -231,58 +322,46 @@ def get_shelf_share_metrics(session, tenant_id, user_id=None, start_date=None, e
     if not end_date:
         end_date = datetime.utcnow()
     
-    # Get all brands
-    brands = session.query(Brand).filter(Brand.tenant_id == tenant_id).all()
+    if strategy is None:
+        dialect = session.get_bind().dialect.name
+        strategy = 'sql' if dialect in SQL_AGGREGATE_DIALECTS else 'stream'
+    
+    # Aggregate quadrants per brand
+    quadrants = _shelf_quadrants_subquery(session, tenant_id, user_id, start_date, end_date)
+    if strategy == 'sql':
+        brand_rows = _brand_share_query(session, tenant_id, quadrants).all()
+    else:
+        brand_rows = _stream_brand_share(session, tenant_id, quadrants)
     
-    # Build base query for photos
-    photos_query = session.query(Photo).join(
+    # Count shelf photos in range
+    total_photos = session.query(func.count(Photo.id)).join(
         Visit, Photo.visit_id == Visit.id
     ).filter(
         Photo.tenant_id == tenant_id,
-        Visit.started_at >= start_date,
-        Visit.started_at <= end_date,
-        Photo.purpose == 'shelf'
-    )
-    
-    # Filter by user if provided
-    if user_id:
-        photos_query = photos_query.filter(Visit.user_id == user_id)
-    
-    # Get photos
-    photos = photos_query.all()
-    
-    # Get shelf quadrants for the photos
-    photo_ids = [photo.id for photo in photos]
-    shelf_quadrants = session.query(ShelfQuadrant).filter(
-        ShelfQuadrant.tenant_id == tenant_id,
-        ShelfQuadrant.photo_id.in_(photo_ids)
-    ).all()
+        Photo.purpose == 'shelf',
+        *_visit_filters(tenant_id, user_id, start_date, end_date)
+    ).scalar()
     
-    # Calculate shelf share by brand
+    # Format shelf share by brand
     shelf_share_by_brand = {}
-    for brand in brands:
-        brand_quadrants = [sq for sq in shelf_quadrants if sq.brand_id == brand.id]
-        total_area = sum(float(sq.area_percentage) for sq in brand_quadrants)
-        average_area = total_area / len(brand_quadrants) if brand_quadrants else 0.0
-        
-        shelf_share_by_brand[str(brand.id)] = {
-            'brand_id': str(brand.id),
-            'brand_name': brand.name,
-            'average_area_percentage': average_area,
-            'total_photos': len(brand_quadrants)
+    for brand_id, brand_name, average_area, quadrant_count in brand_rows:
+        shelf_share_by_brand[str(brand_id)] = {
+            'brand_id': str(brand_id),
+            'brand_name': brand_name,
+            'average_area_percentage': float(average_area) if average_area is not None else 0.0,
+            'total_photos': int(quadrant_count or 0)
         }
     
     # Calculate overall shelf share
-    total_photos = len(photos)
-    total_quadrants = len(shelf_quadrants)
+    total_quadrants = sum(brand_data['total_photos'] for brand_data in shelf_share_by_brand.values())
     
     # Calculate average shelf share across all brands
     total_area_percentage = sum(brand_data['average_area_percentage'] for brand_data in shelf_share_by_brand.values())
-    average_shelf_share = total_area_percentage / len(brands) if brands else 0.0
+    average_shelf_share = total_area_percentage / len(shelf_share_by_brand) if shelf_share_by_brand else 0.0
 
     return {
         'by_brand': shelf_share_by_brand,
-        'total_photos': total_photos,
+        'total_photos': int(total_photos or 0),
         'total_quadrants': total_quadrants,
         'average_shelf_share': average_shelf_share
     }
@@ -292,6 +371,10 @@ def get_call_cycle_coverage_metrics(session, tenant_id, user_id=None, start_date
     """
     Get call cycle coverage metrics for a tenant.
     
+    Coverage is computed in the database by joining call cycle locations to
+    completed visits in range on shop_id and grouping by call cycle, so the
+    cost is linear in the number of locations and visits.
+    
     Args:
         session: SQLAlchemy session
         tenant_id: Tenant ID
@@ -308,63 +391,50 @@ def get_call_cycle_coverage_metrics(session, tenant_id, user_id=None, start_date
     if not end_date:
         end_date = datetime.utcnow()
     
-    # Get all call cycles
-    call_cycles = session.query(CallCycle).filter(CallCycle.tenant_id == tenant_id).all()
-    
-    # Get call cycle locations
-    call_cycle_ids = [cc.id for cc in call_cycles]
-    locations = session.query(CallCycleLocation).filter(
-        CallCycleLocation.call_cycle_id.in_(call_cycle_ids)
-    ).all()
-    
-    # Get shop IDs from locations
-    shop_ids = [location.shop_id for location in locations if location.shop_id]
-    
-    # Build base query for visits
-    visits_query = session.query(Visit).filter(
-        Visit.tenant_id == tenant_id,
-        Visit.started_at >= start_date,
-        Visit.started_at <= end_date,
-        Visit.completed_at.isnot(None)
-    )
-    
-    # Filter by user if provided
-    if user_id:
-        visits_query = visits_query.filter(Visit.user_id == user_id)
-    
-    # Filter by shop IDs
-    if shop_ids:
-        visits_query = visits_query.filter(Visit.shop_id.in_(shop_ids))
-    
-    # Get visits
-    visits = visits_query.all()
+    # Whether a location's shop has a completed visit in range; matches each location at most once
+    location_visited = session.query(Visit.id).filter(
+        Visit.shop_id == CallCycleLocation.shop_id,
+        Visit.completed_at.isnot(None),
+        *_visit_filters(tenant_id, user_id, start_date, end_date)
+    ).exists()
+    
+    # Total and visited locations per call cycle
+    cycle_rows = session.query(
+        CallCycle.id,
+        CallCycle.name,
+        func.count(CallCycleLocation.id),
+        func.count(distinct(case((location_visited, CallCycleLocation.shop_id))))
+    ).outerjoin(
+        CallCycleLocation, CallCycleLocation.call_cycle_id == CallCycle.id
+    ).filter(
+        CallCycle.tenant_id == tenant_id
+    ).group_by(CallCycle.id, CallCycle.name).all()
     
     # Calculate coverage by call cycle
     coverage_by_call_cycle = {}
-    for call_cycle in call_cycles:
-        # Get locations for this call cycle
-        cycle_locations = [loc for loc in locations if loc.call_cycle_id == call_cycle.id]
-        cycle_shop_ids = [loc.shop_id for loc in cycle_locations if loc.shop_id]
-        
-        # Get visits for this call cycle
-        cycle_visits = [v for v in visits if v.shop_id in cycle_shop_ids]
-        
-        # Calculate coverage
-        total_locations = len(cycle_locations)
-        visited_locations = len(set(v.shop_id for v in cycle_visits))
+    for call_cycle_id, call_cycle_name, total_locations, visited_locations in cycle_rows:
         coverage_percentage = (visited_locations / total_locations) * 100.0 if total_locations > 0 else 0.0
         
-        coverage_by_call_cycle[str(call_cycle.id)] = {
-            'call_cycle_id': str(call_cycle.id),
-            'call_cycle_name': call_cycle.name,
+        coverage_by_call_cycle[str(call_cycle_id)] = {
+            'call_cycle_id': str(call_cycle_id),
+            'call_cycle_name': call_cycle_name,
             'total_locations': total_locations,
             'visited_locations': visited_locations,
             'coverage_percentage': coverage_percentage
         }
     
+    # Distinct visited shops across all call cycles
+    visited_locations = session.query(
+        func.count(distinct(CallCycleLocation.shop_id))
+    ).join(
+        CallCycle, CallCycleLocation.call_cycle_id == CallCycle.id
+    ).filter(
+        CallCycle.tenant_id == tenant_id,
+        location_visited
+    ).scalar() or 0
+    
     # Calculate overall coverage
-    total_locations = len(locations)
-    visited_locations = len(set(v.shop_id for v in visits if v.shop_id))
+    total_locations = sum(cycle['total_locations'] for cycle in coverage_by_call_cycle.values())
     overall_coverage = (visited_locations / total_locations) * 100.0 if total_locations > 0 else 0.0
     
     return {
@@ -372,4 +442,4 @@ def get_call_cycle_coverage_metrics(session, tenant_id, user_id=None, start_date
         'total_locations': total_locations,
         'visited_locations': visited_locations,
         'overall_coverage': overall_coverage
-    }
\ No newline at end of file
+    }
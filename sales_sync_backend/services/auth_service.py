@@ -1,24 +1,28 @@
 import uuid
 from datetime import datetime
-from passlib.hash import bcrypt
 from flask_jwt_extended import create_access_token, create_refresh_token
 
 from models.tenant import Tenant
 from models.user import User
-from models.role import Role, UserRole
+from models.role import Role, UserRole, roles_to_mask
+from utils.auth_context import ROLE_MASK_CLAIM
+from utils.passwords import PasswordHasherBusy, get_password_hasher
 
 
 def hash_password(password):
     """
-    Hash password using bcrypt.
+    Hash password using bcrypt in the password hashing pool.
     
     Args:
         password: Plain text password
     
     Returns:
         str: Hashed password
+    
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
     """
-    return bcrypt.hash(password)
+    return get_password_hasher().hash(password)
 
 
 def verify_password(password, password_hash):
@@ -31,8 +35,11 @@ def verify_password(password, password_hash):
     
     Returns:
         bool: True if password matches hash
+    
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
     """
-    return bcrypt.verify(password, password_hash)
+    return get_password_hasher().verify(password, password_hash)
 
 
 def create_tenant(session, name, subdomain=None):
@@ -141,9 +148,20 @@ def authenticate_user(session, email, password):
     
     Returns:
         User: Authenticated user or None
+    
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
     """
     user = session.query(User).filter_by(email=email).first()
     if user and verify_password(password, user.password_hash):
+        # Upgrade hashes made with a lower cost factor
+        hasher = get_password_hasher()
+        if hasher.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = hasher.hash(password)
+            except PasswordHasherBusy:
+                pass  # Retried on the next login
+        
         # Update last login
         user.last_login_at = datetime.utcnow()
         session.commit()
@@ -161,14 +179,11 @@ def generate_tokens(user):
     Returns:
         dict: Access and refresh tokens
     """
-    # Get user roles
-    roles = [role.name for role in user.roles]
-    
-    # Create JWT claims
+    # Create JWT claims, with roles as one bitmask
     claims = {
         'user_id': str(user.id),
         'tenant_id': str(user.tenant_id),
-        'roles': roles,
+        ROLE_MASK_CLAIM: roles_to_mask(role.name for role in user.roles),
         'email': user.email
     }
     
@@ -182,6 +197,28 @@ def generate_tokens(user):
     }
 
 
+def refresh_access_token(user_id, claims):
+    """
+    Generate a new access token from the claims of a refresh token.
+    
+    Args:
+        user_id: User ID (refresh token identity)
+        claims: Refresh token claims
+    
+    Returns:
+        str: Access token
+    """
+    # Refresh tokens issued before role masks carry role names
+    role_mask = claims[ROLE_MASK_CLAIM] if ROLE_MASK_CLAIM in claims else roles_to_mask(claims.get('roles'))
+    
+    return create_access_token(identity=user_id, additional_claims={
+        'user_id': claims.get('user_id', user_id),
+        'tenant_id': claims['tenant_id'],
+        ROLE_MASK_CLAIM: role_mask,
+        'email': claims['email']
+    })
+
+
 def register_tenant_and_admin(session, tenant_name, subdomain, email, password, first_name, last_name, phone=None):
     """
     Register a new tenant and admin user.
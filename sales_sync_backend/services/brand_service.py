@@ -1,7 +1,15 @@
 from models.brand import Brand, BrandInfographic
+from utils.cache import invalidate_tenant_cache
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+BRAND_SORT_FIELDS = {
+    'created_at': Brand.created_at,
+    'name': Brand.name
+}
 
-def get_brands(session, tenant_id, filters=None):
+
+def get_brands(session, tenant_id, filters=None, list_params=None):
     """
     Get brands for a tenant.
     
@@ -9,9 +17,10 @@ def get_brands(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of brands
+        Page: One page of brands
     """
     query = session.query(Brand).filter(Brand.tenant_id == tenant_id)
     
@@ -22,7 +31,7 @@ def get_brands(session, tenant_id, filters=None):
         if 'active' in filters:
             query = query.filter(Brand.active == filters['active'])
     
-    return query.all()
+    return paginate_query(query, Brand, BRAND_SORT_FIELDS, **(list_params or {}))
 
 
 def get_brand_by_id(session, tenant_id, brand_id):
@@ -65,6 +74,7 @@ def create_brand(session, tenant_id, name, slug=None, active=True):
     )
     session.add(brand)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return brand
 
 
@@ -94,6 +104,7 @@ def update_brand(session, tenant_id, brand_id, data):
         brand.active = data['active']
     
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return brand
 
 
@@ -115,6 +126,7 @@ def delete_brand(session, tenant_id, brand_id):
     
     session.delete(brand)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return True
 
 
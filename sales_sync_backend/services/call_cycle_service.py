@@ -1,7 +1,16 @@
 from models.call_cycle import CallCycle, CallCycleLocation
+from utils.cache import invalidate_tenant_cache
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+CALL_CYCLE_SORT_FIELDS = {
+    'created_at': CallCycle.created_at,
+    'name': CallCycle.name,
+    'frequency': CallCycle.frequency
+}
 
-def get_call_cycles(session, tenant_id, filters=None):
+
+def get_call_cycles(session, tenant_id, filters=None, list_params=None):
     """
     Get call cycles for a tenant.
     
@@ -9,9 +18,10 @@ def get_call_cycles(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of call cycles
+        Page: One page of call cycles
     """
     query = session.query(CallCycle).filter(CallCycle.tenant_id == tenant_id)
     
@@ -24,7 +34,7 @@ def get_call_cycles(session, tenant_id, filters=None):
         if 'created_by' in filters:
             query = query.filter(CallCycle.created_by == filters['created_by'])
     
-    return query.all()
+    return paginate_query(query, CallCycle, CALL_CYCLE_SORT_FIELDS, **(list_params or {}))
 
 
 def get_call_cycle_by_id(session, tenant_id, call_cycle_id):
@@ -67,6 +77,7 @@ def create_call_cycle(session, tenant_id, name, frequency, created_by=None):
     )
     session.add(call_cycle)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return call_cycle
 
 
@@ -94,6 +105,7 @@ def update_call_cycle(session, tenant_id, call_cycle_id, data):
         call_cycle.frequency = data['frequency']
     
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return call_cycle
 
 
@@ -115,6 +127,7 @@ def delete_call_cycle(session, tenant_id, call_cycle_id):
     
     session.delete(call_cycle)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return True
 
 
@@ -141,6 +154,20 @@ def get_call_cycle_locations(session, tenant_id, call_cycle_id):
     ).order_by(CallCycleLocation.order_num).all()
 
 
+def _get_call_cycle_tenant_id(session, call_cycle_id):
+    """
+    Get the tenant ID of a call cycle.
+    
+    Args:
+        session: SQLAlchemy session
+        call_cycle_id: Call cycle ID
+    
+    Returns:
+        UUID: Tenant ID or None
+    """
+    return session.query(CallCycle.tenant_id).filter(CallCycle.id == call_cycle_id).scalar()
+
+
 def add_call_cycle_location(session, call_cycle_id, location, shop_id=None, order_num=0):
     """
     Add a location to a call cycle.
@@ -163,6 +190,7 @@ def add_call_cycle_location(session, call_cycle_id, location, shop_id=None, orde
     )
     session.add(call_cycle_location)
     session.commit()
+    invalidate_tenant_cache(_get_call_cycle_tenant_id(session, call_cycle_id))
     return call_cycle_location
 
 
@@ -190,6 +218,7 @@ def remove_call_cycle_location(session, call_cycle_id, location_id):
     # Remove location
     session.delete(call_cycle_location)
     session.commit()
+    invalidate_tenant_cache(_get_call_cycle_tenant_id(session, call_cycle_id))
     return True
 
 
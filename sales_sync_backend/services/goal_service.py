@@ -1,7 +1,16 @@
 from models.goal import Goal, GoalAssignment
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+GOAL_SORT_FIELDS = {
+    'created_at': Goal.created_at,
+    'name': Goal.name,
+    'metric': Goal.metric,
+    'period': Goal.period
+}
 
-def get_goals(session, tenant_id, filters=None):
+
+def get_goals(session, tenant_id, filters=None, list_params=None):
     """
     Get goals for a tenant.
     
@@ -9,9 +18,10 @@ def get_goals(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of goals
+        Page: One page of goals
     """
     query = session.query(Goal).filter(Goal.tenant_id == tenant_id)
     
@@ -28,7 +38,7 @@ def get_goals(session, tenant_id, filters=None):
         if 'end_date' in filters:
             query = query.filter(Goal.end_date <= filters['end_date'])
     
-    return query.all()
+    return paginate_query(query, Goal, GOAL_SORT_FIELDS, **(list_params or {}))
 
 
 def get_goal_by_id(session, tenant_id, goal_id):
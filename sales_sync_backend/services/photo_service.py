@@ -1,9 +1,48 @@
-from models.photo import Photo, ShelfQuadrant
+import logging
+import math
+import os
+import uuid
+from datetime import datetime, timedelta
 
+from flask import current_app
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 
-def get_photos(session, tenant_id, filters=None):
+from models.brand import Brand
+from models.photo import Photo, PhotoBlob, ShelfQuadrant
+from utils.cache import invalidate_tenant_cache
+from utils.db_utils import get_dialect_insert, paginate_query
+from utils.image_utils import calculate_shelf_area_percentage
+from utils.image_variants import get_variant_renderer
+from utils.photo_uploads import SpooledUpload, delete_stored_file, get_content_key, get_file_url, get_upload_worker, store_spooled_file
+
+logger = logging.getLogger(__name__)
+
+# Photo storage states
+PHOTO_PENDING = 'pending'
+PHOTO_READY = 'ready'
+PHOTO_FAILED = 'failed'
+
+# Seconds a pending blob stays claimed by its upload when not configured
+DEFAULT_BLOB_CLAIM_TIMEOUT = 900
+
+# Columns list endpoints may sort by
+PHOTO_SORT_FIELDS = {
+    'created_at': Photo.created_at
+}
+
+
+class ShelfQuadrantValidationError(ValueError):
+    """Raised when submitted shelf quadrants fail validation; errors lists each invalid quadrant."""
+    
+    def __init__(self, errors):
+        super().__init__('Invalid shelf quadrants')
+        self.errors = errors
+
+
+def get_photos_query(session, tenant_id, filters=None):
     """
-    Get photos for a tenant.
+    Build the query for a tenant's photos, newest first.
     
     Args:
         session: SQLAlchemy session
@@ -11,7 +50,7 @@ def get_photos(session, tenant_id, filters=None):
         filters: Optional filters
     
     Returns:
-        list: List of photos
+        Query: Photos query
     """
     query = session.query(Photo).filter(Photo.tenant_id == tenant_id)
     
@@ -22,7 +61,24 @@ def get_photos(session, tenant_id, filters=None):
         if 'purpose' in filters:
             query = query.filter(Photo.purpose == filters['purpose'])
     
-    return query.all()
+    return query.order_by(Photo.created_at.desc(), Photo.id.desc())
+
+
+def get_photos(session, tenant_id, filters=None, list_params=None):
+    """
+    Get photos for a tenant.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
+    
+    Returns:
+        Page: One page of photos
+    """
+    query = get_photos_query(session, tenant_id, filters)
+    return paginate_query(query, Photo, PHOTO_SORT_FIELDS, **(list_params or {}))
 
 
 def get_photo_by_id(session, tenant_id, photo_id):
@@ -63,13 +119,433 @@ def create_photo(session, tenant_id, visit_id, file_url, purpose=None, metadata=
         visit_id=visit_id,
         file_url=file_url,
         purpose=purpose,
-        metadata=metadata
+        image_metadata=metadata
     )
     session.add(photo)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return photo
 
 
+def get_photo_blob(session, tenant_id, content_hash):
+    """
+    Get a tenant's stored file by content hash.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        content_hash: SHA-256 hex digest
+    
+    Returns:
+        PhotoBlob: Photo blob or None
+    """
+    return session.query(PhotoBlob).filter(
+        PhotoBlob.tenant_id == tenant_id,
+        PhotoBlob.content_hash == content_hash
+    ).first()
+
+
+def get_blob_claim_cutoff():
+    """
+    Get the time before which a pending blob's claim has expired.
+    
+    Returns:
+        datetime: Claims made or refreshed before this are stale
+    """
+    timeout = current_app.config.get('PHOTO_BLOB_CLAIM_TIMEOUT', DEFAULT_BLOB_CLAIM_TIMEOUT)
+    return datetime.utcnow() - timedelta(seconds=timeout)
+
+
+def stale_blob_filter(cutoff):
+    """Filter for pending blobs whose storing upload is presumed lost."""
+    return (PhotoBlob.status == PHOTO_PENDING) & or_(PhotoBlob.claimed_at.is_(None), PhotoBlob.claimed_at < cutoff)
+
+
+def _insert_photo_blob(session, row):
+    """Insert a blob row, doing nothing if the tenant already has its content."""
+    table = PhotoBlob.__table__
+    insert = get_dialect_insert(session)
+    if insert is not None:
+        session.execute(insert(table).on_conflict_do_nothing(index_elements=[table.c.tenant_id, table.c.content_hash]), [row])
+        return
+    
+    # A savepoint keeps a duplicate from rolling back the caller's transaction
+    try:
+        with session.begin_nested():
+            session.execute(table.insert(), [row])
+    except IntegrityError:
+        pass
+
+
+def claim_photo_blob(session, tenant_id, spooled):
+    """
+    Get or create the blob for a spooled upload's content.
+    
+    The caller owns the blob, and must store the spooled file, if this
+    upload created it, is retrying a failed one, or is taking over one
+    whose upload has been pending longer than PHOTO_BLOB_CLAIM_TIMEOUT
+    (its worker died or the process restarted mid-transfer). Concurrent
+    uploads of the same content are settled by the (tenant_id,
+    content_hash) unique constraint, so exactly one of them stores the
+    file.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        spooled: SpooledUpload
+    
+    Returns:
+        tuple: (PhotoBlob, owned)
+    """
+    blob_id = uuid.uuid4()
+    now = datetime.utcnow()
+    row = {
+        'id': blob_id,
+        'tenant_id': tenant_id,
+        'content_hash': spooled.sha256,
+        'storage_key': get_content_key(tenant_id, spooled.sha256, spooled.filename),
+        'size': spooled.size,
+        'content_type': spooled.content_type,
+        'status': PHOTO_PENDING,
+        'claimed_at': now
+    }
+    
+    query = session.query(PhotoBlob).filter(
+        PhotoBlob.tenant_id == tenant_id,
+        PhotoBlob.content_hash == spooled.sha256
+    ).with_for_update()
+    
+    # Insert unless the tenant already has this content, then lock the blob so
+    # its status cannot change until this upload's photo is committed
+    _insert_photo_blob(session, row)
+    blob = query.one_or_none()
+    if blob is None:
+        # Cleanup deleted the unreferenced blob in between
+        _insert_photo_blob(session, row)
+        blob = query.one()
+    if blob.id == blob_id:
+        return blob, True
+    
+    # Take over a blob whose earlier upload failed or was lost
+    stale = blob.status == PHOTO_PENDING and (blob.claimed_at is None or blob.claimed_at < get_blob_claim_cutoff())
+    if blob.status == PHOTO_FAILED or stale:
+        blob.status = PHOTO_PENDING
+        blob.claimed_at = now
+        return blob, True
+    
+    return blob, False
+
+
+def build_blob_photo(tenant_id, visit_id, blob, purpose=None):
+    """
+    Build a photo of stored content, with the blob's status, metadata and variants.
+    
+    Args:
+        tenant_id: Tenant ID
+        visit_id: Visit ID
+        blob: PhotoBlob
+        purpose: Photo purpose ('id', 'shelf', 'outside', 'board')
+    
+    Returns:
+        Photo: New photo, not yet added to the session
+    """
+    return Photo(
+        tenant_id=tenant_id,
+        visit_id=visit_id,
+        file_url=get_file_url(blob.storage_key),
+        purpose=purpose,
+        image_metadata=blob.image_metadata or {},
+        variants={name: get_file_url(key) for name, key in (blob.variants or {}).items()},
+        status=blob.status,
+        content_hash=blob.content_hash
+    )
+
+
+def create_photo_upload(session, tenant_id, visit_id, spooled, purpose=None):
+    """
+    Create a photo for a spooled upload, storing the file only if it is new.
+    
+    Files are stored once per tenant under their SHA-256, so re-uploading
+    the same image links the new photo to the stored object and the
+    spooled copy is dropped. Otherwise the photo is pending until the
+    upload worker has stored the file and set status to 'ready' (or
+    'failed'); its file_url is final from the start.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        visit_id: Visit ID
+        spooled: SpooledUpload
+        purpose: Photo purpose ('id', 'shelf', 'outside', 'board')
+    
+    Returns:
+        Photo: Created photo
+    """
+    try:
+        blob, owned = claim_photo_blob(session, tenant_id, spooled)
+        
+        photo = build_blob_photo(tenant_id, visit_id, blob, purpose)
+        session.add(photo)
+        session.commit()
+    except Exception:
+        # Nothing will store the spool file now
+        session.rollback()
+        spooled.discard()
+        raise
+    invalidate_tenant_cache(tenant_id)
+    
+    if owned:
+        try:
+            get_upload_worker().submit(store_photo_blob, tenant_id, blob.id, spooled, blob.claimed_at)
+        except Exception:
+            # The claim goes stale and the next upload of the content takes it over
+            spooled.discard()
+            raise
+    else:
+        spooled.discard()
+    return photo
+
+
+def create_photo_from_hash(session, tenant_id, visit_id, content_hash, purpose=None):
+    """
+    Create a photo from content the tenant has already uploaded.
+    
+    Lets clients that hash images before sending skip the upload.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        visit_id: Visit ID
+        content_hash: SHA-256 hex digest of the file
+        purpose: Photo purpose ('id', 'shelf', 'outside', 'board')
+    
+    Returns:
+        Photo: Created photo, or None if no stored file has this hash
+    """
+    blob = get_photo_blob(session, tenant_id, content_hash.lower())
+    if not blob or blob.status == PHOTO_FAILED:
+        return None
+    
+    photo = build_blob_photo(tenant_id, visit_id, blob, purpose)
+    session.add(photo)
+    session.commit()
+    invalidate_tenant_cache(tenant_id)
+    return photo
+
+
+def render_photo_variants(spooled, key):
+    """
+    Render the resized variants of a spooled photo next to the spool file.
+    
+    Files that are not readable images get no variants and no metadata.
+    
+    Args:
+        spooled: SpooledUpload
+        key: Storage key of the original
+    
+    Returns:
+        tuple: (metadata dict, dict of variant name to (SpooledUpload, storage key))
+    """
+    renderer = get_variant_renderer()
+    try:
+        metadata, rendered = renderer.render(spooled.path, os.path.dirname(spooled.path))
+    except Exception as e:
+        logger.warning(f"No variants for {key}: {e}")
+        return {}, {}
+    
+    base, _ = os.path.splitext(key)
+    variants = {}
+    for name, (path, size) in rendered.items():
+        variant_key = f"{base}.{name}{os.path.splitext(path)[1]}"
+        variants[name] = (SpooledUpload(path, size, os.path.basename(variant_key), renderer.content_type), variant_key)
+    return metadata, variants
+
+
+def store_photo_blob(session, tenant_id, blob_id, spooled, claimed_at):
+    """
+    Store a spooled upload and its resized variants, and mark the blob and its photos ready or failed.
+    
+    Runs on the upload worker. Variants are rendered in the variant process
+    pool, and every photo waiting on the blob gets its metadata and variant
+    URLs. The job refreshes the blob's claim when it starts, so time spent
+    queued does not count towards the claim timeout, and does nothing if
+    another upload has taken the blob over in the meantime.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        blob_id: PhotoBlob ID
+        spooled: SpooledUpload
+        claimed_at: The blob's claimed_at when this upload claimed it
+    """
+    blob = session.query(PhotoBlob).filter(
+        PhotoBlob.tenant_id == tenant_id,
+        PhotoBlob.id == blob_id
+    ).first()
+    if not blob:
+        spooled.discard()
+        return
+    key, content_hash = blob.storage_key, blob.content_hash
+    
+    # Refresh the claim, unless it was taken over or failed while queued
+    started_at = datetime.utcnow()
+    refreshed = session.query(PhotoBlob).filter(
+        PhotoBlob.id == blob_id,
+        PhotoBlob.status == PHOTO_PENDING,
+        PhotoBlob.claimed_at == claimed_at
+    ).update({'claimed_at': started_at}, synchronize_session=False)
+    # Don't hold a transaction open during the transfer
+    session.commit()
+    if not refreshed:
+        logger.warning(f"Photo blob {blob_id} was claimed by another upload")
+        spooled.discard()
+        return
+    
+    # Render from the spool file before storing moves it
+    metadata, variants = render_photo_variants(spooled, key)
+    try:
+        store_spooled_file(spooled, key)
+        for variant, variant_key in variants.values():
+            store_spooled_file(variant, variant_key)
+        status = PHOTO_READY
+    except Exception:
+        logger.exception(f"Storing photo blob {blob_id} failed")
+        status = PHOTO_FAILED
+    finally:
+        for variant, _ in variants.values():
+            variant.discard()
+    
+    variant_keys = {name: variant_key for name, (_, variant_key) in variants.items()} if status == PHOTO_READY else {}
+    
+    # Blob first: photos created meanwhile were committed under its lock
+    updated = session.query(PhotoBlob).filter(
+        PhotoBlob.id == blob_id,
+        PhotoBlob.claimed_at == started_at
+    ).update({
+        'status': status,
+        'image_metadata': metadata,
+        'variants': variant_keys
+    }, synchronize_session=False)
+    if not updated:
+        # Presumed lost and taken over; the new owner settles the photos
+        logger.warning(f"Photo blob {blob_id} was taken over while storing")
+        session.rollback()
+        return
+    session.query(Photo).filter(
+        Photo.tenant_id == tenant_id,
+        Photo.content_hash == content_hash,
+        Photo.status == PHOTO_PENDING
+    ).update({
+        'status': status,
+        'image_metadata': metadata,
+        'variants': {name: get_file_url(variant_key) for name, variant_key in variant_keys.items()}
+    }, synchronize_session=False)
+    session.commit()
+
+
+def fail_stale_photo_blobs(session, tenant_id=None, dry_run=False):
+    """
+    Mark blobs whose upload was lost, and their pending photos, failed.
+    
+    A blob stays pending if its upload worker was killed or the process
+    restarted mid-transfer. No job will store its spool file any more, so
+    it cannot be requeued; failing it lets the next upload of the content
+    take it over and cleanup_photo_blobs remove it once unreferenced. The
+    spool file itself is left on disk until sweep_spool_folder removes it.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID (optional, defaults to all tenants)
+        dry_run: Only count the stale blobs
+    
+    Returns:
+        int: Number of stale blobs
+    """
+    query = session.query(PhotoBlob).filter(stale_blob_filter(get_blob_claim_cutoff()))
+    if tenant_id:
+        query = query.filter(PhotoBlob.tenant_id == tenant_id)
+    stale = query.with_for_update().all()
+    if dry_run:
+        session.rollback()
+        return len(stale)
+    
+    for blob in stale:
+        blob.status = PHOTO_FAILED
+        session.query(Photo).filter(
+            Photo.tenant_id == blob.tenant_id,
+            Photo.content_hash == blob.content_hash,
+            Photo.status == PHOTO_PENDING
+        ).update({'status': PHOTO_FAILED}, synchronize_session=False)
+    session.commit()
+    for stale_tenant_id in {blob.tenant_id for blob in stale}:
+        invalidate_tenant_cache(stale_tenant_id)
+    
+    return len(stale)
+
+
+def cleanup_photo_blobs(session, tenant_id=None, dry_run=False):
+    """
+    Delete stored files no photo references any more.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID (optional, defaults to all tenants)
+        dry_run: Only count the unreferenced blobs
+    
+    Returns:
+        list: Storage keys of the unreferenced blobs
+    """
+    # Reference count of every blob in one grouped query
+    references = func.count(Photo.id)
+    query = session.query(PhotoBlob.id).outerjoin(
+        Photo,
+        (Photo.tenant_id == PhotoBlob.tenant_id) & (Photo.content_hash == PhotoBlob.content_hash)
+    ).filter(
+        PhotoBlob.status != PHOTO_PENDING
+    ).group_by(PhotoBlob.id).having(references == 0)
+    if tenant_id:
+        query = query.filter(PhotoBlob.tenant_id == tenant_id)
+    unreferenced = session.query(PhotoBlob).filter(PhotoBlob.id.in_(query)).all()
+    
+    if dry_run:
+        return [blob.storage_key for blob in unreferenced]
+    
+    deleted = []
+    for blob in unreferenced:
+        blob_id, key, variant_keys = blob.id, blob.storage_key, list((blob.variants or {}).values())
+        # Remove the row first, only if it is still unreferenced, so a photo added meanwhile keeps its file
+        removed = session.query(PhotoBlob).filter(
+            PhotoBlob.id == blob_id,
+            ~session.query(Photo.id).filter(
+                Photo.tenant_id == PhotoBlob.tenant_id,
+                Photo.content_hash == PhotoBlob.content_hash
+            ).exists()
+        ).delete(synchronize_session=False)
+        session.commit()
+        if removed:
+            for stored_key in [key] + variant_keys:
+                delete_stored_file(stored_key)
+            deleted.append(key)
+    
+    return deleted
+
+
+def get_photo_frame(photo):
+    """
+    Get a photo's (width, height) from its metadata.
+    
+    Args:
+        photo: Photo
+    
+    Returns:
+        tuple: (width, height), or None if the photo has not been measured
+    """
+    metadata = photo.image_metadata or {}
+    if metadata.get('width') and metadata.get('height'):
+        return metadata['width'], metadata['height']
+    return None
+
+
 def get_shelf_quadrants(session, tenant_id, photo_id):
     """
     Get shelf quadrants for a photo.
@@ -88,7 +564,7 @@ def get_shelf_quadrants(session, tenant_id, photo_id):
     ).all()
 
 
-def create_shelf_quadrant(session, tenant_id, photo_id, brand_id, quadrant_coords, area_percentage=None):
+def create_shelf_quadrant(session, tenant_id, photo_id, brand_id, quadrant_coords, area_percentage=None, frame=None):
     """
     Create a new shelf quadrant.
     
@@ -97,22 +573,19 @@ def create_shelf_quadrant(session, tenant_id, photo_id, brand_id, quadrant_coord
         tenant_id: Tenant ID
         photo_id: Photo ID
         brand_id: Brand ID
-        quadrant_coords: Quadrant coordinates
-        area_percentage: Area percentage
+        quadrant_coords: Quadrant coordinates (see calculate_shelf_area_percentage)
+        area_percentage: Area percentage, calculated from the coordinates if not given
+        frame: (width, height) of the photo (see get_photo_frame)
     
     Returns:
         ShelfQuadrant: Created shelf quadrant
+    
+    Raises:
+        ValueError: If the coordinates are not valid shapes
     """
     # Calculate area percentage if not provided
     if area_percentage is None:
-        # Simple calculation based on quadrant coordinates
-        # In a real implementation, this would be more sophisticated
-        area_percentage = 0.0
-        if isinstance(quadrant_coords, list) and len(quadrant_coords) > 0:
-            # Assuming quadrant_coords is a list of polygons
-            # Each polygon is a list of points (x, y)
-            # Calculate area percentage based on polygon area
-            area_percentage = len(quadrant_coords) * 5.0  # Simplified calculation
+        area_percentage = calculate_shelf_area_percentage(quadrant_coords, frame)
     
     shelf_quadrant = ShelfQuadrant(
         tenant_id=tenant_id,
@@ -123,4 +596,171 @@ def create_shelf_quadrant(session, tenant_id, photo_id, brand_id, quadrant_coord
     )
     session.add(shelf_quadrant)
     session.commit()
-    return shelf_quadrant
\ No newline at end of file
+    invalidate_tenant_cache(tenant_id)
+    return shelf_quadrant
+
+
+def replace_shelf_quadrants(session, tenant_id, photo, quadrants):
+    """
+    Replace all of a photo's shelf quadrants with a new set.
+    
+    Brand IDs are checked against the tenant's brands in one query, areas
+    missing from the request are measured together in one vectorized pass,
+    and the old quadrants are swapped for the new ones with one delete and
+    one multi-row insert in a single transaction. If any quadrant is
+    invalid nothing is written.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        photo: Photo object, or photo ID to load it
+        quadrants: List of {brand_id, quadrant_coords, area_percentage (optional)}
+    
+    Returns:
+        list: Created shelf quadrants, or None if the photo was not found
+    
+    Raises:
+        ShelfQuadrantValidationError: If any quadrant is invalid
+    """
+    from utils.geometry import parse_polygons, resolve_frame, union_area_percentages
+    
+    if not isinstance(photo, Photo):
+        photo = get_photo_by_id(session, tenant_id, photo)
+    if not photo:
+        return None
+    
+    # Parse each quadrant before touching the database
+    errors = []
+    parsed = []
+    seen_brand_ids = set()
+    for index, quadrant in enumerate(quadrants):
+        if not isinstance(quadrant, dict):
+            errors.append({'index': index, 'error': 'Quadrant must be an object'})
+            continue
+        try:
+            brand_id = uuid.UUID(str(quadrant.get('brand_id')))
+        except ValueError:
+            errors.append({'index': index, 'error': 'Brand ID is required'})
+            continue
+        if brand_id in seen_brand_ids:
+            errors.append({'index': index, 'error': 'Duplicate brand in request'})
+            continue
+        seen_brand_ids.add(brand_id)
+        
+        quadrant_coords = quadrant.get('quadrant_coords')
+        if not quadrant_coords:
+            errors.append({'index': index, 'error': 'Quadrant coordinates are required'})
+            continue
+        try:
+            polygons = parse_polygons(quadrant_coords)
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        
+        area_percentage = quadrant.get('area_percentage')
+        if area_percentage is not None and (isinstance(area_percentage, bool) or not isinstance(area_percentage, (int, float))):
+            errors.append({'index': index, 'error': 'Area percentage must be a number'})
+            continue
+        parsed.append((index, brand_id, quadrant_coords, polygons, area_percentage))
+    
+    # Check every brand in one query
+    brand_ids = [brand_id for _, brand_id, _, _, _ in parsed]
+    known_brand_ids = set()
+    if brand_ids:
+        known_brand_ids = {row.id for row in session.query(Brand.id).filter(
+            Brand.tenant_id == tenant_id,
+            Brand.id.in_(brand_ids)
+        )}
+    for index, brand_id, _, _, _ in parsed:
+        if brand_id not in known_brand_ids:
+            errors.append({'index': index, 'error': 'Brand not found'})
+    if errors:
+        raise ShelfQuadrantValidationError(sorted(errors, key=lambda error: error['index']))
+    
+    # Measure the quadrants without a given area together
+    frame = get_photo_frame(photo)
+    frames = [resolve_frame(polygons, frame) for _, _, _, polygons, _ in parsed]
+    percentages = union_area_percentages([polygons for _, _, _, polygons, _ in parsed], frames)
+    
+    now = datetime.utcnow()
+    rows = []
+    for (_, brand_id, quadrant_coords, _, area_percentage), measured in zip(parsed, percentages):
+        if area_percentage is None and not math.isnan(measured):
+            area_percentage = float(measured)
+        rows.append({
+            'id': uuid.uuid4(),
+            'tenant_id': tenant_id,
+            'photo_id': photo.id,
+            'brand_id': brand_id,
+            'quadrant_coords': quadrant_coords,
+            'area_percentage': area_percentage,
+            'created_at': now
+        })
+    
+    # Swap the quadrants in one transaction
+    session.query(ShelfQuadrant).filter(
+        ShelfQuadrant.tenant_id == tenant_id,
+        ShelfQuadrant.photo_id == photo.id
+    ).delete(synchronize_session=False)
+    if rows:
+        session.execute(ShelfQuadrant.__table__.insert().values(rows))
+    session.commit()
+    invalidate_tenant_cache(tenant_id)
+    
+    return [ShelfQuadrant(**row) for row in rows]
+
+
+def recompute_shelf_areas(session, tenant_id=None):
+    """
+    Recalculate the area percentage of stored shelf quadrants.
+    
+    All quadrants are measured in one vectorized pass and written back
+    with one bulk update. Quadrants with invalid coordinates, or on photos
+    whose size is unknown and whose coordinates are not normalized, are
+    left unchanged.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID (optional, defaults to all tenants)
+    
+    Returns:
+        tuple: (updated, skipped) quadrant counts
+    """
+    from utils.geometry import parse_polygons, resolve_frame, union_area_percentages
+    
+    query = session.query(ShelfQuadrant.id, ShelfQuadrant.tenant_id, ShelfQuadrant.quadrant_coords, Photo.image_metadata).join(
+        Photo, Photo.id == ShelfQuadrant.photo_id
+    )
+    if tenant_id:
+        query = query.filter(ShelfQuadrant.tenant_id == tenant_id)
+    
+    # Parse every quadrant, then measure them together
+    ids, groups, frames = [], [], []
+    tenant_ids = set()
+    skipped = 0
+    for quadrant_id, quadrant_tenant_id, quadrant_coords, metadata in query:
+        try:
+            polygons = parse_polygons(quadrant_coords)
+        except ValueError:
+            skipped += 1
+            continue
+        metadata = metadata or {}
+        frame = resolve_frame(polygons, (metadata.get('width'), metadata.get('height')))
+        if frame is None:
+            skipped += 1
+            continue
+        ids.append(quadrant_id)
+        tenant_ids.add(quadrant_tenant_id)
+        groups.append(polygons)
+        frames.append(frame)
+    
+    percentages = union_area_percentages(groups, frames)
+    session.bulk_update_mappings(ShelfQuadrant, [
+        {'id': quadrant_id, 'area_percentage': float(percentage)}
+        for quadrant_id, percentage in zip(ids, percentages)
+    ])
+    session.commit()
+    for updated_tenant_id in tenant_ids:
+        invalidate_tenant_cache(updated_tenant_id)
+    
+    return len(ids), skipped
@@ -1,7 +1,15 @@
 from models.survey import Survey, SurveyQuestion
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+SURVEY_SORT_FIELDS = {
+    'created_at': Survey.created_at,
+    'name': Survey.name,
+    'type': Survey.type
+}
 
-def get_surveys(session, tenant_id, filters=None):
+
+def get_surveys(session, tenant_id, filters=None, list_params=None):
     """
     Get surveys for a tenant.
     
@@ -9,9 +17,10 @@ def get_surveys(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of surveys
+        Page: One page of surveys
     """
     query = session.query(Survey).filter(Survey.tenant_id == tenant_id)
     
@@ -26,7 +35,7 @@ def get_surveys(session, tenant_id, filters=None):
         if 'brand_id' in filters:
             query = query.filter(Survey.brand_id == filters['brand_id'])
     
-    return query.all()
+    return paginate_query(query, Survey, SURVEY_SORT_FIELDS, **(list_params or {}))
 
 
 def get_survey_by_id(session, tenant_id, survey_id):
@@ -1,7 +1,14 @@
 from models.team import Team, UserTeam
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+TEAM_SORT_FIELDS = {
+    'created_at': Team.created_at,
+    'name': Team.name
+}
 
-def get_teams(session, tenant_id, filters=None):
+
+def get_teams(session, tenant_id, filters=None, list_params=None):
     """
     Get teams for a tenant.
     
@@ -9,9 +16,10 @@ def get_teams(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of teams
+        Page: One page of teams
     """
     query = session.query(Team).filter(Team.tenant_id == tenant_id)
     
@@ -22,7 +30,7 @@ def get_teams(session, tenant_id, filters=None):
         if 'manager_id' in filters:
             query = query.filter(Team.manager_id == filters['manager_id'])
     
-    return query.all()
+    return paginate_query(query, Team, TEAM_SORT_FIELDS, **(list_params or {}))
 
 
 def get_team_by_id(session, tenant_id, team_id):
@@ -1,9 +1,16 @@
 from models.user import User
 from models.role import Role, UserRole
 from services.auth_service import hash_password
+from utils.db_utils import paginate_query
 
+# Columns list endpoints may sort by
+USER_SORT_FIELDS = {
+    'created_at': User.created_at,
+    'email': User.email
+}
 
-def get_users(session, tenant_id, filters=None):
+
+def get_users(session, tenant_id, filters=None, list_params=None):
     """
     Get users for a tenant.
     
@@ -11,9 +18,10 @@ def get_users(session, tenant_id, filters=None):
         session: SQLAlchemy session
         tenant_id: Tenant ID
         filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
     
     Returns:
-        list: List of users
+        Page: One page of users
     """
     query = session.query(User).filter(User.tenant_id == tenant_id)
     
@@ -24,7 +32,7 @@ def get_users(session, tenant_id, filters=None):
         if 'is_active' in filters:
             query = query.filter(User.is_active == filters['is_active'])
     
-    return query.all()
+    return paginate_query(query, User, USER_SORT_FIELDS, **(list_params or {}))
 
 
 def get_user_by_id(session, tenant_id, user_id):
@@ -0,0 +1,214 @@
+from datetime import date, datetime
+from sqlalchemy import func
+
+from models.visit import Visit
+from models.visit_rollup import VisitDailyRollup
+from utils.db_utils import get_dialect_insert
+
+
+def _to_day(value):
+    """
+    Normalize a datetime, date or ISO string to a date.
+
+    Args:
+        value: datetime, date or 'YYYY-MM-DD' string
+
+    Returns:
+        date: Day bucket or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def increment_visit_rollup(session, tenant_id, user_id, survey_id, day, total=0, completed=0):
+    """
+    Add to the counters of a rollup bucket, creating it if needed.
+
+    The change is written in the caller's transaction, so it commits or
+    rolls back together with the visit write that triggered it.
+
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        user_id: User ID
+        survey_id: Survey ID
+        day: Day bucket (date or datetime)
+        total: Amount to add to total_visits
+        completed: Amount to add to completed_visits
+    """
+    day = _to_day(day)
+    if day is None:
+        return
+
+    insert = get_dialect_insert(session)
+    if insert is not None:
+        table = VisitDailyRollup.__table__
+        stmt = insert(table).values(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            survey_id=survey_id,
+            day=day,
+            total_visits=total,
+            completed_visits=completed
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.tenant_id, table.c.user_id, table.c.survey_id, table.c.day],
+            set_={
+                'total_visits': table.c.total_visits + total,
+                'completed_visits': table.c.completed_visits + completed,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        session.execute(stmt)
+        return
+
+    # Fallback for dialects without ON CONFLICT support
+    rollup = session.query(VisitDailyRollup).filter(
+        VisitDailyRollup.tenant_id == tenant_id,
+        VisitDailyRollup.user_id == user_id,
+        VisitDailyRollup.survey_id == survey_id,
+        VisitDailyRollup.day == day
+    ).with_for_update().first()
+    if rollup:
+        rollup.total_visits += total
+        rollup.completed_visits += completed
+    else:
+        session.add(VisitDailyRollup(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            survey_id=survey_id,
+            day=day,
+            total_visits=total,
+            completed_visits=completed
+        ))
+
+
+def record_visit_started(session, visit):
+    """
+    Count a newly created visit in its day bucket.
+
+    Args:
+        session: SQLAlchemy session
+        visit: Visit object
+    """
+    increment_visit_rollup(
+        session,
+        visit.tenant_id,
+        visit.user_id,
+        visit.survey_id,
+        visit.started_at,
+        total=1,
+        completed=1 if visit.completed_at else 0
+    )
+
+
+def record_visit_completed(session, visit):
+    """
+    Count a visit completion in the bucket of the day the visit started.
+
+    Args:
+        session: SQLAlchemy session
+        visit: Visit object
+    """
+    increment_visit_rollup(
+        session,
+        visit.tenant_id,
+        visit.user_id,
+        visit.survey_id,
+        visit.started_at,
+        completed=1
+    )
+
+
+def get_daily_visit_counts(session, tenant_id, start_date, end_date, user_id=None):
+    """
+    Get per-day visit totals from the rollup table.
+
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        start_date: Start date (inclusive, day granularity)
+        end_date: End date (inclusive, day granularity)
+        user_id: User ID (optional)
+
+    Returns:
+        list: (day, total_visits, completed_visits) tuples ordered by day
+    """
+    query = session.query(
+        VisitDailyRollup.day,
+        func.sum(VisitDailyRollup.total_visits),
+        func.sum(VisitDailyRollup.completed_visits)
+    ).filter(
+        VisitDailyRollup.tenant_id == tenant_id,
+        VisitDailyRollup.day >= _to_day(start_date),
+        VisitDailyRollup.day <= _to_day(end_date)
+    )
+
+    # Filter by user if provided
+    if user_id:
+        query = query.filter(VisitDailyRollup.user_id == user_id)
+
+    rows = query.group_by(VisitDailyRollup.day).order_by(VisitDailyRollup.day).all()
+    return [(_to_day(day), int(total or 0), int(completed or 0)) for day, total, completed in rows]
+
+
+def rebuild_visit_rollup(session, tenant_id=None, batch_size=1000):
+    """
+    Rebuild the rollup table from the raw visits table.
+
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID (optional, rebuilds all tenants if omitted)
+        batch_size: Number of rollup rows inserted per statement
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    # Clear existing buckets
+    delete_query = session.query(VisitDailyRollup)
+    if tenant_id:
+        delete_query = delete_query.filter(VisitDailyRollup.tenant_id == tenant_id)
+    delete_query.delete(synchronize_session=False)
+
+    # Aggregate raw visits per bucket
+    day_column = func.date(Visit.started_at)
+    query = session.query(
+        Visit.tenant_id,
+        Visit.user_id,
+        Visit.survey_id,
+        day_column.label('day'),
+        func.count(Visit.id).label('total_visits'),
+        func.count(Visit.completed_at).label('completed_visits')
+    ).filter(Visit.started_at.isnot(None))
+    if tenant_id:
+        query = query.filter(Visit.tenant_id == tenant_id)
+    query = query.group_by(Visit.tenant_id, Visit.user_id, Visit.survey_id, day_column)
+
+    # Insert in batches
+    table = VisitDailyRollup.__table__
+    written = 0
+    batch = []
+    for row in query.yield_per(batch_size):
+        batch.append({
+            'tenant_id': row.tenant_id,
+            'user_id': row.user_id,
+            'survey_id': row.survey_id,
+            'day': _to_day(row.day),
+            'total_visits': row.total_visits,
+            'completed_visits': row.completed_visits
+        })
+        if len(batch) >= batch_size:
+            session.execute(table.insert(), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        session.execute(table.insert(), batch)
+        written += len(batch)
+
+    session.commit()
+    return written
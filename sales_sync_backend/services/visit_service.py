@@ -1,22 +1,45 @@
-from datetime import datetime
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy.exc import IntegrityError
+from models.survey import Survey, SurveyQuestion
 from models.visit import Visit, VisitAnswer
+from services.visit_rollup_service import increment_visit_rollup, record_visit_started, record_visit_completed
+from utils.cache import invalidate_tenant_cache
+from utils.db_utils import COUNT_NONE, get_dialect_insert, paginate_query
 
+# Columns list endpoints may sort by
+VISIT_SORT_FIELDS = {
+    'created_at': Visit.created_at,
+    'started_at': Visit.started_at
+}
 
-def get_visits(session, tenant_id, filters=None):
+# Visit types agents can record
+VISIT_TYPES = ('individual', 'shop')
+
+# Rows per multi-row INSERT ... RETURNING statement
+SYNC_INSERT_CHUNK = 500
+
+
+class AnswerValidationError(ValueError):
+    """Raised when visit answers fail validation; errors lists each invalid answer."""
+    
+    def __init__(self, errors):
+        super().__init__('Invalid answers')
+        self.errors = errors
+
+
+def _apply_visit_filters(query, filters):
     """
-    Get visits for a tenant.
+    Apply list filters to a visits query.
     
     Args:
-        session: SQLAlchemy session
-        tenant_id: Tenant ID
+        query: SQLAlchemy query over Visit
         filters: Optional filters
     
     Returns:
-        list: List of visits
+        Query: Filtered query
     """
-    query = session.query(Visit).filter(Visit.tenant_id == tenant_id)
-    
-    # Apply filters
     if filters:
         if 'user_id' in filters:
             query = query.filter(Visit.user_id == filters['user_id'])
@@ -36,7 +59,90 @@ def get_visits(session, tenant_id, filters=None):
             else:
                 query = query.filter(Visit.completed_at.is_(None))
     
-    return query.all()
+    return query
+
+
+def get_visits_query(session, tenant_id, filters=None):
+    """
+    Build the query for a tenant's visits, newest first.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        filters: Optional filters
+    
+    Returns:
+        Query: Visits query
+    """
+    query = session.query(Visit).filter(Visit.tenant_id == tenant_id)
+    
+    # Apply filters
+    query = _apply_visit_filters(query, filters)
+    
+    return query.order_by(Visit.started_at.desc(), Visit.id.desc())
+
+
+def get_visits(session, tenant_id, filters=None, list_params=None):
+    """
+    Get visits for a tenant.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        filters: Optional filters
+        list_params: Optional sort and pagination parameters (see paginate_query)
+    
+    Returns:
+        Page: One page of visits
+    """
+    query = get_visits_query(session, tenant_id, filters)
+    return paginate_query(query, Visit, VISIT_SORT_FIELDS, **(list_params or {}))
+
+
+def get_visits_page(session, tenant_id, filters=None, limit=50, cursor=None, fields=None, include=None):
+    """
+    Get one page of visits, newest first, using keyset pagination.
+    
+    Pages are ordered by (started_at, id) descending and continue strictly
+    after the cursor, so every page is served from the
+    (tenant_id, started_at, id) index at the same cost as the first one.
+    Visits without started_at are not listed.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        filters: Optional filters
+        limit: Maximum number of visits to return
+        cursor: Decoded cursor [started_at, id] from the previous page (optional)
+        fields: Visit fields to load (optional, all fields if omitted)
+        include: Relationships to eager load, 'answers' and/or 'photos' (optional)
+    
+    Returns:
+        tuple: (list of visits, next cursor values or None)
+    
+    Raises:
+        ValueError: If the cursor, fields or include is invalid
+    """
+    query = session.query(Visit).filter(
+        Visit.tenant_id == tenant_id,
+        Visit.started_at.isnot(None)
+    )
+    
+    # Apply filters
+    query = _apply_visit_filters(query, filters)
+    
+    page = paginate_query(
+        query,
+        Visit,
+        VISIT_SORT_FIELDS,
+        sort='started_at',
+        per_page=limit,
+        cursor=cursor,
+        count=COUNT_NONE,
+        fields=fields,
+        include=include
+    )
+    return page.items, page.next_cursor
 
 
 def get_visit_by_id(session, tenant_id, visit_id):
@@ -83,43 +189,60 @@ def create_visit(session, tenant_id, user_id, survey_id, visit_type, geocode=Non
         started_at=datetime.utcnow()
     )
     session.add(visit)
+    record_visit_started(session, visit)
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return visit
 
 
-def complete_visit(session, tenant_id, visit_id, answers=None):
+def complete_visit(session, tenant_id, visit, answers=None):
     """
     Complete a visit.
     
+    Answers are validated against the visit survey's questions in one query
+    and written with a single multi-row insert. If any answer is invalid
+    nothing is written.
+    
     Args:
         session: SQLAlchemy session
         tenant_id: Tenant ID
-        visit_id: Visit ID
+        visit: Visit object, or visit ID to load it
         answers: List of answers (optional)
     
     Returns:
         Visit: Updated visit or None
+    
+    Raises:
+        AnswerValidationError: If any answer is invalid
     """
-    visit = get_visit_by_id(session, tenant_id, visit_id)
+    if not isinstance(visit, Visit):
+        visit = get_visit_by_id(session, tenant_id, visit)
     if not visit:
         return None
     
+    # Validate every answer before writing anything
+    now = datetime.utcnow()
+    rows = []
+    if answers:
+        question_ids = get_survey_question_ids(session, tenant_id, [visit.survey_id]).get(visit.survey_id, set())
+        rows, errors = _build_answer_rows(tenant_id, visit.id, answers, question_ids, now)
+        if errors:
+            raise AnswerValidationError(errors)
+    
     # Update visit
-    visit.completed_at = datetime.utcnow()
+    was_completed = visit.completed_at is not None
+    visit.completed_at = now
     
-    # Add answers if provided
-    if answers:
-        for answer in answers:
-            visit_answer = VisitAnswer(
-                tenant_id=tenant_id,
-                visit_id=visit_id,
-                question_id=answer.get('question_id'),
-                answer_text=answer.get('answer_text'),
-                answer_json=answer.get('answer_json')
-            )
-            session.add(visit_answer)
+    # Add answers in one statement
+    if rows:
+        session.execute(VisitAnswer.__table__.insert().values(rows))
+    
+    # Update daily rollup in the same transaction
+    if not was_completed:
+        record_visit_completed(session, visit)
     
     session.commit()
+    invalidate_tenant_cache(tenant_id)
     return visit
 
 
@@ -133,12 +256,12 @@ def get_visit_answers(session, tenant_id, visit_id):
         visit_id: Visit ID
     
     Returns:
-        list: List of answers
+        Query: Answers query, iterate it or stream it
     """
     return session.query(VisitAnswer).filter(
         VisitAnswer.tenant_id == tenant_id,
         VisitAnswer.visit_id == visit_id
-    ).all()
+    ).order_by(VisitAnswer.created_at, VisitAnswer.id)
 
 
 def get_visit_photos(session, tenant_id, visit_id):
@@ -151,10 +274,356 @@ def get_visit_photos(session, tenant_id, visit_id):
         visit_id: Visit ID
     
     Returns:
-        list: List of photos
+        Query: Photos query, iterate it or stream it
     """
     from models.photo import Photo
     return session.query(Photo).filter(
         Photo.tenant_id == tenant_id,
         Photo.visit_id == visit_id
-    ).all()
\ No newline at end of file
+    ).order_by(Photo.created_at, Photo.id)
+
+
+def _parse_uuid(value):
+    """
+    Parse a UUID from a request value.
+    
+    Raises:
+        ValueError: If the value is not a UUID
+    """
+    if isinstance(value, uuid.UUID):
+        return value
+    if not isinstance(value, str):
+        raise ValueError('not a UUID')
+    return uuid.UUID(value)
+
+
+def _parse_datetime(value):
+    """
+    Parse an ISO 8601 timestamp from a request value as naive UTC.
+    
+    Raises:
+        ValueError: If the value is not an ISO 8601 timestamp
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        raise ValueError('not a timestamp')
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def get_survey_question_ids(session, tenant_id, survey_ids):
+    """
+    Get the question IDs of several surveys in one query.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        survey_ids: Survey IDs
+    
+    Returns:
+        dict: Survey ID -> set of question IDs, for the tenant's surveys only
+    """
+    survey_ids = set(survey_ids)
+    if not survey_ids:
+        return {}
+    
+    rows = session.query(Survey.id, SurveyQuestion.id).outerjoin(
+        SurveyQuestion,
+        SurveyQuestion.survey_id == Survey.id
+    ).filter(
+        Survey.tenant_id == tenant_id,
+        Survey.id.in_(survey_ids)
+    )
+    
+    question_ids = {}
+    for survey_id, question_id in rows:
+        questions = question_ids.setdefault(survey_id, set())
+        if question_id is not None:
+            questions.add(question_id)
+    return question_ids
+
+
+def _build_answer_rows(tenant_id, visit_id, answers, question_ids, created_at):
+    """
+    Validate answers and build visit_answers rows for a multi-row insert.
+    
+    Args:
+        tenant_id: Tenant ID
+        visit_id: Visit ID
+        answers: List of answers
+        question_ids: Question IDs of the visit's survey
+        created_at: Creation timestamp for the rows
+    
+    Returns:
+        tuple: (list of rows, list of {'index', 'error'} for invalid answers)
+    """
+    rows, errors = [], []
+    for index, answer in enumerate(answers or []):
+        if not isinstance(answer, dict):
+            errors.append({'index': index, 'error': 'Answer must be an object'})
+            continue
+        
+        question_id = answer.get('question_id')
+        if question_id is not None:
+            try:
+                question_id = _parse_uuid(question_id)
+            except ValueError:
+                errors.append({'index': index, 'error': 'Invalid question ID'})
+                continue
+            if question_id not in question_ids:
+                errors.append({'index': index, 'error': 'Question does not belong to the visit survey'})
+                continue
+        
+        rows.append({
+            'id': uuid.uuid4(),
+            'tenant_id': tenant_id,
+            'visit_id': visit_id,
+            'question_id': question_id,
+            'answer_text': answer.get('answer_text'),
+            'answer_json': answer.get('answer_json'),
+            'created_at': created_at
+        })
+    return rows, errors
+
+
+def _parse_sync_visit(item):
+    """
+    Validate one visit of a sync batch.
+    
+    Args:
+        item: Visit dictionary from the request
+    
+    Returns:
+        dict: Parsed visit fields
+    
+    Raises:
+        ValueError: With the message to report for the visit
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Visit must be an object')
+    
+    fields = {}
+    for name in ('survey_id', 'shop_id'):
+        if item.get(name) is None:
+            fields[name] = None
+            continue
+        try:
+            fields[name] = _parse_uuid(item[name])
+        except ValueError:
+            raise ValueError(f'Invalid {name}')
+    if fields['survey_id'] is None:
+        raise ValueError('Survey ID is required')
+    
+    if item.get('visit_type') not in VISIT_TYPES:
+        raise ValueError('Visit type must be "individual" or "shop"')
+    fields['visit_type'] = item['visit_type']
+    
+    for name in ('started_at', 'completed_at'):
+        try:
+            fields[name] = _parse_datetime(item.get(name))
+        except ValueError:
+            raise ValueError(f'Invalid {name}, expected an ISO 8601 timestamp')
+    
+    answers = item.get('answers') or []
+    if not isinstance(answers, list):
+        raise ValueError('Answers must be a list')
+    fields['answers'] = answers
+    fields['geocode'] = item.get('geocode')
+    return fields
+
+
+def _insert_visits(session, rows):
+    """
+    Insert visit rows, skipping IDs that already exist.
+    
+    A concurrent replay of the same batch may insert some of the rows
+    first, so only the IDs actually written by this call are returned.
+    
+    Args:
+        session: SQLAlchemy session
+        rows: Visit rows, all with the same created_at
+    
+    Returns:
+        set: IDs of the visits that were inserted
+    """
+    table = Visit.__table__
+    insert = get_dialect_insert(session)
+    if insert is None:
+        return _insert_visits_one_by_one(session, rows)
+    
+    stmt = insert(table).on_conflict_do_nothing(index_elements=[table.c.id])
+    if not session.get_bind().dialect.implicit_returning:
+        result = session.execute(stmt, rows)
+        if result.rowcount == len(rows):
+            return {row['id'] for row in rows}
+        # Some rows were skipped; ours are the ones with this call's created_at
+        return _get_inserted_visit_ids(session, rows)
+    
+    # RETURNING tells which rows a concurrent replay of the batch did not insert first
+    inserted = set()
+    for start in range(0, len(rows), SYNC_INSERT_CHUNK):
+        result = session.execute(stmt.values(rows[start:start + SYNC_INSERT_CHUNK]).returning(table.c.id))
+        inserted.update(visit_id for visit_id, in result)
+    return inserted
+
+
+def _get_inserted_visit_ids(session, rows):
+    """Get the IDs among rows that were written by this transaction, by their created_at."""
+    inserted = set()
+    ids = [row['id'] for row in rows]
+    for start in range(0, len(ids), SYNC_INSERT_CHUNK):
+        inserted.update(visit_id for visit_id, in session.query(Visit.id).filter(
+            Visit.id.in_(ids[start:start + SYNC_INSERT_CHUNK]),
+            Visit.tenant_id == rows[0]['tenant_id'],
+            Visit.user_id == rows[0]['user_id'],
+            Visit.created_at == rows[0]['created_at']
+        ))
+    return inserted
+
+
+def _insert_visits_one_by_one(session, rows):
+    """
+    Insert visit rows on dialects without ON CONFLICT.
+    
+    The batch is tried in one statement first; if an ID already exists, each
+    row is inserted in its own savepoint and duplicates are skipped.
+    """
+    table = Visit.__table__
+    try:
+        with session.begin_nested():
+            session.execute(table.insert(), rows)
+        return {row['id'] for row in rows}
+    except IntegrityError:
+        pass
+    
+    inserted = set()
+    for row in rows:
+        try:
+            with session.begin_nested():
+                session.execute(table.insert(), [row])
+            inserted.add(row['id'])
+        except IntegrityError:
+            continue
+    return inserted
+
+
+def sync_visits(session, tenant_id, user_id, visits):
+    """
+    Create a batch of visits recorded offline, with their answers.
+    
+    Visits carry client-generated IDs, so replaying a batch is safe: visits
+    that already exist are reported and left unchanged. Valid visits are
+    written in one transaction with a constant number of statements, whatever
+    the batch size. A visit with an invalid answer is skipped as a whole.
+    
+    Args:
+        session: SQLAlchemy session
+        tenant_id: Tenant ID
+        user_id: ID of the agent who recorded the visits
+        visits: List of visits with id, survey_id, visit_type and optional
+            shop_id, geocode, started_at, completed_at and answers
+    
+    Returns:
+        list: One {'id', 'status'} result per visit, in request order. status
+            is 'created', 'exists' or 'invalid'; invalid visits also carry
+            'error' and, for invalid answers, 'answer_errors'
+    """
+    results = []
+    candidates = []
+    seen = set()
+    for item in visits:
+        raw_id = item.get('id') if isinstance(item, dict) else None
+        result = {'id': raw_id, 'status': 'invalid'}
+        results.append(result)
+        try:
+            if raw_id is None:
+                raise ValueError('Visit ID is required')
+            try:
+                visit_id = _parse_uuid(raw_id)
+            except ValueError:
+                raise ValueError('Invalid visit ID')
+            if visit_id in seen:
+                raise ValueError('Duplicate visit ID in batch')
+            seen.add(visit_id)
+            candidates.append((result, visit_id, _parse_sync_visit(item)))
+        except ValueError as e:
+            result['error'] = str(e)
+    
+    if not candidates:
+        return results
+    
+    # One query each for existing visits and the surveys' questions
+    existing = dict(session.query(Visit.id, Visit.tenant_id).filter(Visit.id.in_(seen)))
+    question_ids = get_survey_question_ids(session, tenant_id, {fields['survey_id'] for _, _, fields in candidates})
+    
+    now = datetime.utcnow()
+    visit_rows = []
+    answer_rows = {}
+    for result, visit_id, fields in candidates:
+        if visit_id in existing:
+            if str(existing[visit_id]) == str(tenant_id):
+                result['status'] = 'exists'
+            else:
+                result['error'] = 'Visit ID is already in use'
+            continue
+        if fields['survey_id'] not in question_ids:
+            result['error'] = 'Survey not found'
+            continue
+        
+        rows, errors = _build_answer_rows(tenant_id, visit_id, fields['answers'], question_ids[fields['survey_id']], now)
+        if errors:
+            result['error'] = 'Invalid answers'
+            result['answer_errors'] = errors
+            continue
+        
+        visit_rows.append({
+            'id': visit_id,
+            'tenant_id': tenant_id,
+            'survey_id': fields['survey_id'],
+            'user_id': user_id,
+            'visit_type': fields['visit_type'],
+            'geocode': fields['geocode'],
+            'shop_id': fields['shop_id'],
+            'started_at': fields['started_at'] or now,
+            'completed_at': fields['completed_at'],
+            'created_at': now
+        })
+        answer_rows[visit_id] = rows
+    
+    if not visit_rows:
+        return results
+    
+    try:
+        inserted = _insert_visits(session, visit_rows)
+        
+        rows = [row for visit_id in inserted for row in answer_rows[visit_id]]
+        if rows:
+            session.execute(VisitAnswer.__table__.insert(), rows)
+        
+        # One rollup update per (user, survey, day) bucket instead of per visit
+        totals, completed = Counter(), Counter()
+        for row in visit_rows:
+            if row['id'] in inserted:
+                bucket = (row['survey_id'], row['started_at'].date())
+                totals[bucket] += 1
+                completed[bucket] += 1 if row['completed_at'] else 0
+        for (survey_id, day), total in totals.items():
+            increment_visit_rollup(session, tenant_id, user_id, survey_id, day, total=total, completed=completed[(survey_id, day)])
+        
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    
+    for result, visit_id, _ in candidates:
+        if visit_id in inserted:
+            result['status'] = 'created'
+        elif visit_id in answer_rows:
+            # Inserted by a concurrent replay of the same batch
+            result['status'] = 'exists'
+    
+    invalidate_tenant_cache(tenant_id)
+    return results
@@ -1,5 +1,6 @@
 import os
 import sys
+import uuid
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
@@ -166,6 +167,24 @@ def auth_tokens(client, test_user):
     return data
 
 
+@pytest.fixture
+def make_auth_headers(app):
+    """Build Authorization headers from a freshly issued access token."""
+    from flask_jwt_extended import create_access_token
+    
+    def _make_auth_headers(tenant_id, roles=None, user_id=None):
+        with app.app_context():
+            token = create_access_token(identity=str(user_id or uuid.uuid4()), additional_claims={
+                'tenant_id': str(tenant_id),
+                'roles': roles or ['admin']
+            })
+        return {
+            'Authorization': f'Bearer {token}'
+        }
+    
+    return _make_auth_headers
+
+
 @pytest.fixture
 def admin_headers(admin_user, client):
     """Get headers with admin JWT token."""
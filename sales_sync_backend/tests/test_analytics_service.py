@@ -0,0 +1,218 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statement_counter(db_session):
+    """Count SQL statements executed on the test session's connection."""
+    connection = db_session.connection()
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(connection, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(connection, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_shelf_data(db_session, tenant_id, brand_count, visit_count):
+    """Create brands and visits with one shelf photo and one quadrant per brand each."""
+    from models.brand import Brand
+    from models.visit import Visit
+    from models.photo import Photo, ShelfQuadrant
+
+    brands = [Brand(tenant_id=tenant_id, name=f'Brand {uuid.uuid4()}') for _ in range(brand_count)]
+    db_session.add_all(brands)
+    db_session.flush()
+
+    user_id = uuid.uuid4()
+    started_at = datetime.utcnow() - timedelta(days=1)
+    for index in range(visit_count):
+        visit = Visit(
+            tenant_id=tenant_id,
+            survey_id=uuid.uuid4(),
+            user_id=user_id,
+            visit_type='shop' if index % 2 == 0 else 'individual',
+            started_at=started_at,
+            completed_at=started_at + timedelta(hours=1) if index % 4 != 3 else None
+        )
+        photo = Photo(tenant_id=tenant_id, visit=visit, file_url='/uploads/shelf.jpg', purpose='shelf')
+        for brand in brands:
+            photo.shelf_quadrants.append(ShelfQuadrant(
+                tenant_id=tenant_id,
+                brand_id=brand.id,
+                quadrant_coords=[],
+                area_percentage=20.0
+            ))
+        db_session.add(visit)
+        db_session.flush()
+    db_session.commit()
+    return brands
+
+
+def test_get_overview_metrics_figures(db_session, tenant):
+    """Test that the overview returns real conversion and shelf share figures."""
+    from services.analytics_service import get_overview_metrics
+
+    brands = seed_shelf_data(db_session, tenant.id, brand_count=2, visit_count=4)
+
+    metrics = get_overview_metrics(db_session, tenant.id)['metrics']
+    assert metrics['visits']['total'] == 4
+    assert metrics['visits']['completed'] == 3
+    assert metrics['visits']['completion_rate'] == 75.0
+    assert metrics['conversions']['total'] == 2
+    assert metrics['conversions']['rate'] == 100.0
+    assert metrics['shelf_share']['average'] == 20.0
+    assert set(metrics['shelf_share']['by_brand']) == {str(brand.id) for brand in brands}
+    assert metrics['shelf_share']['by_brand'][str(brands[0].id)]['total_photos'] == 4
+
+
+def test_get_overview_metrics_empty_tenant(db_session, tenant):
+    """Test the overview for a tenant without data."""
+    from services.analytics_service import get_overview_metrics
+
+    metrics = get_overview_metrics(db_session, tenant.id)['metrics']
+    assert metrics['visits']['total'] == 0
+    assert metrics['conversions']['rate'] == 0.0
+    assert metrics['shelf_share'] == {'average': 0.0, 'by_brand': {}}
+
+
+def test_get_overview_metrics_statement_count_is_constant(db_session, tenant, statement_counter):
+    """Test that the overview statement count does not grow with data."""
+    from services.analytics_service import get_overview_metrics
+
+    tenant_id = tenant.id
+
+    seed_shelf_data(db_session, tenant_id, brand_count=1, visit_count=1)
+    del statement_counter[:]
+    get_overview_metrics(db_session, tenant_id)
+    small_count = len(statement_counter)
+
+    seed_shelf_data(db_session, tenant_id, brand_count=5, visit_count=20)
+    del statement_counter[:]
+    get_overview_metrics(db_session, tenant_id)
+    large_count = len(statement_counter)
+
+    assert small_count == 1
+    assert large_count == small_count
+
+
+def test_get_shelf_share_metrics_sql_and_stream_agree(db_session, tenant):
+    """Test that the SQL aggregate and streaming fallback return the same figures."""
+    from models.brand import Brand
+    from models.photo import ShelfQuadrant
+    from services.analytics_service import get_shelf_share_metrics
+
+    brands = seed_shelf_data(db_session, tenant.id, brand_count=3, visit_count=2)
+
+    # Give one brand distinct areas and add a brand without quadrants
+    quadrants = db_session.query(ShelfQuadrant).filter(ShelfQuadrant.brand_id == brands[0].id).all()
+    quadrants[0].area_percentage = 10.0
+    quadrants[1].area_percentage = 30.0
+    db_session.add(Brand(tenant_id=tenant.id, name='Unmarked Brand'))
+    db_session.commit()
+
+    sql_metrics = get_shelf_share_metrics(db_session, tenant.id, strategy='sql')
+    stream_metrics = get_shelf_share_metrics(db_session, tenant.id, strategy='stream')
+
+    assert sql_metrics == stream_metrics
+    assert sql_metrics['total_photos'] == 2
+    assert sql_metrics['total_quadrants'] == 6
+    assert len(sql_metrics['by_brand']) == 4
+    assert sql_metrics['by_brand'][str(brands[0].id)]['average_area_percentage'] == 20.0
+    assert sql_metrics['by_brand'][str(brands[0].id)]['total_photos'] == 2
+    assert sql_metrics['average_shelf_share'] == 15.0
+
+
+def test_get_call_cycle_coverage_metrics(db_session, tenant):
+    """Test call cycle coverage per cycle and overall."""
+    from models.call_cycle import CallCycle, CallCycleLocation
+    from models.visit import Visit
+    from services.analytics_service import get_call_cycle_coverage_metrics
+
+    shop_a, shop_b, shop_c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cycle1 = CallCycle(tenant_id=tenant.id, name='Cycle 1', frequency='weekly')
+    cycle2 = CallCycle(tenant_id=tenant.id, name='Cycle 2', frequency='weekly')
+    db_session.add_all([cycle1, cycle2])
+    db_session.flush()
+    db_session.add_all([
+        CallCycleLocation(call_cycle_id=cycle1.id, shop_id=shop_a, order_num=1),
+        CallCycleLocation(call_cycle_id=cycle1.id, shop_id=shop_b, order_num=2),
+        CallCycleLocation(call_cycle_id=cycle1.id, shop_id=None, order_num=3),
+        CallCycleLocation(call_cycle_id=cycle2.id, shop_id=shop_a, order_num=1),
+        CallCycleLocation(call_cycle_id=cycle2.id, shop_id=shop_c, order_num=2),
+    ])
+
+    # Two completed visits to shop A, one open visit to shop B
+    started_at = datetime.utcnow() - timedelta(days=1)
+    for shop_id, completed in [(shop_a, True), (shop_a, True), (shop_b, False)]:
+        db_session.add(Visit(
+            tenant_id=tenant.id,
+            survey_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            visit_type='shop',
+            shop_id=shop_id,
+            started_at=started_at,
+            completed_at=started_at if completed else None
+        ))
+    db_session.commit()
+
+    metrics = get_call_cycle_coverage_metrics(db_session, tenant.id)
+    cycle1_metrics = metrics['by_call_cycle'][str(cycle1.id)]
+    cycle2_metrics = metrics['by_call_cycle'][str(cycle2.id)]
+    assert cycle1_metrics == {
+        'call_cycle_id': str(cycle1.id),
+        'call_cycle_name': 'Cycle 1',
+        'total_locations': 3,
+        'visited_locations': 1,
+        'coverage_percentage': (1 / 3) * 100.0
+    }
+    assert cycle2_metrics['visited_locations'] == 1
+    assert cycle2_metrics['coverage_percentage'] == 50.0
+    assert metrics['total_locations'] == 5
+    assert metrics['visited_locations'] == 1
+    assert metrics['overall_coverage'] == 20.0
+
+
+def test_get_call_cycle_coverage_metrics_benchmark(db_session, tenant):
+    """Benchmark coverage for a synthetic tenant with 500 cycles and 50k locations."""
+    import time
+    from models.call_cycle import CallCycle, CallCycleLocation
+    from models.visit import Visit
+    from services.analytics_service import get_call_cycle_coverage_metrics
+
+    tenant_id = tenant.id
+    cycle_count, locations_per_cycle = 500, 100
+    cycle_ids = [uuid.uuid4() for _ in range(cycle_count)]
+    shop_ids = [uuid.uuid4() for _ in range(cycle_count * locations_per_cycle)]
+    started_at = datetime.utcnow() - timedelta(days=1)
+
+    db_session.execute(CallCycle.__table__.insert(), [
+        {'id': cycle_id, 'tenant_id': tenant_id, 'name': f'Cycle {index}', 'frequency': 'weekly'}
+        for index, cycle_id in enumerate(cycle_ids)
+    ])
+    db_session.execute(CallCycleLocation.__table__.insert(), [
+        {'call_cycle_id': cycle_ids[index // locations_per_cycle], 'shop_id': shop_id, 'order_num': index % locations_per_cycle}
+        for index, shop_id in enumerate(shop_ids)
+    ])
+    # Every other shop has a completed visit
+    db_session.execute(Visit.__table__.insert(), [
+        {'tenant_id': tenant_id, 'survey_id': cycle_ids[0], 'user_id': cycle_ids[0], 'visit_type': 'shop',
+         'shop_id': shop_id, 'started_at': started_at, 'completed_at': started_at}
+        for shop_id in shop_ids[::2]
+    ])
+    db_session.commit()
+
+    start = time.perf_counter()
+    metrics = get_call_cycle_coverage_metrics(db_session, tenant_id)
+    elapsed = time.perf_counter() - start
+
+    assert len(metrics['by_call_cycle']) == cycle_count
+    assert metrics['total_locations'] == len(shop_ids)
+    assert metrics['visited_locations'] == len(shop_ids) // 2
+    assert metrics['overall_coverage'] == 50.0
+    assert elapsed < 5.0, f'call cycle coverage: {cycle_count} cycles, {len(shop_ids)} locations took {elapsed:.3f}s'
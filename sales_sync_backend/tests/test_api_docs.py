@@ -0,0 +1,57 @@
+import gzip
+import json
+
+
+def test_spec_is_built_once(app, client, monkeypatch):
+    """Test that the spec is built on the first request and then served from cache."""
+    import utils.api_docs as api_docs
+
+    calls = []
+    build_spec = api_docs.build_spec
+    monkeypatch.setattr(api_docs, 'build_spec', lambda app: calls.append(1) or build_spec(app))
+    app.extensions.pop('openapi_spec', None)
+
+    first = client.get('/api/docs/swagger.json')
+    second = client.get('/api/docs/swagger.json')
+    assert first.status_code == 200
+    assert first.data == second.data
+    assert len(calls) == 1
+    assert json.loads(first.data)['info']['title'] == 'Sales-Sync API'
+
+
+def test_spec_etag_and_gzip(client):
+    """Test conditional requests and gzip encoding of the spec."""
+    response = client.get('/api/docs/swagger.json')
+    etag = response.headers['ETag']
+    assert response.headers['Vary'] == 'Accept-Encoding'
+
+    not_modified = client.get('/api/docs/swagger.json', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+
+    compressed = client.get('/api/docs/swagger.json', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == etag[:-1] + '-gzip"'
+    assert gzip.decompress(compressed.data) == response.data
+
+    not_modified = client.get('/api/docs/swagger.json', headers={'If-None-Match': compressed.headers['ETag'], 'Accept-Encoding': 'gzip'})
+    assert not_modified.status_code == 304
+    assert not_modified.headers['ETag'] == compressed.headers['ETag']
+
+
+def test_documented_views_use_url_rule(app):
+    """Test that document_api operations are registered under their Flask rules."""
+    from flask import Flask
+    from utils.api_decorators import document_api
+    from utils.api_docs import build_spec
+
+    docs_app = Flask(__name__)
+
+    @docs_app.route('/api/things/<int:thing_id>', methods=['GET', 'PUT'])
+    @document_api(tags=['things'], summary='Get a thing')
+    def get_thing(thing_id):
+        return ''
+
+    paths = build_spec(docs_app)['paths']
+    assert paths['/api/things/{thing_id}']['get']['summary'] == 'Get a thing'
+    assert 'put' in paths['/api/things/{thing_id}']
@@ -0,0 +1,114 @@
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def count_decodes():
+    """Count access token decodes by flask_jwt_extended."""
+    from unittest import mock
+    import flask_jwt_extended.view_decorators as view_decorators
+
+    calls = []
+    decode_token = view_decorators.decode_token
+
+    def counting_decode_token(*args, **kwargs):
+        calls.append(args)
+        return decode_token(*args, **kwargs)
+
+    with mock.patch.object(view_decorators, 'decode_token', counting_decode_token):
+        yield calls
+
+
+def test_token_decoded_once_per_request(client, make_auth_headers):
+    """Test that middleware, jwt_required, tenant_required and role checks share one decode."""
+    headers = make_auth_headers(uuid.uuid4(), roles=['admin'])
+
+    # jwt_required + tenant_required
+    with count_decodes() as calls:
+        response = client.get('/api/teams', headers=headers)
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+    # jwt_required + admin_required
+    with count_decodes() as calls:
+        response = client.get('/api/admin/users/activity', headers=headers)
+    assert response.status_code == 200
+    assert len(calls) == 1
+
+
+def test_auth_errors_unchanged(client, make_auth_headers):
+    """Test missing, invalid and under-privileged tokens."""
+    assert client.get('/api/teams').status_code == 401
+    assert client.get('/api/teams', headers={'Authorization': 'Bearer not-a-token'}).status_code == 422
+
+    headers = make_auth_headers(uuid.uuid4(), roles=['agent'])
+    assert client.get('/api/admin/users/activity', headers=headers).status_code == 403
+
+
+def test_super_admin_tenant_override(app, make_auth_headers):
+    """Test that X-Tenant-ID only overrides the tenant for super admins."""
+    from utils.auth_context import load_auth_context
+
+    tenant_id, other_tenant_id = uuid.uuid4(), uuid.uuid4()
+    for roles, expected in [(['super_admin'], str(other_tenant_id)), (['admin'], str(tenant_id))]:
+        headers = dict(make_auth_headers(tenant_id, roles=roles), **{'X-Tenant-ID': str(other_tenant_id)})
+        with app.test_request_context('/api/teams', headers=headers):
+            context = load_auth_context()
+            assert context.authenticated
+            assert context.tenant_id == expected
+            assert context.roles == frozenset(roles)
+            assert load_auth_context() is context
+
+
+def test_role_masks():
+    """Test role bits, rank masks and conversions."""
+    from models.role import ROLE_BITS, ROLE_MASKS_AT_LEAST, ROLE_NAMES, mask_to_roles, roles_to_mask
+
+    assert len(set(ROLE_BITS.values())) == len(ROLE_NAMES)
+    assert mask_to_roles(roles_to_mask(['super_admin', 'agent', 'unknown'])) == ['agent', 'super_admin']
+    assert mask_to_roles(ROLE_MASKS_AT_LEAST['national_manager']) == ['national_manager', 'admin', 'super_admin']
+    assert ROLE_MASKS_AT_LEAST['agent'] == (1 << len(ROLE_NAMES)) - 1
+
+
+def test_role_mask_claim(app, client, make_auth_headers):
+    """Test that generated tokens carry a role mask and decorators accept both token formats."""
+    from flask_jwt_extended import create_access_token, decode_token
+    from models.role import ROLE_BITS
+    from utils.auth_context import ROLE_MASK_CLAIM
+
+    with app.app_context():
+        agent_token = create_access_token(identity=str(uuid.uuid4()), additional_claims={
+            'tenant_id': str(uuid.uuid4()),
+            ROLE_MASK_CLAIM: ROLE_BITS['agent'] | ROLE_BITS['team_leader']
+        })
+        admin_token = create_access_token(identity=str(uuid.uuid4()), additional_claims={
+            'tenant_id': str(uuid.uuid4()),
+            ROLE_MASK_CLAIM: ROLE_BITS['admin']
+        })
+        assert 'roles' not in decode_token(agent_token)
+
+    # tenant_required and admin_required
+    assert client.get('/api/teams', headers={'Authorization': f'Bearer {agent_token}'}).status_code == 200
+    assert client.get('/api/admin/users/activity', headers={'Authorization': f'Bearer {agent_token}'}).status_code == 403
+    assert client.get('/api/admin/users/activity', headers={'Authorization': f'Bearer {admin_token}'}).status_code == 200
+
+    # Tokens with role names still work
+    assert client.get('/api/admin/users/activity', headers=make_auth_headers(uuid.uuid4(), roles=['admin'])).status_code == 200
+
+
+def test_generate_tokens_role_mask(app, db_session, admin_user):
+    """Test that login tokens encode the user's roles as a mask."""
+    from flask_jwt_extended import decode_token
+    from models.role import ROLE_BITS
+    from services.auth_service import generate_tokens, refresh_access_token
+    from utils.auth_context import ROLE_MASK_CLAIM
+
+    with app.app_context():
+        tokens = generate_tokens(admin_user)
+        claims = decode_token(tokens['refresh_token'])
+        assert claims[ROLE_MASK_CLAIM] == ROLE_BITS['admin']
+        assert 'roles' not in claims
+
+        access_claims = decode_token(refresh_access_token(claims['sub'], claims))
+        assert access_claims[ROLE_MASK_CLAIM] == ROLE_BITS['admin']
+        assert access_claims['tenant_id'] == str(admin_user.tenant_id)
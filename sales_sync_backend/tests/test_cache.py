@@ -0,0 +1,122 @@
+import time
+import uuid
+
+
+def test_memory_backend_lru_and_ttl():
+    """Test LRU eviction and TTL expiry of the memory backend."""
+    from utils.cache import MemoryCacheBackend
+
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set('a', 1, ttl=60)
+    backend.set('b', 2, ttl=60)
+    assert backend.get('a') == 1
+    backend.set('c', 3, ttl=60)
+
+    # 'b' was least recently used
+    assert backend.get('b') is None
+    assert backend.get('a') == 1
+    assert backend.get('c') == 3
+
+    backend.set('d', 4, ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get('d') is None
+
+
+def test_invalidate_tenant_changes_key():
+    """Test that bumping the tenant generation changes cache keys."""
+    from utils.cache import AnalyticsCache, MemoryCacheBackend
+
+    cache = AnalyticsCache(MemoryCacheBackend(), ttl=60)
+    tenant_id, other_tenant_id = uuid.uuid4(), uuid.uuid4()
+    key = cache.make_key(tenant_id, 'overview', {'user_id': None})
+    other_key = cache.make_key(other_tenant_id, 'overview', {'user_id': None})
+    cache.set(key, {'metrics': {}})
+
+    cache.invalidate_tenant(tenant_id)
+
+    assert cache.make_key(tenant_id, 'overview', {'user_id': None}) != key
+    assert cache.make_key(other_tenant_id, 'overview', {'user_id': None}) == other_key
+
+
+def test_analytics_response_cache_header(app, client, make_auth_headers):
+    """Test hit/miss reporting and write-driven invalidation of analytics responses."""
+    from utils.cache import invalidate_tenant_cache
+
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id)
+
+    response = client.get('/api/analytics/visits?group_by=week', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+
+    response = client.get('/api/analytics/visits?group_by=week', headers=headers)
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'HIT'
+
+    # Different parameters are a different entry
+    response = client.get('/api/analytics/visits?group_by=month', headers=headers)
+    assert response.headers['X-Cache'] == 'MISS'
+
+    # Other tenants never share entries
+    response = client.get('/api/analytics/visits?group_by=week', headers=make_auth_headers(uuid.uuid4()))
+    assert response.headers['X-Cache'] == 'MISS'
+
+    with app.app_context():
+        invalidate_tenant_cache(tenant_id)
+
+    response = client.get('/api/analytics/visits?group_by=week', headers=headers)
+    assert response.headers['X-Cache'] == 'MISS'
+
+
+def test_reports_after_a_write_are_computed_on_primary(app, client, make_auth_headers, tmp_path):
+    """Test that a lagging replica's result is not cached right after a write."""
+    from datetime import datetime
+    from models import Base
+    from models.visit import Visit
+    from utils.cache import invalidate_tenant_cache
+    from utils.database import get_engine, init_database
+
+    # The replica has not caught up with the visit yet
+    replica = get_engine(f'sqlite:///{tmp_path}/replica.db')
+    Base.metadata.create_all(replica)
+    app.config['DATABASE_REPLICA_URLS'] = str(replica.url)
+    init_database(app)
+
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id)
+    response = client.get('/api/analytics/overview', headers=headers)
+    assert response.json['metrics']['visits']['total'] == 0
+
+    app.db_session.execute(Visit.__table__.insert(), [{
+        'tenant_id': tenant_id, 'survey_id': uuid.uuid4(), 'user_id': uuid.uuid4(),
+        'visit_type': 'shop', 'started_at': datetime.utcnow()
+    }])
+    app.db_session.commit()
+    with app.app_context():
+        invalidate_tenant_cache(tenant_id)
+
+    # Right after the write the miss is computed on the primary and cached
+    response = client.get('/api/analytics/overview', headers=headers)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.json['metrics']['visits']['total'] == 1
+    response = client.get('/api/analytics/overview', headers=headers)
+    assert response.headers['X-Cache'] == 'HIT'
+    assert response.json['metrics']['visits']['total'] == 1
+
+
+def test_brand_writes_invalidate_tenant_cache(app, db_session, tenant):
+    """Test that creating, updating and deleting a brand bumps the tenant generation."""
+    from services.brand_service import create_brand, delete_brand, update_brand
+    from utils.cache import get_analytics_cache
+
+    with app.app_context():
+        cache = get_analytics_cache()
+        keys = [cache.make_key(tenant.id, 'overview', {})]
+        brand = create_brand(db_session, tenant.id, 'Brand')
+        keys.append(cache.make_key(tenant.id, 'overview', {}))
+        update_brand(db_session, tenant.id, brand.id, {'name': 'Renamed'})
+        keys.append(cache.make_key(tenant.id, 'overview', {}))
+        delete_brand(db_session, tenant.id, brand.id)
+        keys.append(cache.make_key(tenant.id, 'overview', {}))
+
+    assert len(set(keys)) == 4
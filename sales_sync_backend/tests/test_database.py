@@ -0,0 +1,146 @@
+import uuid
+
+import pytest
+
+
+def test_engine_options_from_config():
+    """Test pool options for queue, null and SQLite configurations."""
+    from sqlalchemy.pool import NullPool
+    from utils.database import MeteredQueuePool, get_engine_options
+
+    config = {'DB_POOL_SIZE': 3, 'DB_MAX_OVERFLOW': 2, 'DB_POOL_TIMEOUT': 5, 'DB_POOL_RECYCLE': 600,
+              'DB_POOL_PRE_PING': True, 'DB_CONNECT_TIMEOUT': 4, 'DB_STATEMENT_TIMEOUT': 30000}
+    options = get_engine_options(config, 'postgresql://db/sales_sync')
+    assert options['poolclass'] is MeteredQueuePool
+    assert (options['pool_size'], options['max_overflow'], options['pool_recycle']) == (3, 2, 600)
+    assert options['connect_args'] == {'connect_timeout': 4, 'options': '-c statement_timeout=30000'}
+
+    # PgBouncer mode leaves pooling and startup parameters to the pooler
+    options = get_engine_options(dict(config, DB_POOL_MODE='null'), 'postgresql://db/sales_sync')
+    assert options == {'poolclass': NullPool, 'connect_args': {'connect_timeout': 4}}
+
+    assert get_engine_options(config, 'sqlite:///test.db') == {}
+    with pytest.raises(ValueError):
+        get_engine_options({'DB_POOL_MODE': 'bouncy'}, 'postgresql://db/sales_sync')
+
+
+def test_engines_are_shared(app):
+    """Test that apps and init_db share one engine per URL and options."""
+    from app import create_app
+    from utils.database import get_app_engine
+
+    assert create_app('testing').db_engine is app.db_engine
+    assert get_app_engine(app) is app.db_engine
+
+
+def test_pool_metrics_and_fork_guard():
+    """Test wait and timeout metrics, and that connections from another PID are replaced."""
+    from sqlalchemy import exc
+    from utils.database import MeteredQueuePool, get_engine
+
+    engine = get_engine(f'sqlite:///file:{uuid.uuid4()}?mode=memory&uri=true', poolclass=MeteredQueuePool,
+                        pool_size=1, max_overflow=0, pool_timeout=0.05)
+    metrics = engine.pool_metrics
+
+    connection = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    stats = metrics.to_dict()
+    assert stats['checkouts'] == 1
+    assert stats['checked_out'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['wait_max_ms'] >= 50
+
+    # Pretend the pooled connection was opened by a parent process
+    connection.connection._connection_record.info['pid'] = -1
+    connection.close()
+    with engine.connect():
+        pass
+    stats = metrics.to_dict()
+    assert stats['connects'] == 2
+    assert stats['checked_out'] == 0
+
+
+def test_db_pool_stats_endpoint(client, make_auth_headers):
+    """Test that pool stats are only visible to super admins."""
+    response = client.get('/api/admin/db/pool', headers=make_auth_headers(uuid.uuid4(), roles=['super_admin']))
+    assert response.status_code == 200
+    assert response.json['engines']
+    assert 'checkouts' in response.json['engines'][0]['metrics']
+
+    response = client.get('/api/admin/db/pool', headers=make_auth_headers(uuid.uuid4(), roles=['admin']))
+    assert response.status_code == 403
+
+
+def seed_audit_log(engine, action):
+    """Create the schema on an engine and add one audit log."""
+    from sqlalchemy.orm import sessionmaker
+    from models import Base
+    from models.audit import AuditLog
+
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(AuditLog(tenant_id=None, user_id=uuid.uuid4(), action=action))
+    session.commit()
+    session.close()
+
+
+def test_reports_read_from_replica(app, client, make_auth_headers, tmp_path):
+    """Test replica routing, the strong consistency header and read-your-writes."""
+    from flask import g
+    from models.team import Team
+    from utils.database import get_engine, get_read_session, init_database
+
+    replica_url = f'sqlite:///{tmp_path}/replica.db'
+    seed_audit_log(get_engine(replica_url), 'replica')
+    app.config['DATABASE_REPLICA_URLS'] = replica_url
+    init_database(app)
+
+    headers = make_auth_headers(uuid.uuid4(), roles=['super_admin'])
+    response = client.get('/api/audit/all', headers=headers)
+    assert [log['action'] for log in response.json['logs']] == ['replica']
+
+    response = client.get('/api/audit/all', headers=dict(headers, **{'X-Read-Consistency': 'strong'}))
+    assert response.json['logs'] == []
+
+    with app.test_request_context('/'):
+        assert get_read_session() is app.db_read_session
+        app.db_session.flush()
+        assert not g.get('db_primary_write')
+        app.db_session.add(Team(tenant_id=uuid.uuid4(), name='Team'))
+        app.db_session.flush()
+        assert get_read_session() is app.db_session
+        app.db_session.rollback()
+
+
+def test_unhealthy_replica_falls_back_to_primary(app, tmp_path):
+    """Test that replicas failing the health check are skipped."""
+    from utils.database import ReplicaRouter, get_engine
+
+    healthy = get_engine(f'sqlite:///{tmp_path}/healthy.db')
+    broken = get_engine(f'sqlite:///{tmp_path}/missing/broken.db')
+
+    router = ReplicaRouter(app.db_engine, [healthy, broken], health_interval=60)
+    assert [router.get_engine() for _ in range(4)] == [healthy, healthy, healthy, healthy]
+
+    router = ReplicaRouter(app.db_engine, [broken])
+    assert router.get_engine() is app.db_engine
+
+    router = ReplicaRouter(app.db_engine, [healthy], health_interval=60)
+    router.mark_unhealthy(healthy)
+    assert router.get_engine() is app.db_engine
+
+
+def test_failed_replica_read_retries_on_primary(app, client, make_auth_headers, tmp_path):
+    """Test that a replica failing mid-request is marked unhealthy and the read retried."""
+    from utils.database import get_engine, init_database
+
+    # Answers the health check, but has no tables
+    broken = get_engine(f'sqlite:///{tmp_path}/empty.db')
+    app.config['DATABASE_REPLICA_URLS'] = str(broken.url)
+    init_database(app)
+
+    response = client.get('/api/audit/all', headers=make_auth_headers(uuid.uuid4(), roles=['super_admin']))
+    assert response.status_code == 200
+    assert response.json['logs'] == []
+    assert app.db_router.get_engine() is app.db_engine
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+
+
+def seed_brands(db_session, tenant_id, names):
+    """Create brands with the given names."""
+    from models.brand import Brand
+
+    brands = [Brand(tenant_id=tenant_id, name=name) for name in names]
+    db_session.add_all(brands)
+    db_session.commit()
+    return brands
+
+
+def test_paginate_query_offset_and_keyset(db_session, tenant):
+    """Test that offset pages and cursor pages walk the same sorted rows."""
+    from services.brand_service import get_brands
+
+    names = [f'Brand {letter}' for letter in 'EDCBAFG']
+    seed_brands(db_session, tenant.id, names)
+
+    first = get_brands(db_session, tenant.id, list_params={'sort': 'name', 'order': 'asc', 'per_page': 3})
+    assert [brand.name for brand in first.items] == ['Brand A', 'Brand B', 'Brand C']
+    assert first.total == 7
+    assert first.total_exact
+    assert first.next_cursor is not None
+
+    second = get_brands(db_session, tenant.id, list_params={'sort': 'name', 'order': 'asc', 'per_page': 3, 'page': 2})
+    assert [brand.name for brand in second.items] == ['Brand D', 'Brand E', 'Brand F']
+
+    # Following cursors visits every row exactly once
+    seen = list(first.items)
+    cursor = first.next_cursor
+    while cursor:
+        page = get_brands(db_session, tenant.id, list_params={'sort': 'name', 'order': 'asc', 'per_page': 3, 'cursor': cursor})
+        assert page.total is None
+        seen.extend(page.items)
+        cursor = page.next_cursor
+    assert [brand.name for brand in seen] == sorted(names)
+
+
+def test_paginate_query_rejects_unknown_sort(db_session, tenant):
+    """Test that only whitelisted columns can be sorted by."""
+    from services.brand_service import get_brands
+
+    with pytest.raises(ValueError):
+        get_brands(db_session, tenant.id, list_params={'sort': 'tenant_id'})
+    with pytest.raises(ValueError):
+        get_brands(db_session, tenant.id, list_params={'order': 'sideways'})
+    with pytest.raises(ValueError):
+        get_brands(db_session, tenant.id, list_params={'sort': 'created_at', 'cursor': ['not-a-date', 'x']})
+
+
+def test_count_query_strategies(db_session, tenant):
+    """Test exact, capped and disabled counts."""
+    from models.brand import Brand
+    from utils.db_utils import count_query
+
+    seed_brands(db_session, tenant.id, [f'Brand {index}' for index in range(5)])
+    query = db_session.query(Brand).filter(Brand.tenant_id == tenant.id)
+
+    assert count_query(query, 'exact') == (5, True)
+    assert count_query(query, 'capped', cap=10) == (5, True)
+    assert count_query(query, 'capped', cap=3) == (3, False)
+    # Estimates fall back to a capped count outside PostgreSQL
+    assert count_query(query, 'estimate', cap=3) == (3, False)
+    assert count_query(query, 'none') == (None, False)
+
+
+def test_list_endpoint_pagination(app, client, make_auth_headers):
+    """Test page metadata and parameter validation on a list endpoint."""
+    from models.team import Team
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    for index in range(3):
+        session.add(Team(tenant_id=tenant_id, name=f'Team {index}'))
+    session.commit()
+    session.remove()
+
+    headers = make_auth_headers(tenant_id)
+    response = client.get('/api/teams?sort=name&order=asc&per_page=2', headers=headers)
+    assert response.status_code == 200
+    assert [team['name'] for team in response.json['teams']] == ['Team 0', 'Team 1']
+    assert response.json['total'] == 3
+    assert response.json['pages'] == 2
+    assert response.json['next_cursor']
+
+    response = client.get(f"/api/teams?sort=name&order=asc&per_page=2&cursor={response.json['next_cursor']}", headers=headers)
+    assert [team['name'] for team in response.json['teams']] == ['Team 2']
+    assert response.json['next_cursor'] is None
+
+    response = client.get('/api/teams?sort=password_hash', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,90 @@
+import math
+import uuid
+
+import numpy as np
+import pytest
+
+from utils.geometry import parse_polygons, polygon_areas, resolve_frame, union_area_percentage, union_area_percentages
+
+
+def rectangle(x, y, width, height):
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+
+def test_polygon_areas_shoelace():
+    """Test areas of polygons of either orientation in one call."""
+    triangle = [[0, 0], [100, 0], [0, 100]]
+    polygons = parse_polygons([triangle, triangle[::-1], rectangle(5, 5, 3, 4)])
+    assert polygon_areas(polygons).tolist() == [5000.0, 5000.0, 12.0]
+
+
+def test_parse_polygons_shapes():
+    """Test the supported coordinate forms and rejection of others."""
+    assert len(parse_polygons([[0, 0], [1, 0], [1, 1]])) == 1
+    assert len(parse_polygons([{'x': 0, 'y': 0}, {'x': 1, 'y': 0}, {'x': 1, 'y': 1}])) == 1
+    assert len(parse_polygons({'points': [[0, 0], [1, 0], [1, 1]]})) == 1
+    assert len(parse_polygons([rectangle(0, 0, 1, 1), {'points': [[0, 0], [1, 0], [1, 1]]}])) == 2
+    assert parse_polygons([]) == []
+    with pytest.raises(ValueError):
+        parse_polygons([{'left': 0}])
+    with pytest.raises(ValueError):
+        parse_polygons('0,0,1,1')
+
+
+def test_union_counts_overlaps_once_and_clips_to_frame():
+    """Test union percentages per group, including overlap, clipping and unknown frames."""
+    groups = [
+        parse_polygons([rectangle(0, 0, 50, 50)]),
+        parse_polygons([rectangle(0, 0, 50, 50), rectangle(25, 25, 50, 50)]),
+        parse_polygons([rectangle(0, 0, 50, 50), rectangle(10, 10, 20, 20)]),
+        parse_polygons([rectangle(-10, -10, 20, 20)]),
+        [],
+        parse_polygons([rectangle(0, 0, 1, 1)])
+    ]
+    frames = [(100, 100)] * 5 + [None]
+    percentages = union_area_percentages(groups, frames)
+    assert percentages[:5].tolist() == [25.0, 43.75, 25.0, 1.0, 0.0]
+    assert math.isnan(percentages[5])
+
+
+def test_union_of_overlapping_circles():
+    """Test slanted overlapping edges against the exact lens area."""
+    angles = np.linspace(0, 2 * np.pi, 720, endpoint=False)
+    first = np.c_[2 + np.cos(angles), 2 + np.sin(angles)]
+    second = np.c_[3 + np.cos(angles), 2 + np.sin(angles)]
+    # Two unit circles one radius apart, less the polygon approximation error
+    exact = 2 * math.pi - (2 * math.pi / 3 - math.sqrt(3) / 2)
+    area = union_area_percentage([first, second], (4, 4)) * 16 / 100
+    assert area == pytest.approx(exact, rel=1e-3)
+
+
+def test_resolve_frame():
+    """Test that normalized coordinates get a unit frame and others need the photo size."""
+    normalized = parse_polygons([rectangle(0.1, 0.1, 0.5, 0.5)])
+    pixels = parse_polygons([rectangle(10, 10, 50, 50)])
+    assert resolve_frame(normalized) == (1.0, 1.0)
+    assert resolve_frame(pixels) is None
+    assert resolve_frame(pixels, (640, 480)) == (640.0, 480.0)
+
+
+def test_shelf_quadrant_area_from_photo_size(db_session, tenant):
+    """Test that quadrants are measured against the photo, and recomputed in bulk."""
+    from models.photo import Photo, ShelfQuadrant
+    from services.photo_service import create_shelf_quadrant, get_photo_frame, recompute_shelf_areas
+
+    photo = Photo(tenant_id=tenant.id, visit_id=uuid.uuid4(), file_url='/uploads/shelf.jpg',
+                  image_metadata={'width': 200, 'height': 100})
+    db_session.add(photo)
+    db_session.commit()
+
+    coords = [rectangle(0, 0, 100, 50), rectangle(50, 0, 100, 50)]
+    quadrant = create_shelf_quadrant(db_session, tenant.id, photo.id, uuid.uuid4(), coords, frame=get_photo_frame(photo))
+    assert float(quadrant.area_percentage) == 37.5
+
+    # Stale values from the old approximation are corrected
+    quadrant.area_percentage = 10.0
+    db_session.add(ShelfQuadrant(tenant_id=tenant.id, photo_id=photo.id, brand_id=uuid.uuid4(), quadrant_coords=[{'bad': 1}]))
+    db_session.commit()
+    assert recompute_shelf_areas(db_session, tenant.id) == (1, 1)
+    db_session.expire_all()
+    assert float(db_session.query(ShelfQuadrant).get(quadrant.id).area_percentage) == 37.5
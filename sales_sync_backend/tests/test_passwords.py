@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+
+
+def test_pool_hashes_and_verifies():
+    """Test hashing and verification in the process pool."""
+    from utils.passwords import PasswordHasher
+
+    hasher = PasswordHasher(rounds=4, workers=1)
+    try:
+        password_hash = hasher.hash('Password123')
+        assert hasher.verify('Password123', password_hash)
+        assert not hasher.verify('wrong', password_hash)
+    finally:
+        hasher.shutdown()
+
+
+def test_saturated_pool_rejects():
+    """Test that requests beyond the queue limit fail fast instead of waiting."""
+    from utils.passwords import PasswordHasher, PasswordHasherBusy
+
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=0, retry_after=3)
+    # Occupy the only slot
+    hasher._slots.acquire()
+    with pytest.raises(PasswordHasherBusy) as error:
+        hasher.hash('Password123')
+    assert error.value.retry_after == 3
+
+
+def test_needs_rehash():
+    """Test that only hashes below the configured cost need rehashing."""
+    from utils.passwords import PasswordHasher
+
+    weak_hash = PasswordHasher(rounds=4).hash('Password123')
+    assert PasswordHasher(rounds=5).needs_rehash(weak_hash)
+    assert not PasswordHasher(rounds=4).needs_rehash(weak_hash)
+    assert not PasswordHasher(rounds=4).needs_rehash(PasswordHasher(rounds=5).hash('Password123'))
+    assert not PasswordHasher(rounds=4).needs_rehash('not-a-hash')
+
+
+def test_login_rehashes_weak_hash(app, db_session, tenant):
+    """Test that a successful login upgrades a hash made with a lower cost."""
+    from passlib.hash import bcrypt
+    from models.user import User
+    from services.auth_service import authenticate_user
+    from utils.passwords import PasswordHasher
+
+    user = User(tenant_id=tenant.id, email='weak@example.com', first_name='Weak', last_name='Hash',
+                password_hash=PasswordHasher(rounds=4).hash('Password123'))
+    db_session.add(user)
+    db_session.commit()
+
+    app.config['BCRYPT_ROUNDS'] = 5
+    app.extensions['password_hasher'] = PasswordHasher(rounds=5)
+    with app.app_context():
+        assert authenticate_user(db_session, 'weak@example.com', 'wrong') is None
+        assert bcrypt.from_string(user.password_hash).rounds == 4
+
+        assert authenticate_user(db_session, 'weak@example.com', 'Password123') is user
+        assert bcrypt.from_string(user.password_hash).rounds == 5
+        assert authenticate_user(db_session, 'weak@example.com', 'Password123') is user
+
+
+def test_login_returns_503_when_saturated(app, client):
+    """Test that login answers 503 with Retry-After while the pool is full."""
+    from models.user import User
+    from utils.passwords import PasswordHasher
+
+    session = app.db_session
+    session.add(User(tenant_id=uuid.uuid4(), email='busy@example.com', first_name='Busy', last_name='User',
+                     password_hash=PasswordHasher(rounds=4).hash('Password123')))
+    session.commit()
+    session.remove()
+
+    hasher = PasswordHasher(rounds=4, workers=1, max_queue=0, retry_after=2)
+    hasher._slots.acquire()
+    app.extensions['password_hasher'] = hasher
+
+    response = client.post('/api/auth/login', json={'email': 'busy@example.com', 'password': 'Password123'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '2'
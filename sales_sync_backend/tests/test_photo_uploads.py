@@ -0,0 +1,398 @@
+import io
+import os
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+
+class RecordingStream(io.BytesIO):
+    """Byte stream that records the size of every read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def seed_visit(app, tenant_id):
+    """Create a visit for the tenant and return its ID."""
+    from models.visit import Visit
+
+    session = app.db_session
+    visit = Visit(tenant_id=tenant_id, survey_id=uuid.uuid4(), user_id=uuid.uuid4(), visit_type='shop')
+    session.add(visit)
+    session.commit()
+    visit_id = visit.id
+    session.remove()
+    return visit_id
+
+
+def test_spool_upload_reads_in_chunks(app, tmp_path):
+    """Test that uploads are copied to the spool folder one bounded chunk at a time."""
+    from utils.photo_uploads import spool_upload
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    data = os.urandom(300 * 1024)
+    stream = RecordingStream(data)
+    with app.app_context():
+        spooled = spool_upload(FileStorage(stream, filename='../shelf photo.jpg', content_type='image/jpeg'), chunk_size=64 * 1024)
+
+    assert set(stream.reads) == {64 * 1024}
+    assert os.path.dirname(spooled.path) == os.path.join(str(tmp_path), '.spool')
+    assert spooled.size == len(data)
+    assert spooled.filename == 'shelf_photo.jpg'
+    with open(spooled.path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_sweep_spool_folder_removes_left_behind_files(app, tmp_path):
+    """Test that only spool and variant files older than the cutoff are swept."""
+    import time
+    from utils.photo_uploads import get_spool_folder, sweep_spool_folder
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    spool_folder = get_spool_folder(app.config)
+    os.makedirs(spool_folder)
+    paths = {}
+    for name, age in [('old.upload', 1000), ('old.webp', 1000), ('new.upload', 0)]:
+        paths[name] = os.path.join(spool_folder, name)
+        open(paths[name], 'wb').close()
+        os.utime(paths[name], (time.time() - age, time.time() - age))
+
+    stale = sorted([paths['old.upload'], paths['old.webp']])
+    assert sorted(sweep_spool_folder(app.config, 900, dry_run=True)) == stale
+    assert sorted(os.listdir(spool_folder)) == ['new.upload', 'old.upload', 'old.webp']
+    assert sorted(sweep_spool_folder(app.config, 900)) == stale
+    assert os.listdir(spool_folder) == ['new.upload']
+    assert sweep_spool_folder({'UPLOAD_FOLDER': str(tmp_path / 'missing')}, 900) == []
+
+
+def test_upload_worker_start_sweeps_left_behind_files(app, tmp_path):
+    """Test that files a recycled process never stored are removed when the worker starts."""
+    import time
+    from utils.photo_uploads import get_spool_folder, init_upload_worker
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    spool_folder = get_spool_folder(app.config)
+    os.makedirs(spool_folder)
+    age = app.config['PHOTO_BLOB_CLAIM_TIMEOUT'] + 1
+    for name, mtime in [('queued.upload', time.time() - age), ('recent.upload', time.time())]:
+        path = os.path.join(spool_folder, name)
+        open(path, 'wb').close()
+        os.utime(path, (mtime, mtime))
+
+    init_upload_worker(app)
+    assert os.listdir(spool_folder) == ['recent.upload']
+
+
+def test_upload_returns_202_and_stores_file(app, client, make_auth_headers, tmp_path):
+    """Test the upload endpoint spools, stores and marks the photo ready."""
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    data = os.urandom(1024)
+
+    response = client.post('/api/photos', headers=headers, content_type='multipart/form-data', data={
+        'visit_id': str(seed_visit(app, tenant_id)),
+        'purpose': 'shelf',
+        'file': (io.BytesIO(data), 'shelf.jpg', 'image/jpeg')
+    })
+    assert response.status_code == 202
+    assert response.json['status'] == 'ready'
+
+    # Stored under its final URL, with nothing left in the spool
+    file_url = response.json['file_url']
+    assert file_url.startswith('/uploads/photos/')
+    with open(os.path.join(str(tmp_path), file_url[len('/uploads/'):]), 'rb') as f:
+        assert f.read() == data
+    assert os.listdir(os.path.join(str(tmp_path), '.spool')) == []
+
+
+def test_failed_uploads_leave_no_spool_files(app, client, make_auth_headers, tmp_path, monkeypatch):
+    """Test that bad visits are rejected before spooling and failed creates discard the spool file."""
+    import services.photo_service as photo_service
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    spool_folder = os.path.join(str(tmp_path), '.spool')
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+
+    assert upload_photo(client, headers, 'not-a-uuid', b'data').status_code == 400
+    assert upload_photo(client, headers, uuid.uuid4(), b'data').status_code == 404
+    assert upload_photo(client, headers, seed_visit(app, uuid.uuid4()), b'data').status_code == 404
+    assert not os.path.exists(spool_folder)
+
+    def fail(*args):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(photo_service, 'claim_photo_blob', fail)
+    with pytest.raises(RuntimeError):
+        upload_photo(client, headers, seed_visit(app, tenant_id), b'data')
+    assert os.listdir(spool_folder) == []
+
+
+def test_background_worker_marks_failed_uploads(app, tmp_path, monkeypatch):
+    """Test that a storage error on the worker thread marks the blob and its photos failed."""
+    import services.photo_service as photo_service
+    from models.photo import Photo, PhotoBlob
+    from utils.photo_uploads import SpooledUpload, UploadWorker
+
+    def fail(spooled, key):
+        spooled.discard()
+        raise IOError('bucket unavailable')
+
+    monkeypatch.setattr(photo_service, 'store_spooled_file', fail)
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    claimed_at = datetime.utcnow()
+    blob = PhotoBlob(tenant_id=tenant_id, content_hash='ab' * 32, storage_key='x.jpg', size=4, status='pending', claimed_at=claimed_at)
+    photo = Photo(tenant_id=tenant_id, visit_id=uuid.uuid4(), file_url='/uploads/x.jpg', status='pending', content_hash='ab' * 32)
+    session.add_all([blob, photo])
+    session.commit()
+    blob_id, photo_id = blob.id, photo.id
+    session.remove()
+
+    spool_path = tmp_path / 'x.upload'
+    spool_path.write_bytes(b'data')
+    worker = UploadWorker(app, workers=1)
+    worker.submit(photo_service.store_photo_blob, tenant_id, blob_id, SpooledUpload(str(spool_path), 4, 'x.jpg', 'image/jpeg'), claimed_at)
+    worker.shutdown(wait=True)
+
+    assert session.query(PhotoBlob).filter(PhotoBlob.id == blob_id).one().status == 'failed'
+    assert session.query(Photo).filter(Photo.id == photo_id).one().status == 'failed'
+    assert not spool_path.exists()
+    session.remove()
+
+
+def upload_photo(client, headers, visit_id, data, filename='shelf.jpg'):
+    """Upload a photo for a visit and return the response."""
+    return client.post('/api/photos', headers=headers, content_type='multipart/form-data', data={
+        'visit_id': str(visit_id),
+        'purpose': 'shelf',
+        'file': (io.BytesIO(data), filename, 'image/jpeg')
+    })
+
+
+def test_duplicate_upload_reuses_stored_file(app, client, make_auth_headers, tmp_path, monkeypatch):
+    """Test that re-uploading the same bytes links to the stored object instead of storing it again."""
+    import hashlib
+    import services.photo_service as photo_service
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    stored = []
+    store_spooled_file = photo_service.store_spooled_file
+    monkeypatch.setattr(photo_service, 'store_spooled_file', lambda spooled, key: stored.append(key) or store_spooled_file(spooled, key))
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    visit_id = seed_visit(app, tenant_id)
+    data = os.urandom(2048)
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    first = upload_photo(client, headers, visit_id, data)
+    second = upload_photo(client, headers, visit_id, data, filename='again.jpg')
+    assert first.status_code == second.status_code == 202
+    assert second.json['status'] == 'ready'
+    assert first.json['file_url'] == second.json['file_url']
+    assert first.json['file_url'].endswith(f'/{content_hash}.jpg')
+    assert second.json['content_hash'] == content_hash
+    assert len(stored) == 1
+    assert os.listdir(os.path.join(str(tmp_path), '.spool')) == []
+
+    # Clients that already know the hash can skip the upload
+    response = client.post('/api/photos', headers=headers, data={'visit_id': str(visit_id), 'content_hash': content_hash})
+    assert response.status_code == 202
+    assert response.json['file_url'] == first.json['file_url']
+    response = client.post('/api/photos', headers=headers, data={'visit_id': str(visit_id), 'content_hash': 'cd' * 32})
+    assert response.status_code == 404
+
+    # Another tenant's identical upload is stored separately
+    other_tenant_id = uuid.uuid4()
+    other = upload_photo(client, make_auth_headers(other_tenant_id, roles=['agent']), seed_visit(app, other_tenant_id), data)
+    assert other.json['file_url'] != first.json['file_url']
+    assert len(stored) == 2
+
+
+def test_lost_upload_is_taken_over(app, client, make_auth_headers, tmp_path):
+    """Test that a blob left pending by a dead worker is stored again by the next upload."""
+    from models.photo import Photo, PhotoBlob
+    from services.photo_service import fail_stale_photo_blobs
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    visit_id = seed_visit(app, tenant_id)
+    data = os.urandom(1024)
+    first = upload_photo(client, headers, visit_id, data).json
+
+    # Simulate a worker killed mid-transfer, recently and then long ago
+    session = app.db_session
+    blob = session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id).one()
+    blob.status = 'pending'
+    blob.claimed_at = datetime.utcnow()
+    session.query(Photo).filter(Photo.id == uuid.UUID(first['id'])).update({'status': 'pending'})
+    session.commit()
+    session.remove()
+    assert upload_photo(client, headers, visit_id, data).json['status'] == 'pending'
+
+    blob = session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id).one()
+    blob.claimed_at = datetime.utcnow() - timedelta(seconds=app.config['PHOTO_BLOB_CLAIM_TIMEOUT'] + 1)
+    session.commit()
+    session.remove()
+    assert upload_photo(client, headers, visit_id, data).json['status'] == 'ready'
+    assert {photo.status for photo in session.query(Photo).filter(Photo.tenant_id == tenant_id)} == {'ready'}
+    session.remove()
+
+    # Stale blobs nobody re-uploads are failed with their photos
+    blob = session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id).one()
+    blob.status = 'pending'
+    blob.claimed_at = None
+    session.query(Photo).filter(Photo.tenant_id == tenant_id).update({'status': 'pending'})
+    session.commit()
+    with app.app_context():
+        assert fail_stale_photo_blobs(session, tenant_id, dry_run=True) == 1
+        assert fail_stale_photo_blobs(session, tenant_id) == 1
+    assert {photo.status for photo in session.query(Photo).filter(Photo.tenant_id == tenant_id)} == {'failed'}
+    assert session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id).one().status == 'failed'
+    session.remove()
+
+
+@pytest.mark.parametrize('upsert', [True, False])
+def test_claim_survives_concurrent_duplicate_and_cleanup(app, monkeypatch, upsert):
+    """Test claiming content whose blob another upload inserted and cleanup then deleted."""
+    import services.photo_service as photo_service
+    from models.photo import PhotoBlob
+    from utils.photo_uploads import SpooledUpload
+
+    tenant_id = uuid.uuid4()
+    spooled = SpooledUpload('/nonexistent.upload', 4, 'shelf.jpg', 'image/jpeg', 'ab' * 32)
+    session = app.db_session
+    session.add(PhotoBlob(tenant_id=tenant_id, content_hash=spooled.sha256, storage_key='photos/old.jpg',
+                          size=4, status='failed'))
+    session.commit()
+    existing_id = session.query(PhotoBlob.id).filter(PhotoBlob.tenant_id == tenant_id).scalar()
+
+    # The first insert finds the existing blob, which cleanup deletes before it is locked
+    insert_photo_blob = photo_service._insert_photo_blob
+    calls = []
+
+    def insert_then_cleanup(session, row):
+        insert_photo_blob(session, row)
+        if not calls:
+            session.query(PhotoBlob).filter(PhotoBlob.id == existing_id).delete()
+        calls.append(row)
+
+    monkeypatch.setattr(photo_service, '_insert_photo_blob', insert_then_cleanup)
+    if not upsert:
+        monkeypatch.setattr(photo_service, 'get_dialect_insert', lambda session: None)
+
+    with app.app_context():
+        blob, owned = photo_service.claim_photo_blob(session, tenant_id, spooled)
+    session.commit()
+    assert owned and blob.id != existing_id
+    assert len(calls) == 2
+    assert session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id).count() == 1
+    session.remove()
+
+
+def test_cleanup_deletes_unreferenced_blobs(app, client, make_auth_headers, tmp_path):
+    """Test that cleanup removes blobs without photos and keeps referenced ones."""
+    from models.photo import Photo, PhotoBlob
+    from services.photo_service import cleanup_photo_blobs
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    visit_id = seed_visit(app, tenant_id)
+    kept = upload_photo(client, headers, visit_id, os.urandom(1024)).json
+    orphan = upload_photo(client, headers, visit_id, os.urandom(1024)).json
+    orphan_path = os.path.join(str(tmp_path), orphan['file_url'][len('/uploads/'):])
+
+    session = app.db_session
+    session.query(Photo).filter(Photo.id == uuid.UUID(orphan['id'])).delete()
+    session.commit()
+
+    with app.app_context():
+        assert cleanup_photo_blobs(session, tenant_id, dry_run=True) == [orphan['file_url'][len('/uploads/'):]]
+        assert os.path.exists(orphan_path)
+        assert len(cleanup_photo_blobs(session, tenant_id)) == 1
+
+    assert not os.path.exists(orphan_path)
+    hashes = [blob.content_hash for blob in session.query(PhotoBlob).filter(PhotoBlob.tenant_id == tenant_id)]
+    assert hashes == [kept['content_hash']]
+    session.remove()
+
+
+def make_jpeg(width, height, exif_orientation=None):
+    """Encode a solid JPEG, optionally with an EXIF orientation tag."""
+    from PIL import Image
+
+    image = Image.new('RGB', (width, height), (200, 30, 30))
+    output = io.BytesIO()
+    if exif_orientation:
+        exif = Image.Exif()
+        exif[0x0112] = exif_orientation
+        image.save(output, format='JPEG', exif=exif)
+    else:
+        image.save(output, format='JPEG')
+    return output.getvalue()
+
+
+def test_upload_renders_variants_and_metadata(app, client, make_auth_headers, tmp_path):
+    """Test that an uploaded image gets its dimensions, orientation and resized variants."""
+    pytest.importorskip('PIL')
+    from PIL import Image
+
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
+    tenant_id = uuid.uuid4()
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    visit_id = seed_visit(app, tenant_id)
+
+    # Stored sideways with a 90 degree EXIF rotation, so it is really portrait
+    response = upload_photo(client, headers, visit_id, make_jpeg(1600, 1200, exif_orientation=6))
+    assert response.status_code == 202
+    photo = response.json
+    assert photo['status'] == 'ready'
+    assert photo['metadata'] == {'width': 1200, 'height': 1600, 'orientation': 'portrait', 'format': 'JPEG'}
+    assert set(photo['variants']) == {'thumb', 'medium'}
+
+    sizes = {}
+    for name, url in photo['variants'].items():
+        assert url.endswith(f'.{name}.webp')
+        with Image.open(os.path.join(str(tmp_path), url[len('/uploads/'):])) as variant:
+            assert variant.format == 'WEBP'
+            sizes[name] = variant.size
+    assert sizes == {'thumb': (150, 200), 'medium': (768, 1024)}
+    assert os.listdir(os.path.join(str(tmp_path), '.spool')) == []
+
+    # A duplicate upload gets the same metadata and variants without rendering again
+    again = upload_photo(client, headers, visit_id, make_jpeg(1600, 1200, exif_orientation=6)).json
+    assert (again['metadata'], again['variants']) == (photo['metadata'], photo['variants'])
+
+    # Files that are not images are stored without variants
+    other = upload_photo(client, headers, visit_id, os.urandom(512)).json
+    assert (other['status'], other['metadata'], other['variants']) == ('ready', {}, {})
+
+
+def test_variant_renderer_process_pool(tmp_path):
+    """Test rendering in the process pool, without upscaling small images."""
+    pytest.importorskip('PIL')
+    from utils.image_variants import VariantRenderer
+
+    source = tmp_path / 'small.jpg'
+    source.write_bytes(make_jpeg(300, 300))
+    renderer = VariantRenderer(variants={'thumb': 200, 'medium': 1024}, image_format='JPEG', workers=1)
+    try:
+        metadata, rendered = renderer.render(str(source), str(tmp_path))
+    finally:
+        renderer.shutdown()
+
+    assert metadata['orientation'] == 'square'
+    assert renderer.content_type == 'image/jpeg'
+    from PIL import Image
+    with Image.open(rendered['thumb'][0]) as thumb, Image.open(rendered['medium'][0]) as medium:
+        assert (thumb.size, medium.size) == ((200, 200), (300, 300))
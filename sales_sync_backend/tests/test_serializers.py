@@ -0,0 +1,189 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+
+def seed_models(db_session, tenant_id):
+    """Create one instance of each registered model, mixing set and empty optional fields."""
+    from models.audit import AuditLog
+    from models.brand import Brand
+    from models.call_cycle import CallCycle, CallCycleLocation
+    from models.goal import Goal, GoalAssignment
+    from models.photo import Photo, ShelfQuadrant
+    from models.survey import Survey, SurveyQuestion
+    from models.team import Team
+    from models.visit import Visit, VisitAnswer
+
+    now = datetime.utcnow()
+    brand = Brand(tenant_id=tenant_id, name='Brand é', slug=None)
+    db_session.add(brand)
+    db_session.flush()
+    survey = Survey(tenant_id=tenant_id, name='Survey', type='shop', brand_id=brand.id)
+    question = SurveyQuestion(tenant_id=tenant_id, survey=survey, question_text='Q?', input_type='select', meta={'choices': ['a', 'b']})
+    visit = Visit(tenant_id=tenant_id, survey_id=uuid.uuid4(), user_id=uuid.uuid4(), visit_type='shop', shop_id=None,
+                  started_at=now - timedelta(hours=1), completed_at=now)
+    answer = VisitAnswer(tenant_id=tenant_id, visit=visit, question_id=None, answer_text='yes', answer_json={'n': 1})
+    photo = Photo(tenant_id=tenant_id, visit=visit, file_url='/uploads/a.jpg', purpose=None, image_metadata={'width': 10})
+    quadrant = ShelfQuadrant(tenant_id=tenant_id, photo=photo, brand_id=brand.id, quadrant_coords=[[0, 0], [1, 1]], area_percentage=12.5)
+    cycle = CallCycle(tenant_id=tenant_id, name='Cycle', frequency='weekly')
+    location = CallCycleLocation(call_cycle=cycle, shop_id=uuid.uuid4(), order_num=2)
+    team = Team(tenant_id=tenant_id, name='Team', manager_id=None)
+    log = AuditLog(tenant_id=None, user_id=uuid.uuid4(), action='login', audit_metadata=None)
+    goal = Goal(tenant_id=tenant_id, name='Goal', metric='visits', target_value=10, period='weekly', start_date=now.date())
+    assignment = GoalAssignment(goal=goal, assignee_type='user', assignee_id=uuid.uuid4(), progress={'done': 3})
+
+    db_session.add_all([survey, question, visit, answer, photo, quadrant, cycle, location, team, log, goal, assignment])
+    db_session.commit()
+
+
+def test_compiled_serializers_match_to_dict(db_session, tenant):
+    """Test that object and row serializers return exactly what to_dict returns."""
+    from utils.serializers import _serializers
+
+    seed_models(db_session, tenant.id)
+
+    for model, serializer in _serializers.items():
+        instances = db_session.query(model).order_by(model.id).all()
+        assert instances, model.__name__
+        rows = serializer.rows(db_session.query(model).order_by(model.id)).all()
+
+        expected = [instance.to_dict() for instance in instances]
+        assert [serializer.from_object(instance) for instance in instances] == expected, model.__name__
+        assert [serializer.from_row(row) for row in rows] == expected, model.__name__
+
+
+def test_uuid_text_normalizes_like_uuid():
+    """Test that stored UUID text is returned in str(uuid.UUID()) form."""
+    from utils.serializers import _uuid_text
+
+    value = uuid.uuid4()
+    assert _uuid_text(str(value)) == str(value)
+    assert _uuid_text(str(value).upper()) == str(value)
+    assert _uuid_text(value.hex) == str(value)
+
+
+def test_encoder_matches_flask_json(app):
+    """Test that the default encoder output is byte-identical to flask.json.dumps."""
+    from flask import json
+    from utils.serializers import dumps
+
+    value = {'b': 'café', 'a': [1, 2.5, None, True], 'c': {'z': 1, 'y': 'x'}}
+    with app.app_context():
+        assert dumps(value) == json.dumps(value)
+
+
+def test_streamed_visits_match_to_dict(app, client, make_auth_headers):
+    """Test that a streamed response encodes rows exactly like to_dict through Flask."""
+    from flask import json
+    from models.visit import Visit
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    now = datetime.utcnow()
+    for index in range(3):
+        session.add(Visit(
+            tenant_id=tenant_id,
+            survey_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            visit_type='shop',
+            shop_id=uuid.uuid4() if index else None,
+            started_at=now - timedelta(minutes=index)
+        ))
+    session.commit()
+    visits = session.query(Visit).filter(Visit.tenant_id == tenant_id).order_by(Visit.started_at.desc(), Visit.id.desc()).all()
+    with app.app_context():
+        expected = '\n'.join(json.dumps(visit.to_dict()) for visit in visits) + '\n'
+    session.remove()
+
+    response = client.get('/api/visits', headers=dict(make_auth_headers(tenant_id), Accept='application/x-ndjson'))
+    assert response.get_data(as_text=True) == expected
+
+
+def test_fieldset_returns_requested_fields(db_session, tenant):
+    """Test that sparse fieldsets return only the requested keys, in to_dict order."""
+    from models.visit import Visit
+    from utils.serializers import get_fieldset, make_serializer
+
+    seed_models(db_session, tenant.id)
+    visit = db_session.query(Visit).first()
+    expected = visit.to_dict()
+
+    serialize = make_serializer(Visit, fields=['started_at', 'id'])
+    assert serialize(visit) == {'id': expected['id'], 'started_at': expected['started_at']}
+
+    serializer, _ = get_fieldset(Visit, fields=['started_at', 'id'])
+    row = serializer.rows(db_session.query(Visit)).first()
+    assert serializer.from_row(row) == {'id': expected['id'], 'started_at': expected['started_at']}
+
+    # Subsets are compiled once
+    assert get_fieldset(Visit, fields=['id', 'started_at'])[0] is serializer
+
+    with pytest.raises(ValueError):
+        make_serializer(Visit, fields=['password_hash'])
+    with pytest.raises(ValueError):
+        make_serializer(Visit, include=['user'])
+
+
+def test_include_matches_to_dict_with_constant_queries(db_session, tenant):
+    """Test that includes match to_dict's include flags and load each relationship in one query."""
+    from models.visit import Visit, VisitAnswer
+    from services.visit_service import get_visits_page
+    from utils.serializers import make_serializer
+
+    tenant_id = tenant.id
+    now = datetime.utcnow()
+    for index in range(5):
+        visit = Visit(tenant_id=tenant_id, survey_id=uuid.uuid4(), user_id=uuid.uuid4(), visit_type='shop',
+                      started_at=now - timedelta(minutes=index))
+        db_session.add(visit)
+        db_session.add_all([VisitAnswer(tenant_id=tenant_id, visit=visit, answer_text=str(number)) for number in range(3)])
+    db_session.commit()
+    db_session.expire_all()
+
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args[2])
+
+    event.listen(db_session.bind, 'before_cursor_execute', count_statement)
+    try:
+        visits, _ = get_visits_page(db_session, tenant_id, include=['answers', 'photos'])
+        serialize = make_serializer(Visit, include=['answers', 'photos'])
+        result = [serialize(visit) for visit in visits]
+    finally:
+        event.remove(db_session.bind, 'before_cursor_execute', count_statement)
+
+    # One query for the page and one per included relationship
+    assert len(statements) == 3
+    assert result == [visit.to_dict(include_answers=True, include_photos=True) for visit in visits]
+
+
+def test_list_endpoint_fieldset(app, client, make_auth_headers):
+    """Test fields and include parameters on list endpoints."""
+    from models.survey import Survey, SurveyQuestion
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    survey = Survey(tenant_id=tenant_id, name='Survey', type='shop')
+    session.add(survey)
+    session.add_all([SurveyQuestion(tenant_id=tenant_id, survey=survey, question_text=f'Q{number}', input_type='text', order_num=2 - number)
+                     for number in range(2)])
+    session.commit()
+    session.remove()
+
+    headers = make_auth_headers(tenant_id)
+    response = client.get('/api/surveys?fields=id,name&include=questions', headers=headers)
+    assert response.status_code == 200
+    item = response.json['surveys'][0]
+    assert set(item) == {'id', 'name', 'questions'}
+    assert [question['question_text'] for question in item['questions']] == ['Q1', 'Q0']
+
+    response = client.get('/api/visits?fields=id', headers=headers)
+    assert response.status_code == 200
+
+    response = client.get('/api/surveys?fields=tenant_id,secret', headers=headers)
+    assert response.status_code == 400
+    response = client.get('/api/visits?include=user', headers=dict(headers, Accept='application/x-ndjson'))
+    assert response.status_code == 400
@@ -0,0 +1,122 @@
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+
+def seed_photo(session, tenant_id, brands=3):
+    """Create a measured photo and brands and return their IDs."""
+    from models.brand import Brand
+    from models.photo import Photo
+
+    photo = Photo(tenant_id=tenant_id, visit_id=uuid.uuid4(), file_url='/uploads/shelf.jpg',
+                  image_metadata={'width': 200, 'height': 100})
+    brand_ids = [uuid.uuid4() for _ in range(brands)]
+    session.add(photo)
+    session.add_all([Brand(id=brand_id, tenant_id=tenant_id, name=f'Brand {index}') for index, brand_id in enumerate(brand_ids)])
+    session.commit()
+    return photo.id, brand_ids
+
+
+def rectangle(x, y, width, height):
+    return {'x': x, 'y': y, 'width': width, 'height': height}
+
+
+def test_replace_shelf_quadrants(db_session, tenant):
+    """Test that a submission replaces the photo's quadrants and measures their areas."""
+    from models.photo import ShelfQuadrant
+    from services.photo_service import replace_shelf_quadrants
+
+    photo_id, brand_ids = seed_photo(db_session, tenant.id)
+    replace_shelf_quadrants(db_session, tenant.id, photo_id, [
+        {'brand_id': str(brand_id), 'quadrant_coords': [rectangle(0, 0, 10, 10)]} for brand_id in brand_ids
+    ])
+
+    quadrants = replace_shelf_quadrants(db_session, tenant.id, photo_id, [
+        {'brand_id': str(brand_ids[0]), 'quadrant_coords': [rectangle(0, 0, 100, 50), rectangle(50, 0, 100, 50)]},
+        {'brand_id': str(brand_ids[1]), 'quadrant_coords': [rectangle(0, 50, 50, 50)], 'area_percentage': 20}
+    ])
+    assert [quadrant.to_dict()['area_percentage'] for quadrant in quadrants] == [37.5, 20.0]
+
+    stored = db_session.query(ShelfQuadrant).filter(ShelfQuadrant.photo_id == photo_id).all()
+    assert sorted(float(quadrant.area_percentage) for quadrant in stored) == [20.0, 37.5]
+
+
+def test_invalid_quadrants_write_nothing(db_session, tenant):
+    """Test that one invalid entry rejects the whole submission with per-entry errors."""
+    from models.photo import ShelfQuadrant
+    from services.photo_service import ShelfQuadrantValidationError, replace_shelf_quadrants
+
+    photo_id, brand_ids = seed_photo(db_session, tenant.id)
+    _, other_brand_ids = seed_photo(db_session, uuid.uuid4(), brands=1)
+    coords = [rectangle(0, 0, 10, 10)]
+
+    with pytest.raises(ShelfQuadrantValidationError) as error:
+        replace_shelf_quadrants(db_session, tenant.id, photo_id, [
+            {'brand_id': str(brand_ids[0]), 'quadrant_coords': coords},
+            {'brand_id': str(brand_ids[0]), 'quadrant_coords': coords},
+            {'brand_id': str(other_brand_ids[0]), 'quadrant_coords': coords},
+            {'brand_id': 'not-a-uuid', 'quadrant_coords': coords},
+            {'brand_id': str(brand_ids[1]), 'quadrant_coords': [{'left': 0}]},
+            {'brand_id': str(brand_ids[2]), 'quadrant_coords': coords, 'area_percentage': 'half'}
+        ])
+    assert [(item['index'], item['error']) for item in error.value.errors] == [
+        (1, 'Duplicate brand in request'),
+        (2, 'Brand not found'),
+        (3, 'Brand ID is required'),
+        (4, 'Shapes must be rectangles (x, y, width, height) or lists of points'),
+        (5, 'Area percentage must be a number')
+    ]
+    assert db_session.query(ShelfQuadrant).filter(ShelfQuadrant.photo_id == photo_id).count() == 0
+
+
+def test_replace_uses_constant_statements(db_session, tenant):
+    """Test that a 30-brand shelf is written with a fixed number of statements."""
+    from services.photo_service import get_photo_by_id, replace_shelf_quadrants
+
+    photo_id, brand_ids = seed_photo(db_session, tenant.id, brands=30)
+    photo = get_photo_by_id(db_session, tenant.id, photo_id)
+    quadrants = [{'brand_id': str(brand_id), 'quadrant_coords': [rectangle(index, 0, 5, 100)]} for index, brand_id in enumerate(brand_ids)]
+
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args[2])
+
+    event.listen(db_session.bind, 'before_cursor_execute', count_statement)
+    try:
+        replace_shelf_quadrants(db_session, tenant.id, photo, quadrants)
+    finally:
+        event.remove(db_session.bind, 'before_cursor_execute', count_statement)
+
+    # Brands, delete and insert
+    assert len(statements) == 3
+
+
+def test_replace_endpoint(app, client, make_auth_headers):
+    """Test the bulk endpoint's response, validation errors and size limit."""
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    photo_id, brand_ids = seed_photo(session, tenant_id, brands=2)
+    session.remove()
+
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    url = f'/api/photos/{photo_id}/shelf_quadrants'
+    quadrants = [{'brand_id': str(brand_id), 'quadrant_coords': [rectangle(0, 0, 100, 100)]} for brand_id in brand_ids]
+
+    response = client.put(url, json={'quadrants': quadrants}, headers=headers)
+    assert response.status_code == 200
+    assert [(item['brand_id'], item['area_percentage']) for item in response.json] == [(str(brand_id), 50.0) for brand_id in brand_ids]
+    assert len(client.get(url, headers=headers).json) == 2
+
+    response = client.put(url, json={'quadrants': [{'brand_id': str(uuid.uuid4()), 'quadrant_coords': [[0, 0], [1, 0], [1, 1]]}]}, headers=headers)
+    assert response.status_code == 400
+    assert response.json['quadrant_errors'] == [{'index': 0, 'error': 'Brand not found'}]
+
+    response = client.put(url, json={'quadrants': {}}, headers=headers)
+    assert response.status_code == 400
+    app.config['SHELF_QUADRANT_MAX_BATCH'] = 1
+    response = client.put(url, json={'quadrants': quadrants}, headers=headers)
+    assert response.status_code == 400
+    response = client.put(f'/api/photos/{uuid.uuid4()}/shelf_quadrants', json={'quadrants': []}, headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Import plus create_app() time budget for a cold worker, in seconds
+STARTUP_BUDGET = float(os.environ.get('STARTUP_BUDGET', 1.0))
+
+# Modules only needed once a request or command uses them
+DEFERRED_MODULES = ('boto3', 'redis', 'apispec', 'marshmallow', 'controllers')
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app('testing')
+done = time.perf_counter()
+print(imported - start, done - imported)
+print(' '.join(sorted(sys.modules)))
+"""
+
+
+def run_python(script, *flags):
+    """Run a script in a fresh interpreter and return its stdout and stderr."""
+    env = dict(os.environ, FLASK_ENV='testing', TEST_DATABASE_URL='sqlite://')
+    result = subprocess.run(
+        [sys.executable, *flags, '-c', script],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return result.stdout, result.stderr
+
+
+def parse_importtime(stderr):
+    """Map module names to cumulative import time in seconds from -X importtime output."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_worker_startup_budget():
+    """Test that importing and creating the app stays within the startup budget."""
+    stdout, stderr = run_python(STARTUP_SCRIPT, '-X', 'importtime')
+    timings, modules = stdout.splitlines()
+    import_elapsed, create_elapsed = map(float, timings.split())
+    import_times = parse_importtime(stderr)
+
+    # Report the slowest imports when the budget is blown
+    slowest = sorted(import_times.items(), key=lambda item: item[1], reverse=True)[:10]
+    total = import_elapsed + create_elapsed
+    assert total < STARTUP_BUDGET, f'startup took {total:.3f}s, slowest imports: {slowest}'
+
+    loaded = modules.split()
+    for name in DEFERRED_MODULES:
+        assert not any(module == name or module.startswith(f'{name}.') for module in loaded), f'{name} imported at startup'
+
+
+def test_manage_import_does_not_create_app():
+    """Test that importing manage.py leaves app creation to the command being run."""
+    script = (
+        "import app\n"
+        "app.create_app = lambda *args, **kwargs: print('created')\n"
+        "import manage\n"
+    )
+    stdout, _ = run_python(script)
+    assert 'created' not in stdout
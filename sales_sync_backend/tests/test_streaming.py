@@ -0,0 +1,52 @@
+import json
+
+
+class Row:
+    def __init__(self, value):
+        self.value = value
+
+    def to_dict(self):
+        return {'value': self.value}
+
+
+def test_iter_json_array_batches(app):
+    """Test that chunked JSON encoding produces a valid document."""
+    from utils.streaming import iter_json_array
+
+    with app.app_context():
+        for count in (0, 1, 2, 5):
+            rows = [Row(index) for index in range(count)]
+            body = ''.join(iter_json_array(rows, batch_size=2))
+            assert json.loads(body) == [{'value': index} for index in range(count)]
+
+            body = ''.join(iter_json_array(rows, items_key='rows', batch_size=2))
+            assert json.loads(body) == {'rows': [{'value': index} for index in range(count)]}
+
+
+def test_iter_ndjson(app):
+    """Test that NDJSON encoding writes one object per line."""
+    from utils.streaming import iter_ndjson
+
+    with app.app_context():
+        chunks = list(iter_ndjson([Row(index) for index in range(5)], batch_size=2))
+
+    assert len(chunks) == 3
+    assert [json.loads(line) for line in ''.join(chunks).splitlines()] == [{'value': index} for index in range(5)]
+
+
+def test_audit_logs_streamed(app, client, make_auth_headers):
+    """Test streaming a tenant's audit logs as NDJSON."""
+    import uuid
+    from models.audit import AuditLog
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    session.add_all([AuditLog(tenant_id=tenant_id, action=f'action_{index}') for index in range(3)])
+    session.add(AuditLog(tenant_id=uuid.uuid4(), action='other_tenant'))
+    session.commit()
+    session.remove()
+
+    response = client.get('/api/audit', headers=dict(make_auth_headers(tenant_id), Accept='application/x-ndjson'))
+    assert response.status_code == 200
+    actions = {json.loads(line)['action'] for line in response.get_data(as_text=True).splitlines()}
+    assert actions == {'action_0', 'action_1', 'action_2'}
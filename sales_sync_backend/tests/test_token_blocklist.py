@@ -0,0 +1,62 @@
+import time
+import uuid
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added value is reported as present."""
+    from utils.token_blocklist import BloomFilter
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    values = [str(uuid.uuid4()) for _ in range(1000)]
+    for value in values:
+        bloom.add(value)
+    assert all(value in bloom for value in values)
+
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_blocklist_shared_between_workers():
+    """Test revocation, propagation to another worker's filter and expiry."""
+    from utils.token_blocklist import MemoryBlocklistBackend, TokenBlocklist
+
+    backend = MemoryBlocklistBackend()
+    worker, other_worker = TokenBlocklist(backend, sync_interval=0), TokenBlocklist(backend, sync_interval=60)
+    assert not other_worker.is_revoked('warm-up')
+
+    jti = str(uuid.uuid4())
+    worker.revoke(jti, time.time() + 60)
+    assert worker.is_revoked(jti)
+
+    # The other worker only sees it after its next sync
+    assert not other_worker.is_revoked(jti)
+    other_worker.sync_interval = 0
+    assert other_worker.is_revoked(jti)
+
+    # Entries lapse with the token
+    expired_jti = str(uuid.uuid4())
+    worker.revoke(expired_jti, time.time() - 1)
+    assert not worker.is_revoked(expired_jti)
+
+
+def test_logout_revokes_tokens(app, client):
+    """Test that logout revokes the access and refresh tokens."""
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    from models.role import ROLE_BITS
+    from utils.auth_context import ROLE_MASK_CLAIM
+
+    user_id = str(uuid.uuid4())
+    claims = {'tenant_id': str(uuid.uuid4()), ROLE_MASK_CLAIM: ROLE_BITS['admin'], 'email': 'admin@example.com'}
+    with app.app_context():
+        access_token = create_access_token(identity=user_id, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user_id, additional_claims=claims)
+        other_access_token = create_access_token(identity=user_id, additional_claims=claims)
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    assert client.get('/api/teams', headers=headers).status_code == 200
+    response = client.post('/api/auth/logout', headers=headers, json={'refresh_token': refresh_token})
+    assert response.status_code == 200
+
+    assert client.get('/api/teams', headers=headers).status_code == 401
+    assert client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {refresh_token}'}).status_code == 401
+    assert client.get('/api/teams', headers={'Authorization': f'Bearer {other_access_token}'}).status_code == 200
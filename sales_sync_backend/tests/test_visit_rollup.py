@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timedelta
+
+
+def test_create_and_complete_visit_update_rollup(db_session, tenant):
+    """Test that visit writes keep the daily rollup current."""
+    from models.visit_rollup import VisitDailyRollup
+    from services.visit_service import create_visit, complete_visit
+
+    user_id = uuid.uuid4()
+    survey_id = uuid.uuid4()
+
+    visit1 = create_visit(db_session, tenant.id, user_id, survey_id, 'individual')
+    create_visit(db_session, tenant.id, user_id, survey_id, 'individual')
+    complete_visit(db_session, tenant.id, visit1.id)
+
+    # Completing twice must not double count
+    complete_visit(db_session, tenant.id, visit1.id)
+
+    rollups = db_session.query(VisitDailyRollup).filter(VisitDailyRollup.tenant_id == tenant.id).all()
+    assert len(rollups) == 1
+    assert rollups[0].total_visits == 2
+    assert rollups[0].completed_visits == 1
+    assert rollups[0].day == visit1.started_at.date()
+
+
+def test_get_visits_metrics_from_rollup(db_session, tenant):
+    """Test that day, week and month metrics are computed from the rollup."""
+    from models.visit import Visit
+    from services.visit_rollup_service import rebuild_visit_rollup
+    from services.analytics_service import get_visits_metrics
+
+    user_id = uuid.uuid4()
+    other_user_id = uuid.uuid4()
+    survey_id = uuid.uuid4()
+    now = datetime.utcnow()
+
+    for days_ago, owner, completed in [(1, user_id, True), (1, user_id, False), (2, other_user_id, True), (60, user_id, True)]:
+        started_at = now - timedelta(days=days_ago)
+        db_session.add(Visit(
+            tenant_id=tenant.id,
+            survey_id=survey_id,
+            user_id=owner,
+            visit_type='individual',
+            started_at=started_at,
+            completed_at=started_at + timedelta(hours=1) if completed else None
+        ))
+    db_session.commit()
+
+    # Backfill rows inserted outside visit_service
+    assert rebuild_visit_rollup(db_session, tenant.id) == 3
+
+    by_day = get_visits_metrics(db_session, tenant.id, group_by='day')
+    assert by_day['total_visits'] == 3
+    assert [item['count'] for item in by_day['visits_by_day']] == [1, 2]
+    assert by_day['visits_by_day'][1]['completed'] == 1
+
+    by_user = get_visits_metrics(db_session, tenant.id, user_id=user_id, group_by='day')
+    assert by_user['total_visits'] == 2
+
+    by_week = get_visits_metrics(db_session, tenant.id, group_by='week')
+    assert by_week['total_visits'] == 3
+    assert all('year' in item and 'week' in item for item in by_week['visits_by_week'])
+
+    by_month = get_visits_metrics(db_session, tenant.id, start_date=now - timedelta(days=90), group_by='month')
+    assert by_month['total_visits'] == 4
+
+    assert get_visits_metrics(db_session, tenant.id, group_by='year') == []
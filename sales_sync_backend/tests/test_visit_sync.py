@@ -0,0 +1,170 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+
+def seed_survey(session, tenant_id, questions=3):
+    """Create a survey with questions and return its ID and question IDs."""
+    from models.survey import Survey, SurveyQuestion
+
+    survey = Survey(tenant_id=tenant_id, name='Sync Survey', type='shop')
+    session.add(survey)
+    session.flush()
+    survey_id = survey.id
+    question_ids = [uuid.uuid4() for _ in range(questions)]
+    session.add_all([SurveyQuestion(id=question_id, tenant_id=tenant_id, survey_id=survey_id, question_text='Q?', input_type='text')
+                     for question_id in question_ids])
+    session.commit()
+    return survey_id, question_ids
+
+
+def make_visit(survey_id, question_ids, **overrides):
+    """Build one offline visit payload."""
+    started_at = datetime.utcnow() - timedelta(hours=2)
+    visit = {
+        'id': str(uuid.uuid4()),
+        'survey_id': str(survey_id),
+        'visit_type': 'shop',
+        'shop_id': str(uuid.uuid4()),
+        'started_at': started_at.isoformat() + 'Z',
+        'completed_at': (started_at + timedelta(minutes=20)).isoformat() + 'Z',
+        'answers': [{'question_id': str(question_id), 'answer_text': 'yes'} for question_id in question_ids]
+    }
+    visit.update(overrides)
+    return visit
+
+
+def test_sync_is_idempotent(db_session, tenant):
+    """Test that replaying a batch creates nothing new and reports existing visits."""
+    from models.visit import Visit, VisitAnswer
+    from models.visit_rollup import VisitDailyRollup
+    from services.visit_service import sync_visits
+
+    tenant_id = tenant.id
+    user_id = uuid.uuid4()
+    survey_id, question_ids = seed_survey(db_session, tenant_id)
+    visits = [make_visit(survey_id, question_ids) for _ in range(3)]
+
+    results = sync_visits(db_session, tenant_id, user_id, visits)
+    assert [result['status'] for result in results] == ['created'] * 3
+    assert [result['id'] for result in results] == [visit['id'] for visit in visits]
+
+    results = sync_visits(db_session, tenant_id, user_id, visits)
+    assert [result['status'] for result in results] == ['exists'] * 3
+
+    assert db_session.query(Visit).filter(Visit.tenant_id == tenant_id).count() == 3
+    assert db_session.query(VisitAnswer).filter(VisitAnswer.tenant_id == tenant_id).count() == 9
+    visit = db_session.query(Visit).filter(Visit.id == uuid.UUID(visits[0]['id'])).one()
+    assert str(visit.user_id) == str(user_id)
+    assert visit.started_at.isoformat() + 'Z' == visits[0]['started_at']
+
+    rollup = db_session.query(VisitDailyRollup).filter(VisitDailyRollup.tenant_id == tenant_id).one()
+    assert (rollup.total_visits, rollup.completed_visits) == (3, 3)
+
+
+def test_sync_reports_invalid_visits_without_writing_them(db_session, tenant):
+    """Test per-visit validation, including answers to questions of another survey."""
+    from models.visit import Visit
+    from services.visit_service import sync_visits
+
+    tenant_id = tenant.id
+    survey_id, question_ids = seed_survey(db_session, tenant_id)
+    _, other_question_ids = seed_survey(db_session, tenant_id)
+    valid = make_visit(survey_id, question_ids)
+    visits = [
+        valid,
+        dict(valid),
+        make_visit(survey_id, question_ids, id='not-a-uuid'),
+        make_visit(survey_id, question_ids, visit_type='drive-by'),
+        make_visit(uuid.uuid4(), []),
+        make_visit(survey_id, question_ids[:1] + other_question_ids[:1]),
+        make_visit(survey_id, [], started_at='yesterday')
+    ]
+
+    results = sync_visits(db_session, tenant_id, uuid.uuid4(), visits)
+    assert [result['status'] for result in results] == ['created'] + ['invalid'] * 6
+    assert results[1]['error'] == 'Duplicate visit ID in batch'
+    assert results[4]['error'] == 'Survey not found'
+    assert results[5]['answer_errors'] == [{'index': 1, 'error': 'Question does not belong to the visit survey'}]
+    assert db_session.query(Visit).filter(Visit.tenant_id == tenant_id).count() == 1
+
+
+def test_sync_uses_constant_statements(db_session, tenant):
+    """Test that a large batch is written with a fixed number of statements."""
+    from services.visit_service import sync_visits
+
+    tenant_id = tenant.id
+    survey_id, question_ids = seed_survey(db_session, tenant_id, questions=5)
+    visits = [make_visit(survey_id, question_ids) for _ in range(500)]
+
+    statements = []
+
+    def count_statement(*args):
+        statements.append(args[2])
+
+    event.listen(db_session.bind, 'before_cursor_execute', count_statement)
+    try:
+        results = sync_visits(db_session, tenant_id, uuid.uuid4(), visits)
+    finally:
+        event.remove(db_session.bind, 'before_cursor_execute', count_statement)
+
+    assert all(result['status'] == 'created' for result in results)
+    # Existing visits, survey questions, visits, answers and one rollup bucket
+    assert len(statements) == 5
+
+
+@pytest.mark.parametrize('upsert', [True, False])
+def test_sync_concurrent_replay(db_session, tenant, monkeypatch, upsert):
+    """Test that visits a concurrent replay inserts first are reported as existing, without RETURNING or ON CONFLICT."""
+    import services.visit_service as visit_service
+    from models.visit import Visit, VisitAnswer
+    from models.visit_rollup import VisitDailyRollup
+
+    tenant_id = tenant.id
+    user_id = uuid.uuid4()
+    survey_id, question_ids = seed_survey(db_session, tenant_id, questions=2)
+    visits = [make_visit(survey_id, question_ids) for _ in range(3)]
+    get_survey_question_ids = visit_service.get_survey_question_ids
+
+    # The other replay writes the first visit after the existence check
+    def replay_first(session, *args):
+        session.add(Visit(id=uuid.UUID(visits[0]['id']), tenant_id=tenant_id, survey_id=survey_id, user_id=user_id,
+                          visit_type='shop', started_at=datetime.utcnow(), created_at=datetime.utcnow() - timedelta(seconds=1)))
+        session.flush()
+        return get_survey_question_ids(session, *args)
+
+    monkeypatch.setattr(visit_service, 'get_survey_question_ids', replay_first)
+    if not upsert:
+        monkeypatch.setattr(visit_service, 'get_dialect_insert', lambda session: None)
+
+    results = visit_service.sync_visits(db_session, tenant_id, user_id, visits)
+    assert [result['status'] for result in results] == ['exists', 'created', 'created']
+    assert db_session.query(VisitAnswer).filter(VisitAnswer.visit_id == uuid.UUID(visits[0]['id'])).count() == 0
+    assert db_session.query(VisitAnswer).filter(VisitAnswer.tenant_id == tenant_id).count() == 4
+    rollup = db_session.query(VisitDailyRollup).filter(VisitDailyRollup.tenant_id == tenant_id).one()
+    assert rollup.total_visits == 2
+
+
+def test_sync_endpoint(app, client, make_auth_headers):
+    """Test the batch endpoint's response and batch size limit."""
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    survey_id, question_ids = seed_survey(session, tenant_id)
+    session.remove()
+
+    headers = make_auth_headers(tenant_id, roles=['agent'])
+    visits = [make_visit(survey_id, question_ids), make_visit(survey_id, question_ids, visit_type=None)]
+    response = client.post('/api/visits/sync', json={'visits': visits}, headers=headers)
+    assert response.status_code == 200
+    assert (response.json['created'], response.json['existing'], response.json['invalid']) == (1, 0, 1)
+
+    response = client.post('/api/visits/sync', json={'visits': visits[:1]}, headers=headers)
+    assert response.json['results'][0]['status'] == 'exists'
+
+    app.config['VISIT_SYNC_MAX_BATCH'] = 1
+    response = client.post('/api/visits/sync', json={'visits': visits}, headers=headers)
+    assert response.status_code == 400
+    response = client.post('/api/visits/sync', json={'visits': {}}, headers=headers)
+    assert response.status_code == 400
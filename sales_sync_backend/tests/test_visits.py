@@ -314,4 +314,174 @@ def test_get_visit_photos(client, agent_headers, db_session, tenant, agent_user)
     # Check that created photos are in the list
     photo_urls = [p['file_url'] for p in response.json['photos']]
     assert 'https://example.com/photo1.jpg' in photo_urls
-    assert 'https://example.com/photo2.jpg' in photo_urls
\ No newline at end of file
+    assert 'https://example.com/photo2.jpg' in photo_urls
+
+
+def test_get_visits_page_keyset(db_session, tenant):
+    """Test keyset pagination of visits over (started_at, id)."""
+    from datetime import datetime, timedelta
+    from models.visit import Visit
+    from services.visit_service import get_visits_page
+
+    now = datetime.utcnow()
+    user_id = uuid.uuid4()
+    # Two visits share a timestamp so the id tiebreaker is exercised
+    started = [now - timedelta(minutes=minutes) for minutes in (1, 2, 2, 3, 4)]
+    for started_at in started:
+        db_session.add(Visit(
+            tenant_id=tenant.id,
+            survey_id=uuid.uuid4(),
+            user_id=user_id,
+            visit_type='individual',
+            started_at=started_at
+        ))
+    db_session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        visits, cursor = get_visits_page(db_session, tenant.id, limit=2, cursor=cursor)
+        seen.extend(visits)
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len({visit.id for visit in seen}) == 5
+    assert [visit.started_at for visit in seen] == sorted(started, reverse=True)
+
+    with pytest.raises(ValueError):
+        get_visits_page(db_session, tenant.id, cursor=['not-a-date', 'x'])
+
+
+def test_get_visits_paginated_endpoint(app, client, make_auth_headers):
+    """Test that the visits endpoint returns next_cursor and rejects bad cursors."""
+    from datetime import datetime, timedelta
+    from models.visit import Visit
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    now = datetime.utcnow()
+    for minutes in range(3):
+        session.add(Visit(
+            tenant_id=tenant_id,
+            survey_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            visit_type='shop',
+            started_at=now - timedelta(minutes=minutes)
+        ))
+    session.commit()
+    session.remove()
+
+    headers = make_auth_headers(tenant_id)
+    response = client.get('/api/visits?limit=2', headers=headers)
+    assert response.status_code == 200
+    assert len(response.json['visits']) == 2
+    assert response.json['next_cursor']
+
+    response = client.get(f"/api/visits?limit=2&cursor={response.json['next_cursor']}", headers=headers)
+    assert len(response.json['visits']) == 1
+    assert response.json['next_cursor'] is None
+
+    response = client.get('/api/visits?cursor=%%%', headers=headers)
+    assert response.status_code == 400
+
+
+def test_get_visits_streamed(app, client, make_auth_headers):
+    """Test streaming visits as a JSON document and as NDJSON."""
+    import json
+    from datetime import datetime, timedelta
+    from models.visit import Visit
+
+    tenant_id = uuid.uuid4()
+    session = app.db_session
+    now = datetime.utcnow()
+    for minutes in range(3):
+        session.add(Visit(
+            tenant_id=tenant_id,
+            survey_id=uuid.uuid4(),
+            user_id=uuid.uuid4(),
+            visit_type='shop',
+            started_at=now - timedelta(minutes=minutes)
+        ))
+    session.commit()
+    session.remove()
+
+    headers = make_auth_headers(tenant_id)
+    response = client.get('/api/visits?stream=true&visit_type=shop', headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/json'
+    assert len(response.json['visits']) == 3
+
+    response = client.get('/api/visits', headers=dict(headers, Accept='application/x-ndjson'))
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['tenant_id'] for line in lines] == [str(tenant_id)] * 3
+
+
+def test_complete_visit_inserts_answers_in_one_statement(db_session, tenant):
+    """Test that completion validates answers in one query and inserts them in one statement."""
+    from sqlalchemy import event
+    from models.survey import Survey, SurveyQuestion
+    from models.visit import VisitAnswer
+    from services.visit_service import complete_visit, create_visit
+    
+    tenant_id = tenant.id
+    survey = Survey(tenant_id=tenant_id, name='Long Survey', type='shop')
+    db_session.add(survey)
+    db_session.flush()
+    question_ids = [uuid.uuid4() for _ in range(120)]
+    db_session.add_all([SurveyQuestion(id=question_id, tenant_id=tenant_id, survey_id=survey.id, question_text='Q?', input_type='text')
+                        for question_id in question_ids])
+    db_session.commit()
+    visit = create_visit(db_session, tenant_id, uuid.uuid4(), survey.id, 'shop')
+    visit_id = visit.id
+    
+    statements = []
+    
+    def count_statement(*args):
+        statements.append(args[2])
+    
+    event.listen(db_session.bind, 'before_cursor_execute', count_statement)
+    try:
+        complete_visit(db_session, tenant_id, visit, [{'question_id': str(question_id), 'answer_text': 'yes'} for question_id in question_ids])
+    finally:
+        event.remove(db_session.bind, 'before_cursor_execute', count_statement)
+    
+    # Question lookup, visit update, answer insert and rollup update
+    assert len(statements) == 4
+    assert sum(1 for statement in statements if statement.startswith('INSERT INTO visit_answers')) == 1
+    assert db_session.query(VisitAnswer).filter(VisitAnswer.visit_id == visit_id).count() == 120
+
+
+def test_complete_visit_rejects_invalid_answers(db_session, tenant):
+    """Test that one invalid answer fails the completion without writing anything."""
+    from models.survey import Survey, SurveyQuestion
+    from models.visit import Visit, VisitAnswer
+    from services.visit_service import AnswerValidationError, complete_visit, create_visit
+    
+    tenant_id = tenant.id
+    survey = Survey(tenant_id=tenant_id, name='Survey', type='shop')
+    db_session.add(survey)
+    db_session.flush()
+    question = SurveyQuestion(tenant_id=tenant_id, survey_id=survey.id, question_text='Q?', input_type='text')
+    db_session.add(question)
+    db_session.commit()
+    visit = create_visit(db_session, tenant_id, uuid.uuid4(), survey.id, 'shop')
+    visit_id = visit.id
+    
+    answers = [
+        {'question_id': str(question.id), 'answer_text': 'yes'},
+        {'question_id': str(uuid.uuid4()), 'answer_text': 'no'},
+        {'question_id': 'nope'}
+    ]
+    with pytest.raises(AnswerValidationError) as error:
+        complete_visit(db_session, tenant_id, visit, answers)
+    assert error.value.errors == [
+        {'index': 1, 'error': 'Question does not belong to the visit survey'},
+        {'index': 2, 'error': 'Invalid question ID'}
+    ]
+    
+    db_session.expire_all()
+    assert db_session.query(Visit).filter(Visit.id == visit_id).one().completed_at is None
+    assert db_session.query(VisitAnswer).filter(VisitAnswer.visit_id == visit_id).count() == 0
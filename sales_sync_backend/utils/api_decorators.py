@@ -2,8 +2,6 @@
 Decorators for API routes to document them with OpenAPI.
 """
 import functools
-from flask import request
-from utils.api_docs import spec
 
 
 def document_api(
@@ -44,10 +42,6 @@ def document_api(
         def wrapper(*args, **kwargs):
             return func(*args, **kwargs)
         
-        # Get the route path and method
-        path = request.url_rule.rule
-        method = request.method.lower()
-        
         # Create operation object
         operation = {
             "tags": tags,
@@ -82,8 +76,9 @@ def document_api(
         # Add security
         operation["security"] = security
         
-        # Register the operation with APISpec
-        spec.path(path=path, operations={method: operation})
+        # The path and methods come from the URL rule when the spec is built
+        # (see utils.api_docs.register_documented_views)
+        wrapper.__openapi_operation__ = operation
         
         return wrapper
     
@@ -1,13 +1,30 @@
 """
 API documentation utilities using apispec and OpenAPI.
 """
-from apispec import APISpec
-from apispec.ext.marshmallow import MarshmallowPlugin
-from flask import Flask, jsonify, current_app
+import gzip
+import hashlib
+import json
+import re
+import threading
+
+from flask import Flask, Response, request
 from flask_swagger_ui import get_swaggerui_blueprint
 
+from utils.lazy_views import resolve_view
+
+# Serializes the one-time spec build across request threads
+_spec_lock = threading.Lock()
+
+# Flask converters such as <int:visit_id> become OpenAPI {visit_id}
+_RULE_ARGUMENT = re.compile(r"<(?:[^:<>]+:)?([^<>]+)>")
+
+
 def create_spec():
     """Create a new APISpec instance."""
+    # apispec and marshmallow are only needed once the spec is built
+    from apispec import APISpec
+    from apispec.ext.marshmallow import MarshmallowPlugin
+    
     spec = APISpec(
         title="Sales-Sync API",
         version="1.0.0",
@@ -68,12 +85,23 @@ def setup_swagger(app: Flask, base_url: str = "/api/docs"):
     # Add route for Swagger JSON
     @app.route(f"{base_url}/swagger.json")
     def swagger_json():
-        # Create a new spec instance for each request
-        spec = create_spec()
-        # Register schemas and routes
-        register_schemas(spec)
-        register_all_routes(spec)
-        return jsonify(spec.to_dict())
+        document = get_spec_document(app)
+        gzipped = "gzip" in request.accept_encodings
+        etag = document.gzip_etag if gzipped else document.etag
+        # Clients that already have this version, in either encoding, get an empty 304
+        cached_etag = next((tag for tag in (document.etag, document.gzip_etag) if tag in request.if_none_match), None)
+        if cached_etag:
+            response = Response(status=304)
+            etag = cached_etag
+        elif gzipped:
+            response = Response(document.gzipped, mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(document.body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = "public, max-age=300"
+        return response
 
 
 def register_schemas(spec):
@@ -1346,9 +1374,81 @@ def register_all_routes(spec):
     # register_admin_routes()
 
 
-def init_api_docs():
-    """Initialize API documentation."""
-    # Create a new spec instance
+def register_documented_views(spec, app):
+    """Register views decorated with document_api under their URL rules."""
+    for rule in app.url_map.iter_rules():
+        view = resolve_view(app.view_functions.get(rule.endpoint))
+        operation = getattr(view, "__openapi_operation__", None)
+        if operation is None:
+            continue
+        methods = sorted(rule.methods - {"HEAD", "OPTIONS"})
+        spec.path(
+            path=_RULE_ARGUMENT.sub(r"{\1}", rule.rule),
+            operations={method.lower(): dict(operation) for method in methods},
+        )
+
+
+class SpecDocument:
+    """Serialized OpenAPI document with its gzip encoding and an ETag for each encoding."""
+
+    def __init__(self, spec_dict):
+        self.body = json.dumps(spec_dict, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        # mtime=0 keeps the compressed bytes identical across builds and workers
+        self.gzipped = gzip.compress(self.body, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        # Each content-coding needs its own strong validator
+        self.gzip_etag = f"{self.etag}-gzip"
+
+
+def build_spec(app):
+    """
+    Build the OpenAPI spec for an application.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        dict: OpenAPI document
+    """
     spec = create_spec()
     register_schemas(spec)
-    register_all_routes(spec)
\ No newline at end of file
+    register_all_routes(spec)
+    register_documented_views(spec, app)
+    return spec.to_dict()
+
+
+def get_spec_document(app):
+    """
+    Get the app's serialized OpenAPI document, building it on first use.
+
+    The spec only changes when the code does, so it is built and
+    serialized once per process instead of on every request.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        SpecDocument: Cached document
+    """
+    document = app.extensions.get("openapi_spec")
+    if document is None:
+        with _spec_lock:
+            document = app.extensions.get("openapi_spec")
+            if document is None:
+                document = SpecDocument(build_spec(app))
+                app.extensions["openapi_spec"] = document
+    return document
+
+
+def init_api_docs(app):
+    """
+    Initialize API documentation.
+
+    The spec is built on the first request for it, unless API_DOCS_PREBUILD
+    asks for it to be built at startup.
+
+    Args:
+        app: Flask application
+    """
+    if app.config.get("API_DOCS_PREBUILD", False):
+        get_spec_document(app)
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Per-request authentication context.
+
+The access token is decoded and validated once per request, by the tenant
+middleware, and the result is cached on g. jwt_required, tenant_required
+and the role decorators read the cached claims instead of decoding the token
+again. A token that failed validation keeps its exception, which is raised
+again where a valid token is required so clients get the same
+flask_jwt_extended error responses as before.
+"""
+from flask import g, request
+from flask_jwt_extended import verify_jwt_in_request
+
+from models.role import ROLE_BITS, mask_to_roles, roles_to_mask
+
+# Access token claim holding the role bitmask (see models.role)
+ROLE_MASK_CLAIM = 'rm'
+
+
+class AuthContext:
+    """Claims, tenant and role mask of the request's access token."""
+
+    def __init__(self, claims=None, error=None):
+        self.request = request._get_current_object()
+        self.claims = claims or {}
+        self.error = error
+        self.user_id = self.claims.get('sub')
+
+        # Tokens issued before role masks carry a list of role names
+        if ROLE_MASK_CLAIM in self.claims:
+            self.role_mask = int(self.claims[ROLE_MASK_CLAIM])
+        else:
+            self.role_mask = roles_to_mask(self.claims.get('roles'))
+        self.is_super_admin = bool(self.role_mask & ROLE_BITS['super_admin'])
+
+        # Super admins may act on another tenant with X-Tenant-ID
+        if self.is_super_admin and request.headers.get('X-Tenant-ID'):
+            self.tenant_id = request.headers.get('X-Tenant-ID')
+        else:
+            self.tenant_id = self.claims.get('tenant_id')
+
+    @property
+    def roles(self):
+        return frozenset(mask_to_roles(self.role_mask))
+
+    @property
+    def authenticated(self):
+        return self.error is None and bool(self.claims)
+
+
+def load_auth_context():
+    """
+    Decode and validate the request's access token, once per request.
+
+    Returns:
+        AuthContext: Cached context; unauthenticated if there is no valid token
+    """
+    # g can outlive a request when an app context was pushed around it
+    context = g.get('auth_context')
+    if context is not None and context.request is request._get_current_object():
+        return context
+
+    try:
+        result = verify_jwt_in_request(optional=True)
+        context = AuthContext(result[1] if result else None)
+    except Exception as e:
+        context = AuthContext(error=e)
+
+    g.auth_context = context
+    return context
+
+
+def require_auth_context():
+    """
+    Get the auth context of a request that must carry a valid access token.
+
+    Returns:
+        AuthContext: Authenticated context
+
+    Raises:
+        Exception: The flask_jwt_extended error for a missing or invalid token
+    """
+    context = load_auth_context()
+    if context.error is not None:
+        raise context.error
+    if not context.authenticated:
+        # Raises NoAuthorizationError (exempt methods such as OPTIONS pass)
+        verify_jwt_in_request()
+    return context
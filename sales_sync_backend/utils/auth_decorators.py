@@ -1,26 +1,58 @@
 from functools import wraps
-from flask import jsonify, request, g
-from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from flask import current_app, jsonify, g
+from flask_jwt_extended import jwt_required as _jwt_required
+
+from models.role import ROLE_BITS, ROLE_MASKS_AT_LEAST
+from utils.auth_context import load_auth_context, require_auth_context
+
+
+def jwt_required(optional=False, fresh=False, refresh=False, locations=None):
+    """
+    Decorator to require a valid access token, reusing the request's auth context.
+    
+    Drop-in replacement for flask_jwt_extended.jwt_required. Fresh, refresh
+    and custom location checks are delegated to flask_jwt_extended.
+    """
+    def decorator(fn):
+        if fresh or refresh or locations is not None:
+            return _jwt_required(optional, fresh, refresh, locations)(fn)
+        
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if optional:
+                context = load_auth_context()
+                if context.error is not None:
+                    raise context.error
+            else:
+                require_auth_context()
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+        return wrapper
+    return decorator
+
 
 def role_required(roles):
     """
     Decorator to check if the user has the required role.
     
     Args:
-        roles (str or list): Role or list of roles required to access the endpoint.
+        roles (str, list or int): Role, list of roles or role bitmask required
+            to access the endpoint.
     """
+    # Compile the roles to one bitmask at import time
+    if isinstance(roles, int):
+        required_mask = roles
+    else:
+        names = roles if isinstance(roles, list) else [roles]
+        unknown = [name for name in names if name not in ROLE_BITS]
+        if unknown:
+            raise ValueError(f"Unknown roles: {', '.join(unknown)}")
+        required_mask = sum(ROLE_BITS[name] for name in set(names))
+    
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
-            
-            # Convert single role to list
-            required_roles = roles if isinstance(roles, list) else [roles]
-            
             # Check if user has any of the required roles
-            user_roles = claims.get('roles', [])
-            if not any(role in user_roles for role in required_roles):
+            if not require_auth_context().role_mask & required_mask:
                 return jsonify({"error": "Insufficient permissions"}), 403
             
             return fn(*args, **kwargs)
@@ -28,48 +60,54 @@ def role_required(roles):
     return decorator
 
 
+def minimum_role_required(role):
+    """
+    Decorator to check if the user has the given role or a higher one.
+    
+    Args:
+        role (str): Lowest role allowed to access the endpoint.
+    """
+    return role_required(ROLE_MASKS_AT_LEAST[role])
+
+
 def admin_required(fn):
     """Decorator to check if the user has admin role."""
-    return role_required(['admin', 'super_admin'])(fn)
+    return minimum_role_required('admin')(fn)
 
 
 def super_admin_required(fn):
     """Decorator to check if the user has super_admin role."""
-    return role_required('super_admin')(fn)
+    return minimum_role_required('super_admin')(fn)
 
 
 def agent_required(fn):
     """Decorator to check if the user has agent role or higher."""
-    return role_required(['agent', 'team_leader', 'area_manager', 'regional_manager', 
-                         'national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('agent')(fn)
 
 
 def team_leader_required(fn):
     """Decorator to check if the user has team_leader role or higher."""
-    return role_required(['team_leader', 'area_manager', 'regional_manager', 
-                         'national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('team_leader')(fn)
 
 
 def area_manager_required(fn):
     """Decorator to check if the user has area_manager role or higher."""
-    return role_required(['area_manager', 'regional_manager', 
-                         'national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('area_manager')(fn)
 
 
 def regional_manager_required(fn):
     """Decorator to check if the user has regional_manager role or higher."""
-    return role_required(['regional_manager', 'national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('regional_manager')(fn)
 
 
 def national_manager_required(fn):
     """Decorator to check if the user has national_manager role or higher."""
-    return role_required(['national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('national_manager')(fn)
 
 
 def manager_required(fn):
     """Decorator to check if the user has any manager role or higher."""
-    return role_required(['team_leader', 'area_manager', 'regional_manager', 
-                         'national_manager', 'admin', 'super_admin'])(fn)
+    return minimum_role_required('team_leader')(fn)
 
 
 def tenant_required(fn):
@@ -79,21 +117,8 @@ def tenant_required(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
-        verify_jwt_in_request()
-        claims = get_jwt()
-        
-        # Get tenant_id from JWT
-        jwt_tenant_id = claims.get('tenant_id')
-        
-        # Check if user is super_admin (can access any tenant)
-        user_roles = claims.get('roles', [])
-        is_super_admin = 'super_admin' in user_roles
-        
-        # If super_admin, allow X-Tenant-ID header to override tenant_id
-        if is_super_admin and request.headers.get('X-Tenant-ID'):
-            g.tenant_id = request.headers.get('X-Tenant-ID')
-        else:
-            g.tenant_id = jwt_tenant_id
+        # Tenant from the JWT, or X-Tenant-ID for super admins
+        g.tenant_id = require_auth_context().tenant_id
         
         # If no tenant_id, return error
         if not g.tenant_id:
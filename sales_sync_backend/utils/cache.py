@@ -0,0 +1,258 @@
+"""
+Tenant-scoped result cache for analytics endpoints.
+
+Entries are keyed by tenant, endpoint and request parameters, and include a
+per-tenant generation counter. Writes that affect analytics bump the
+generation, which makes every older entry for that tenant unreachable; the
+stale entries then age out through TTL (Redis) or LRU eviction (memory).
+
+Read replicas may lag behind the write that bumped the generation. For
+DB_REPLICA_MAX_LAG seconds after a tenant's last write, cache misses are
+computed on the primary, so a replica's stale result is never stored
+under the new generation.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, has_app_context, jsonify, request
+
+from utils.database import use_primary
+
+logger = logging.getLogger(__name__)
+
+CACHE_HEADER = 'X-Cache'
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._written_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_generation(self, tenant_id):
+        with self._lock:
+            return self._generations.get(tenant_id, 0)
+
+    def incr_generation(self, tenant_id):
+        with self._lock:
+            self._generations[tenant_id] = self._generations.get(tenant_id, 0) + 1
+            self._written_at[tenant_id] = time.time()
+            return self._generations[tenant_id]
+
+    def get_written_at(self, tenant_id):
+        with self._lock:
+            return self._written_at.get(tenant_id)
+
+
+class RedisCacheBackend:
+    """Redis cache shared by all workers."""
+
+    def __init__(self, url, prefix='sales_sync:analytics:'):
+        # Imported here so processes without a Redis backend never load it
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('redis is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def get_generation(self, tenant_id):
+        value = self.client.get(f'{self.prefix}gen:{tenant_id}')
+        return int(value) if value is not None else 0
+
+    def incr_generation(self, tenant_id):
+        pipeline = self.client.pipeline()
+        pipeline.incr(f'{self.prefix}gen:{tenant_id}')
+        pipeline.set(f'{self.prefix}written:{tenant_id}', time.time())
+        return pipeline.execute()[0]
+
+    def get_written_at(self, tenant_id):
+        value = self.client.get(f'{self.prefix}written:{tenant_id}')
+        return float(value) if value is not None else None
+
+
+class AnalyticsCache:
+    """Cache facade that builds generation-aware keys."""
+
+    def __init__(self, backend, ttl=60):
+        self.backend = backend
+        self.ttl = ttl
+
+    def make_key(self, tenant_id, endpoint, params):
+        """
+        Build a cache key for the current tenant generation.
+
+        Args:
+            tenant_id: Tenant ID
+            endpoint: Endpoint name
+            params: Dictionary of request parameters
+
+        Returns:
+            str: Cache key
+        """
+        generation = self.backend.get_generation(str(tenant_id))
+        encoded_params = json.dumps(params, sort_keys=True, default=str)
+        return f'{tenant_id}:{generation}:{endpoint}:{encoded_params}'
+
+    def get(self, key):
+        return self.backend.get(key)
+
+    def set(self, key, value):
+        self.backend.set(key, value, self.ttl)
+
+    def invalidate_tenant(self, tenant_id):
+        """Bump the tenant generation so existing entries are never served."""
+        self.backend.incr_generation(str(tenant_id))
+
+    def written_within(self, tenant_id, seconds):
+        """
+        Check whether a tenant's cache was invalidated by a recent write.
+
+        Args:
+            tenant_id: Tenant ID
+            seconds: Window in seconds
+
+        Returns:
+            bool: True if the last write was less than seconds ago
+        """
+        written_at = self.backend.get_written_at(str(tenant_id))
+        return written_at is not None and time.time() - written_at < seconds
+
+
+def init_analytics_cache(app):
+    """
+    Initialize the analytics cache from app config.
+
+    Args:
+        app: Flask application
+    """
+    backend_name = app.config.get('ANALYTICS_CACHE_BACKEND', 'memory')
+    if backend_name == 'redis':
+        backend = RedisCacheBackend(app.config['REDIS_URL'])
+    elif backend_name == 'memory':
+        backend = MemoryCacheBackend(app.config.get('ANALYTICS_CACHE_MAX_ENTRIES', 1024))
+    else:
+        app.extensions['analytics_cache'] = None
+        return
+
+    app.extensions['analytics_cache'] = AnalyticsCache(backend, app.config.get('ANALYTICS_CACHE_TTL', 60))
+
+
+def get_analytics_cache():
+    """
+    Get the analytics cache for the current app.
+
+    Returns:
+        AnalyticsCache: Cache or None if disabled or outside an app context
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('analytics_cache')
+
+
+def invalidate_tenant_cache(tenant_id):
+    """
+    Invalidate cached analytics for a tenant after a write.
+
+    Args:
+        tenant_id: Tenant ID
+    """
+    cache = get_analytics_cache()
+    if cache is None or tenant_id is None:
+        return
+
+    try:
+        cache.invalidate_tenant(tenant_id)
+    except Exception as e:
+        logger.warning(f"Analytics cache invalidation failed: {str(e)}")
+
+
+def cached_response(endpoint, params=('user_id', 'start_date', 'end_date', 'group_by')):
+    """
+    Decorator to cache successful JSON responses of tenant-scoped handlers.
+
+    Must be applied inside the JWT and tenant decorators. Sets the X-Cache
+    response header to HIT or MISS. Misses shortly after a tenant's write
+    are computed on the primary.
+
+    Args:
+        endpoint: Endpoint name used in the cache key
+        params: Query parameters that are part of the cache key
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            from utils.request_utils import get_tenant_id_from_jwt
+
+            cache = get_analytics_cache()
+            tenant_id = get_tenant_id_from_jwt()
+            if cache is None or not tenant_id:
+                return fn(*args, **kwargs)
+
+            # Look up cached result
+            key = None
+            try:
+                key = cache.make_key(tenant_id, endpoint, {name: request.args.get(name) for name in params})
+                cached = cache.get(key)
+            except Exception as e:
+                logger.warning(f"Analytics cache lookup failed: {str(e)}")
+                cached = None
+
+            if cached is not None:
+                response = jsonify(cached)
+                response.headers[CACHE_HEADER] = 'HIT'
+                return response, 200
+
+            # Replicas may not have the tenant's last write yet
+            try:
+                if cache.written_within(tenant_id, current_app.config.get('DB_REPLICA_MAX_LAG', 10)):
+                    use_primary()
+            except Exception as e:
+                logger.warning(f"Analytics cache write check failed: {str(e)}")
+                key = None
+
+            # Compute and store result
+            response, status = fn(*args, **kwargs)
+            if status == 200 and key is not None:
+                try:
+                    cache.set(key, response.get_json())
+                except Exception as e:
+                    logger.warning(f"Analytics cache store failed: {str(e)}")
+            response.headers[CACHE_HEADER] = 'MISS'
+            return response, status
+        return wrapper
+    return decorator
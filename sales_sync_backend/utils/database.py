@@ -0,0 +1,429 @@
+"""
+Database engines and connection pools.
+
+Engines are created once per database URL and pool settings and shared by
+every app, CLI command and init_db call in the process, so a worker holds at
+most one pool per database. Pools are sized from config, or replaced by
+NullPool when an external pooler such as PgBouncer owns the connections.
+
+Pooled connections are never reused across os.fork(): each connection
+records the PID that opened it, and a checkout in another process discards
+it so the child opens its own. This keeps gunicorn --preload workers from
+sharing sockets with the master.
+
+Reporting reads can be routed to read replicas (DATABASE_REPLICA_URLS).
+Each request's read session is bound to one healthy replica, picked round
+robin, and falls back to the primary when no replica answers. A query that
+loses its replica connection marks that replica unhealthy and is retried
+once on the next replica or the primary (read_with_retry). A request
+that has written through the primary session, or that sends
+X-Read-Consistency: strong, reads from the primary instead so it always
+sees its own writes.
+"""
+import itertools
+import logging
+import os
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Pool modes
+POOL_QUEUE = 'queue'
+POOL_NULL = 'null'
+
+# Request header forcing reads from the primary
+READ_CONSISTENCY_HEADER = 'X-Read-Consistency'
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def record_checkin(self):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'checked_out': self.checked_out,
+                'peak_checked_out': self.peak_checked_out,
+                'wait_avg_ms': round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3)
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        self.metrics = kwargs.pop('metrics', None) or PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Keep the metrics when the pool is replaced by dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def get_engine_options(config, url):
+    """
+    Build create_engine() options from app config.
+
+    Args:
+        config: Flask config (or any mapping)
+        url: Database URL
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    options = {}
+    mode = config.get('DB_POOL_MODE', POOL_QUEUE)
+    if mode not in (POOL_QUEUE, POOL_NULL):
+        raise ValueError(f'Invalid DB_POOL_MODE: {mode}')
+
+    # SQLite picks its own pool class per file or memory database
+    if url.startswith('sqlite'):
+        if mode == POOL_NULL:
+            options['poolclass'] = NullPool
+        return options
+
+    if mode == POOL_NULL:
+        # An external pooler (PgBouncer) owns the server connections
+        options['poolclass'] = NullPool
+    else:
+        options.update(
+            poolclass=MeteredQueuePool,
+            pool_size=int(config.get('DB_POOL_SIZE', 5)),
+            max_overflow=int(config.get('DB_MAX_OVERFLOW', 10)),
+            pool_timeout=float(config.get('DB_POOL_TIMEOUT', 30)),
+            pool_recycle=int(config.get('DB_POOL_RECYCLE', 1800)),
+            pool_pre_ping=bool(config.get('DB_POOL_PRE_PING', True))
+        )
+
+    connect_args = {}
+    if url.startswith('postgresql'):
+        if config.get('DB_CONNECT_TIMEOUT'):
+            connect_args['connect_timeout'] = int(config['DB_CONNECT_TIMEOUT'])
+        # PgBouncer rejects startup parameters, so only set them on direct connections
+        if config.get('DB_STATEMENT_TIMEOUT') and mode != POOL_NULL:
+            connect_args['options'] = f"-c statement_timeout={int(config['DB_STATEMENT_TIMEOUT'])}"
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def _instrument(engine):
+    """Attach fork protection and metrics listeners to an engine's pool."""
+    metrics = getattr(engine.pool, 'metrics', None) or PoolMetrics()
+    engine.pool_metrics = metrics
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info['pid'] = os.getpid()
+        metrics.record_connect()
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        # Never reuse a connection opened by the parent of a forked worker
+        pid = os.getpid()
+        if connection_record.info.get('pid', pid) != pid:
+            connection_record.connection = connection_proxy.connection = None
+            raise exc.DisconnectionError(
+                f"Connection record belongs to pid {connection_record.info['pid']}, attempting to check out in pid {pid}"
+            )
+        metrics.record_checkout()
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.record_checkin()
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+
+def get_engine(url, **options):
+    """
+    Get the shared engine for a database URL and options, creating it once.
+
+    Args:
+        url: Database URL
+        **options: create_engine() keyword arguments
+
+    Returns:
+        Engine: SQLAlchemy engine
+    """
+    key = (url, tuple(sorted((name, repr(value)) for name, value in options.items())))
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = create_engine(url, **options)
+            _instrument(engine)
+            _engines[key] = engine
+        return engine
+
+
+def get_app_engine(app):
+    """
+    Get the shared engine for an app's SQLALCHEMY_DATABASE_URI.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        Engine: SQLAlchemy engine
+    """
+    url = app.config['SQLALCHEMY_DATABASE_URI']
+    return get_engine(url, **get_engine_options(app.config, url))
+
+
+class ReplicaRouter:
+    """Round-robin replica picker that skips replicas failing a health check."""
+
+    def __init__(self, primary, replicas, health_interval=30):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.health_interval = health_interval
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+        # Replica -> (healthy, time of the next check)
+        self._health = {replica: (True, 0.0) for replica in self.replicas}
+
+    def _is_healthy(self, replica):
+        with self._lock:
+            healthy, next_check = self._health[replica]
+        now = time.monotonic()
+        if now < next_check:
+            return healthy
+
+        try:
+            with replica.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            healthy = True
+        except exc.DBAPIError as e:
+            logger.warning(f"Read replica {replica.url.render_as_string(hide_password=True)} is unavailable: {str(e)}")
+            healthy = False
+        with self._lock:
+            self._health[replica] = (healthy, now + self.health_interval)
+        return healthy
+
+    def mark_unhealthy(self, replica):
+        """Skip a replica until the next health check."""
+        with self._lock:
+            self._health[replica] = (False, time.monotonic() + self.health_interval)
+
+    def get_engine(self):
+        """
+        Get the next healthy replica engine.
+
+        Returns:
+            Engine: Replica engine, or the primary if no replica is healthy
+        """
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = next(self._cycle)
+            if self._is_healthy(replica):
+                return replica
+        return self.primary
+
+
+def init_database(app):
+    """
+    Attach the shared engines and scoped sessions to the app.
+
+    app.db_session is bound to the primary. app.db_read_session is bound to
+    a read replica per request when DATABASE_REPLICA_URLS is set, and to
+    the primary otherwise; use get_read_session() to pick between them.
+
+    Args:
+        app: Flask application
+    """
+    app.db_engine = get_app_engine(app)
+    app.db_session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=app.db_engine))
+
+    # Reads after a write in the same request must see it
+    event.listen(app.db_session.session_factory, 'after_flush', _mark_primary_write)
+
+    urls = app.config.get('DATABASE_REPLICA_URLS') or []
+    if isinstance(urls, str):
+        urls = [url.strip() for url in urls.split(',') if url.strip()]
+    replicas = [get_engine(url, **get_engine_options(app.config, url)) for url in urls]
+    app.db_router = ReplicaRouter(app.db_engine, replicas, app.config.get('DB_REPLICA_HEALTH_INTERVAL', 30)) if replicas else None
+
+    if app.db_router is None:
+        app.db_read_session = app.db_session
+    else:
+        router = app.db_router
+        app.db_read_session = scoped_session(
+            lambda: sessionmaker(autocommit=False, autoflush=False, bind=router.get_engine())()
+        )
+
+
+def _mark_primary_write(session, flush_context):
+    """Pin the rest of the request to the primary after it writes."""
+    if has_request_context():
+        g.db_primary_write = True
+
+
+def use_primary():
+    """Send the rest of this request's reads to the primary."""
+    g.db_primary_write = True
+
+
+def get_read_session():
+    """
+    Get the session for read-only service calls in the current request.
+
+    Returns:
+        scoped_session: The read session, or the primary session when the
+            request has written or asked for strong consistency
+    """
+    app = current_app._get_current_object()
+    if app.db_read_session is app.db_session:
+        return app.db_session
+    if g.get('db_primary_write') or request.headers.get(READ_CONSISTENCY_HEADER, '').lower() == 'strong':
+        return app.db_session
+    return app.db_read_session
+
+
+def read_with_retry(fn, *args, **kwargs):
+    """
+    Run a read-only service call on the read session.
+
+    If the call fails because its replica went away, the replica is skipped
+    until its next health check and the call is retried once on the next
+    healthy replica, or the primary.
+
+    Args:
+        fn: Service function taking the session as its first argument
+        *args: Further arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        The result of fn
+    """
+    app = current_app._get_current_object()
+    session = get_read_session()
+    if session is app.db_session:
+        return fn(session, *args, **kwargs)
+
+    try:
+        return fn(session, *args, **kwargs)
+    except (exc.OperationalError, exc.DisconnectionError) as e:
+        engine = session.get_bind()
+        app.db_read_session.remove()
+        if engine is app.db_engine:
+            raise
+        logger.warning(f"Read replica {engine.url.render_as_string(hide_password=True)} failed, retrying: {str(e)}")
+        app.db_router.mark_unhealthy(engine)
+    return fn(get_read_session(), *args, **kwargs)
+
+
+def get_pool_stats():
+    """
+    Get pool state and checkout metrics for every engine in this process.
+
+    Returns:
+        list: One dictionary per engine
+    """
+    with _engines_lock:
+        engines = list(_engines.values())
+
+    stats = []
+    for engine in engines:
+        pool = engine.pool
+        entry = {
+            'url': engine.url.render_as_string(hide_password=True),
+            'pool': type(pool).__name__,
+            'metrics': engine.pool_metrics.to_dict()
+        }
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow()
+            )
+        stats.append(entry)
+    return stats
+
+
+def dispose_engines():
+    """Close every pooled connection, e.g. at shutdown or after a failover."""
+    with _engines_lock:
+        engines = list(_engines.values())
+    for engine in engines:
+        engine.dispose()
+
+
+def _reset_metrics_after_fork():
+    """Start a forked worker with empty metrics; its pools refill lazily."""
+    for engine in list(_engines.values()):
+        engine.pool_metrics.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_metrics_after_fork)
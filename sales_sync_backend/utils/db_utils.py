@@ -1,6 +1,22 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
 from flask import g
+from sqlalchemy import Date, DateTime, Numeric, func, text, tuple_
+from sqlalchemy.orm import undefer
 from sqlalchemy.orm.query import Query
 
+# Count strategies for list pages
+COUNT_EXACT = 'exact'
+COUNT_CAPPED = 'capped'
+COUNT_ESTIMATE = 'estimate'
+COUNT_NONE = 'none'
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 500
+DEFAULT_COUNT_CAP = 10000
+
 def tenant_scoped_query(query, model):
     """
     Apply tenant_id filter to query if model has tenant_id attribute.
@@ -64,4 +80,233 @@ class TenantScopedQuery(Query):
         if hasattr(model, 'tenant_id') and g.tenant_id:
             return super(TenantScopedQuery, self).filter(model.tenant_id == g.tenant_id).__iter__()
         
-        return super().__iter__()
\ No newline at end of file
+        return super().__iter__()
+
+
+class Page:
+    """
+    One page of a list query.
+    
+    total is None for keyset pages and when counting is disabled.
+    total_exact is False when total is a cap or a planner estimate.
+    """
+    def __init__(self, items, per_page, page=None, total=None, total_exact=True, next_cursor=None, serialize=None):
+        self.items = items
+        self.per_page = per_page
+        self.page = page
+        self.total = total
+        self.total_exact = total_exact
+        self.next_cursor = next_cursor
+        self.serialize = serialize
+    
+    def to_response(self, items_key, serialize=None):
+        """
+        Build the paginated response body for this page.
+        
+        Args:
+            items_key: Response key for the items
+            serialize: Function converting an item to a dict (defaults to the
+                page's fieldset serializer, then the model's compiled serializer)
+        
+        Returns:
+            dict: Paginated response
+        """
+        from utils.request_utils import encode_cursor, paginate_response
+        from utils.serializers import serialize as serialize_item
+        
+        serialize = serialize or self.serialize or serialize_item
+        return paginate_response(
+            [serialize(item) for item in self.items],
+            total=self.total,
+            page=self.page,
+            per_page=self.per_page,
+            next_cursor=encode_cursor(self.next_cursor) if self.next_cursor else None,
+            items_key=items_key,
+            total_exact=self.total_exact
+        )
+
+
+def _coerce_cursor_value(column, value):
+    """
+    Convert a decoded cursor value back to the column's Python type.
+    
+    Raises:
+        ValueError: If the value does not match the column type
+    """
+    if value is None:
+        raise ValueError('Invalid cursor')
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(str(value))
+    if isinstance(column.type, Date):
+        return date.fromisoformat(str(value))
+    if isinstance(column.type, Numeric):
+        return Decimal(str(value))
+    return str(value)
+
+
+def _estimate_count(query):
+    """
+    Get the planner's row estimate for a query on PostgreSQL.
+    
+    Returns:
+        int: Estimated row count, or None if no estimate is available
+    """
+    session = query.session
+    dialect = session.get_bind().dialect
+    if dialect.name != 'postgresql':
+        return None
+    
+    try:
+        compiled = query.statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+        plan = session.execute(text(f'EXPLAIN (FORMAT JSON) {compiled}')).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        return None
+
+
+def count_query(query, strategy=COUNT_CAPPED, cap=DEFAULT_COUNT_CAP):
+    """
+    Count the rows of a list query without materializing them.
+    
+    The capped strategy counts at most cap + 1 rows, so its cost is bounded
+    however large the table is. The estimate strategy uses the PostgreSQL
+    planner estimate when it is above the cap and falls back to a capped
+    count otherwise.
+    
+    Args:
+        query: SQLAlchemy query
+        strategy: 'exact', 'capped', 'estimate' or 'none'
+        cap: Maximum number of rows counted by the capped strategy
+    
+    Returns:
+        tuple: (total or None, whether the total is exact)
+    """
+    if strategy == COUNT_NONE:
+        return None, False
+    
+    query = query.order_by(None)
+    if strategy == COUNT_EXACT:
+        return query.count(), True
+    
+    if strategy == COUNT_ESTIMATE:
+        estimate = _estimate_count(query)
+        if estimate is not None and estimate > cap:
+            return estimate, False
+    
+    capped = query.limit(cap + 1).subquery()
+    total = query.session.query(func.count()).select_from(capped).scalar() or 0
+    if total > cap:
+        return cap, False
+    return total, True
+
+
+def paginate_query(query, model, sortable, sort='created_at', order='desc', page=1, per_page=DEFAULT_PER_PAGE,
+                   cursor=None, count=COUNT_CAPPED, count_cap=DEFAULT_COUNT_CAP, fields=None, include=None):
+    """
+    Sort and paginate a list query.
+    
+    Rows are ordered by the sort column with the primary key as tiebreaker.
+    Without a cursor the page is selected with LIMIT/OFFSET and counted with
+    the given strategy; with a cursor the page continues strictly after the
+    cursor row and no count is run. Both modes return the cursor of the
+    last row when more rows follow, so clients can switch to keyset paging
+    after the first page.
+    
+    Args:
+        query: SQLAlchemy query over model
+        model: SQLAlchemy model class
+        sortable: Dictionary of sort field name to column (rows with a NULL
+            sort value are skipped by cursor pages)
+        sort: Sort field name (must be in sortable)
+        order: 'asc' or 'desc'
+        page: Page number for offset pagination
+        per_page: Number of items per page
+        cursor: Decoded cursor [sort value, id] from the previous page (optional)
+        count: Count strategy (see count_query)
+        count_cap: Row cap for the capped and estimate strategies
+        fields: Field names to load and return (optional, all fields if omitted)
+        include: Relationship names to eager load and return (optional)
+    
+    Returns:
+        Page: Page of model instances
+    
+    Raises:
+        ValueError: If the sort field, order, cursor, fields or include is invalid
+    """
+    if sort not in sortable:
+        raise ValueError(f'Invalid sort field: {sort}')
+    if order not in ('asc', 'desc'):
+        raise ValueError(f'Invalid sort order: {order}')
+    
+    sort_column = sortable[sort]
+    per_page = max(1, min(int(per_page), MAX_PER_PAGE))
+    page = max(1, int(page))
+    
+    # Load only the requested columns, plus the keyset columns for the cursor
+    serialize = None
+    if fields or include:
+        from utils.serializers import apply_fieldset, make_serializer
+        
+        serialize = make_serializer(model, fields, include)
+        query = apply_fieldset(query, model, fields, include)
+        if fields:
+            query = query.options(undefer(sort_column), undefer(model.id))
+    
+    # Continue after the cursor
+    total, total_exact = None, True
+    if cursor:
+        try:
+            cursor_value = _coerce_cursor_value(sort_column, cursor[0])
+            cursor_id = str(cursor[1])
+        except (IndexError, TypeError, ValueError, ArithmeticError):
+            raise ValueError('Invalid cursor')
+        keyset = tuple_(sort_column, model.id)
+        bound = tuple_(cursor_value, cursor_id)
+        query = query.filter(keyset < bound if order == 'desc' else keyset > bound)
+        page = None
+    else:
+        total, total_exact = count_query(query, count, count_cap)
+    
+    # Order with the primary key as tiebreaker, replacing any existing order
+    query = query.order_by(None)
+    if order == 'desc':
+        query = query.order_by(sort_column.desc(), model.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), model.id.asc())
+    if page:
+        query = query.offset((page - 1) * per_page)
+    
+    # Fetch one extra row to detect the next page
+    items = query.limit(per_page + 1).all()
+    
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last_item = items[-1]
+        last_value = getattr(last_item, sort_column.key)
+        if last_value is not None:
+            next_cursor = [last_value.isoformat() if isinstance(last_value, (date, datetime)) else str(last_value), str(last_item.id)]
+    
+    return Page(items, per_page, page=page, total=total, total_exact=total_exact, next_cursor=next_cursor, serialize=serialize)
+
+
+def get_dialect_insert(session):
+    """
+    Get the dialect-specific insert construct supporting ON CONFLICT.
+    
+    Args:
+        session: SQLAlchemy session
+    
+    Returns:
+        callable: insert() for PostgreSQL/SQLite, or None for other dialects
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
@@ -0,0 +1,260 @@
+"""
+Shelf geometry.
+
+Agents mark each brand's facings on a shelf photo as polygons. A brand's
+shelf share is the area those polygons cover, counting overlaps once, as a
+percentage of the photo's frame.
+
+Everything is vectorized with NumPy so a photo with hundreds of polygons,
+or every quadrant of a tenant in one call, is a handful of array
+operations:
+
+- polygon_areas applies the shoelace formula to all polygons at once.
+- union_area_percentages sweeps horizontal scanlines through all groups of
+  polygons at once. Each polygon is oriented counter-clockwise, so along a
+  scanline every edge crossing adds or removes one covering polygon; a
+  running sum of those steps, sorted by x, tells which stretches of the
+  line at least one polygon covers. Scanlines sit halfway between
+  consecutive vertex heights, where covered width changes linearly, and
+  on a fixed grid of SCANLINES to bound the error where edges of
+  overlapping polygons cross.
+"""
+import numpy as np
+
+# Minimum scanlines per frame, on top of one per vertex height
+SCANLINES = 64
+
+# Frame for coordinates normalized to 0..1
+UNIT_FRAME = (1.0, 1.0)
+
+
+def _point(point):
+    """Get (x, y) from an [x, y] pair or an {'x', 'y'} dict."""
+    if isinstance(point, dict):
+        return float(point['x']), float(point['y'])
+    x, y = point[:2]
+    return float(x), float(y)
+
+
+def _is_point(value):
+    return isinstance(value, (list, tuple)) and len(value) >= 2 and all(isinstance(v, (int, float)) for v in value[:2])
+
+
+def shape_to_polygon(shape):
+    """
+    Convert one marked shape to a polygon.
+
+    Args:
+        shape: {'x', 'y', 'width', 'height'} rectangle, {'points': [...]}
+            polygon, or a list of [x, y] / {'x', 'y'} points
+
+    Returns:
+        numpy.ndarray: (n, 2) vertices
+
+    Raises:
+        ValueError: If the shape is not one of the supported forms
+    """
+    try:
+        if isinstance(shape, dict) and 'points' in shape:
+            points = [_point(point) for point in shape['points']]
+        elif isinstance(shape, dict) and 'width' in shape:
+            x, y = float(shape['x']), float(shape['y'])
+            width, height = float(shape['width']), float(shape['height'])
+            points = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+        elif isinstance(shape, (list, tuple)):
+            points = [_point(point) for point in shape]
+        else:
+            raise ValueError
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Shapes must be rectangles (x, y, width, height) or lists of points')
+
+    return np.asarray(points, dtype=float).reshape(-1, 2)
+
+
+def parse_polygons(quadrant_coords):
+    """
+    Convert quadrant coordinates to polygons.
+
+    Args:
+        quadrant_coords: A shape, a list of shapes, or a single list of points
+
+    Returns:
+        list: (n, 2) vertex arrays
+
+    Raises:
+        ValueError: If a shape is not one of the supported forms
+    """
+    if not quadrant_coords:
+        return []
+    if isinstance(quadrant_coords, dict):
+        return [shape_to_polygon(quadrant_coords)]
+    if not isinstance(quadrant_coords, (list, tuple)):
+        raise ValueError('Quadrant coordinates must be a shape or a list of shapes')
+    # A flat list of points is one polygon
+    if all(_is_point(value) or (isinstance(value, dict) and 'width' not in value and 'points' not in value) for value in quadrant_coords):
+        return [shape_to_polygon(quadrant_coords)]
+    return [shape_to_polygon(shape) for shape in quadrant_coords]
+
+
+def resolve_frame(polygons, frame=None):
+    """
+    Get the frame polygons are measured against.
+
+    Args:
+        polygons: (n, 2) vertex arrays
+        frame: (width, height) of the photo, if known
+
+    Returns:
+        tuple: (width, height), UNIT_FRAME for coordinates normalized to
+            0..1, or None if the frame is unknown
+    """
+    if frame and frame[0] and frame[1]:
+        return float(frame[0]), float(frame[1])
+    if polygons and all(polygon.size == 0 or (polygon.min() >= 0 and polygon.max() <= 1) for polygon in polygons):
+        return UNIT_FRAME
+    return None
+
+
+def _flatten(polygons):
+    """Stack polygons into one vertex array with each vertex's polygon index and successor."""
+    counts = np.fromiter((len(polygon) for polygon in polygons), dtype=np.int64, count=len(polygons))
+    vertices = np.concatenate(polygons) if len(polygons) else np.empty((0, 2))
+    owner = np.repeat(np.arange(len(polygons)), counts)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])) if len(polygons) else np.empty(0, dtype=np.int64)
+    # Index of the next vertex, wrapping to the polygon's first vertex
+    successor = np.arange(len(vertices)) + 1
+    ends = starts + counts
+    last = ends[counts > 0] - 1
+    successor[last] = starts[counts > 0]
+    return vertices, owner, successor
+
+
+def signed_polygon_areas(polygons):
+    """
+    Shoelace formula for many polygons at once.
+
+    Args:
+        polygons: (n, 2) vertex arrays
+
+    Returns:
+        numpy.ndarray: Signed areas, positive for counter-clockwise polygons
+    """
+    vertices, owner, successor = _flatten(polygons)
+    x, y = vertices[:, 0], vertices[:, 1]
+    cross = x * y[successor] - x[successor] * y
+    return np.bincount(owner, weights=cross, minlength=len(polygons)) / 2.0
+
+
+def polygon_areas(polygons):
+    """
+    Areas of many polygons at once.
+
+    Args:
+        polygons: (n, 2) vertex arrays
+
+    Returns:
+        numpy.ndarray: Areas
+    """
+    return np.abs(signed_polygon_areas(polygons))
+
+
+def union_area_percentages(groups, frames, scanlines=SCANLINES):
+    """
+    Area covered by each group of polygons, overlaps counted once, as a percentage of its frame.
+
+    Args:
+        groups: Lists of (n, 2) vertex arrays, e.g. one per shelf quadrant
+        frames: (width, height) per group; polygons are clipped to it
+        scanlines: Minimum scanlines per frame
+
+    Returns:
+        numpy.ndarray: Percentage per group, NaN where the frame is unknown
+    """
+    result = np.full(len(groups), np.nan)
+    valid = [index for index, frame in enumerate(frames) if frame and frame[0] > 0 and frame[1] > 0]
+    if not valid:
+        return result
+
+    polygons, polygon_group = [], []
+    for index in valid:
+        for polygon in groups[index]:
+            if len(polygon) >= 3:
+                polygons.append(polygon)
+                polygon_group.append(index)
+    widths = np.array([frame[0] if frame else 0.0 for frame in frames], dtype=float)
+    heights = np.array([frame[1] if frame else 0.0 for frame in frames], dtype=float)
+    result[valid] = 0.0
+    if not polygons:
+        return result
+
+    # Orient every polygon counter-clockwise and drop degenerate ones
+    polygon_group = np.asarray(polygon_group)
+    orientation = np.sign(signed_polygon_areas(polygons))
+    vertices, owner, successor = _flatten(polygons)
+    keep = orientation[owner] != 0
+    x0, y0 = vertices[:, 0], vertices[:, 1]
+    x1, y1 = x0[successor], y0[successor]
+    edge_group = polygon_group[owner]
+    # Left to right, a counter-clockwise polygon is entered across a downward edge
+    step = np.where(y1 < y0, 1.0, -1.0) * orientation[owner]
+    keep &= y0 != y1
+    x0, y0, x1, y1, edge_group, step = x0[keep], y0[keep], x1[keep], y1[keep], edge_group[keep], step[keep]
+
+    # Slab boundaries per group: vertex heights plus a fixed grid, clipped to the frame
+    grid = np.linspace(0.0, 1.0, scanlines + 1)
+    group_ids = np.asarray(valid)
+    bound_group = np.concatenate([np.repeat(group_ids, len(grid)), polygon_group[owner]])
+    bound_y = np.concatenate([(grid[None, :] * heights[group_ids, None]).ravel(), vertices[:, 1]])
+    bound_y = np.clip(bound_y, 0.0, heights[bound_group])
+    # Normalized height plus a group offset gives one sortable key for every group
+    key = bound_group * 4.0 + bound_y / heights[bound_group]
+    order = np.unique(key, return_index=True)[1]
+    bound_group, bound_y = bound_group[order], bound_y[order]
+    same = bound_group[1:] == bound_group[:-1]
+    line_group = bound_group[1:][same]
+    line_y = (bound_y[1:][same] + bound_y[:-1][same]) / 2.0
+    line_height = (bound_y[1:] - bound_y[:-1])[same]
+    line_key = line_group * 4.0 + line_y / heights[line_group]
+
+    # Pair each edge with the scanlines of its group it spans
+    low = np.clip(np.minimum(y0, y1) / heights[edge_group], 0.0, 1.0) + edge_group * 4.0
+    high = np.clip(np.maximum(y0, y1) / heights[edge_group], 0.0, 1.0) + edge_group * 4.0
+    first = np.searchsorted(line_key, low, side='left')
+    last = np.searchsorted(line_key, high, side='left')
+    counts = last - first
+    edge_index = np.repeat(np.arange(len(counts)), counts)
+    line_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(first, counts)
+    if not len(line_index):
+        return result
+
+    # Crossing x per pair, clipped to the frame
+    ey0, ey1 = y0[edge_index], y1[edge_index]
+    ex0, ex1 = x0[edge_index], x1[edge_index]
+    cross_x = ex0 + (line_y[line_index] - ey0) * (ex1 - ex0) / (ey1 - ey0)
+    cross_x = np.clip(cross_x, 0.0, widths[line_group[line_index]])
+
+    # Sweep each scanline left to right; covered where the running count is positive
+    order = np.argsort(line_index + 0.5 * cross_x / widths[line_group[line_index]], kind='stable')
+    line_index, cross_x, cross_step = line_index[order], cross_x[order], step[edge_index][order]
+    covering = np.cumsum(cross_step)[:-1] > 0.5
+    covered = covering & (line_index[1:] == line_index[:-1])
+    width = np.bincount(line_index[:-1][covered], weights=np.diff(cross_x)[covered], minlength=len(line_y))
+
+    area = np.bincount(line_group, weights=width * line_height, minlength=len(groups))
+    result[valid] = 100.0 * area[valid] / (widths[valid] * heights[valid])
+    return result
+
+
+def union_area_percentage(polygons, frame):
+    """
+    Area covered by polygons, overlaps counted once, as a percentage of a frame.
+
+    Args:
+        polygons: (n, 2) vertex arrays
+        frame: (width, height)
+
+    Returns:
+        float: Percentage, or None if the frame is unknown
+    """
+    percentage = union_area_percentages([polygons], [frame])[0]
+    return None if np.isnan(percentage) else float(percentage)
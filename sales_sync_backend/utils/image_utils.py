@@ -1,134 +1,77 @@
 import os
-import uuid
+import threading
 from flask import current_app
-from werkzeug.utils import secure_filename
 
-# Import boto3 only if not in testing mode
-try:
-    import boto3
-except ImportError:
-    boto3 = None
+# boto3 takes longer to import than the rest of the app, so it is imported
+# and its client created on the first upload rather than at startup
+_s3_lock = threading.Lock()
 
-def get_s3_client():
-    """
-    Get S3 client.
-    
-    Returns:
-        boto3.client: S3 client or None if boto3 is not available
-    """
-    if boto3 is None:
+
+def _import_boto3():
+    """Import boto3, or return None if it is not installed."""
+    try:
+        import boto3
+    except ImportError:
         return None
-        
-    return boto3.client(
-        's3',
-        region_name=current_app.config.get('S3_REGION', 'us-east-1'),
-        aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
-        aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY')
-    )
+    return boto3
 
 
-def upload_file_to_s3(file, folder='uploads'):
+def get_s3_client():
     """
-    Upload file to S3 bucket.
-    
-    Args:
-        file: File object
-        folder: S3 folder path
+    Get the app's S3 client, creating it on first use.
     
     Returns:
-        str: S3 file URL
+        boto3.client: S3 client or None if boto3 is not available
     """
-    # If boto3 is not available or S3_BUCKET is not configured, use local storage
-    if boto3 is None or not current_app.config.get('S3_BUCKET'):
-        return upload_file_local(file, folder)
+    client = current_app.extensions.get('s3_client')
+    if client is not None:
+        return client
     
-    # Generate unique filename
-    filename = secure_filename(file.filename)
-    unique_filename = f"{folder}/{uuid.uuid4()}-{filename}"
+    boto3 = _import_boto3()
+    if boto3 is None:
+        return None
     
-    # Upload file to S3
-    s3_client = get_s3_client()
-    if s3_client:
-        s3_client.upload_fileobj(
-            file,
-            current_app.config['S3_BUCKET'],
-            unique_filename,
-            ExtraArgs={
-                'ContentType': file.content_type
-            }
-        )
-        
-        # Generate S3 URL
-        return f"https://{current_app.config['S3_BUCKET']}.s3.amazonaws.com/{unique_filename}"
-    else:
-        # Fallback to local storage if S3 client is not available
-        return upload_file_local(file, folder)
+    # boto3 clients are thread safe, so one per app is shared by all requests
+    with _s3_lock:
+        client = current_app.extensions.get('s3_client')
+        if client is None:
+            from botocore.config import Config
+            
+            client = boto3.client(
+                's3',
+                region_name=current_app.config.get('S3_REGION', 'us-east-1'),
+                aws_access_key_id=os.environ.get('AWS_ACCESS_KEY_ID'),
+                aws_secret_access_key=os.environ.get('AWS_SECRET_ACCESS_KEY'),
+                # Enough connections for every upload thread's multipart parts
+                config=Config(max_pool_connections=current_app.config.get('S3_MAX_POOL_CONNECTIONS', 20))
+            )
+            current_app.extensions['s3_client'] = client
+    return client
 
 
-def upload_file_local(file, folder='uploads'):
+def calculate_shelf_area_percentage(quadrant_coords, frame=None):
     """
-    Upload file to local storage.
+    Calculate the share of a photo covered by a brand's marked shapes.
     
-    Args:
-        file: File object
-        folder: Local folder path
-    
-    Returns:
-        str: Local file URL
-    """
-    # Create upload folder if it doesn't exist
-    upload_folder = os.path.join(current_app.config.get('UPLOAD_FOLDER', 'uploads'), folder)
-    os.makedirs(upload_folder, exist_ok=True)
-    
-    # Generate unique filename
-    if hasattr(file, 'filename'):
-        filename = secure_filename(file.filename)
-    else:
-        # For testing, if file doesn't have a filename
-        filename = f"test-{uuid.uuid4()}.jpg"
-        
-    unique_filename = f"{uuid.uuid4()}-{filename}"
-    file_path = os.path.join(upload_folder, unique_filename)
-    
-    # Save file
-    try:
-        file.save(file_path)
-    except (AttributeError, IOError):
-        # For testing, if file can't be saved
-        with open(file_path, 'wb') as f:
-            if hasattr(file, 'read'):
-                f.write(file.read())
-            else:
-                # Create an empty file for testing
-                f.write(b'test file content')
-    
-    # Generate local URL
-    return f"/uploads/{folder}/{unique_filename}"
-
-
-def calculate_shelf_area_percentage(quadrant_coords):
-    """
-    Calculate shelf area percentage based on quadrant coordinates.
+    Overlapping shapes are counted once, and shapes are clipped to the frame.
     
     Args:
-        quadrant_coords: Dictionary containing quadrant coordinates
+        quadrant_coords: Rectangle ({'x', 'y', 'width', 'height'}), polygon
+            ({'points': [...]} or a list of points), or a list of them
+        frame: (width, height) of the photo; coordinates within 0..1 are
+            taken as normalized when it is not known
     
     Returns:
-        float: Area percentage
-    """
-    # This is a simplified implementation
-    # In a real application, this would use computer vision or more complex calculations
+        float: Area percentage, or None if the frame is unknown
     
-    # For now, we'll just use the provided area_percentage if available
-    # or calculate a simple percentage based on the number of points
-    if 'area_percentage' in quadrant_coords:
-        return float(quadrant_coords['area_percentage'])
-    
-    # Simple calculation based on points
-    if 'points' in quadrant_coords:
-        # Calculate area based on points
-        # This is a very simplified approach
-        return len(quadrant_coords['points']) / 100.0
+    Raises:
+        ValueError: If the coordinates are not valid shapes
+    """
+    # NumPy is only loaded once shelf areas are needed
+    from utils.geometry import parse_polygons, resolve_frame, union_area_percentage
     
-    # Default value
-    return 0.0
\ No newline at end of file
+    polygons = parse_polygons(quadrant_coords)
+    frame = resolve_frame(polygons, frame)
+    if frame is None:
+        return None
+    return union_area_percentage(polygons, frame)
@@ -0,0 +1,194 @@
+"""
+Resized photo variants.
+
+Dashboards and photo lists only need small previews, so once a photo is
+uploaded a thumbnail and a medium-sized copy are rendered next to the
+original, and the photo's width, height and orientation are recorded.
+Decoding and resizing are CPU-bound, so they run in a small process pool
+per web worker; the upload worker thread waits for the result, and no
+request thread ever does.
+"""
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest side in pixels
+DEFAULT_VARIANTS = {
+    'thumb': 200,
+    'medium': 1024
+}
+
+VARIANT_CONTENT_TYPES = {
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg'
+}
+
+VARIANT_EXTENSIONS = {
+    'WEBP': '.webp',
+    'JPEG': '.jpg'
+}
+
+
+def _import_pil():
+    """Import Pillow, or return None if it is not installed."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    return Image, ImageOps
+
+
+def get_orientation(width, height):
+    """Get 'portrait', 'landscape' or 'square' for image dimensions."""
+    if width == height:
+        return 'square'
+    return 'portrait' if height > width else 'landscape'
+
+
+def render_variants(source_path, output_folder, variants, image_format='WEBP', quality=80):
+    """
+    Read an image and write its resized variants.
+
+    Runs in the variant process pool, so it takes and returns only plain
+    values and does not touch the app.
+
+    Args:
+        source_path: Image file path
+        output_folder: Folder for the variant files
+        variants: Dict of variant name to longest side in pixels
+        image_format: 'WEBP' or 'JPEG'
+        quality: Encoder quality
+
+    Returns:
+        tuple: (metadata dict, dict of variant name to (path, size))
+
+    Raises:
+        RuntimeError: If Pillow is not installed
+        OSError: If the file is not a readable image
+    """
+    pil = _import_pil()
+    if pil is None:
+        raise RuntimeError('Pillow is not installed')
+    Image, ImageOps = pil
+
+    with Image.open(source_path) as original:
+        original_format = original.format
+        # Phones store portrait shots sideways with an EXIF rotation
+        image = ImageOps.exif_transpose(original)
+        width, height = image.size
+        metadata = {
+            'width': width,
+            'height': height,
+            'orientation': get_orientation(width, height),
+            'format': original_format
+        }
+
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        rendered = {}
+        try:
+            for name, longest_side in variants.items():
+                variant = image.copy()
+                # Never upscale, only shrink to fit
+                variant.thumbnail((longest_side, longest_side), Image.LANCZOS)
+                fd, path = tempfile.mkstemp(dir=output_folder, suffix=VARIANT_EXTENSIONS[image_format])
+                with os.fdopen(fd, 'wb') as output:
+                    variant.save(output, format=image_format, quality=quality)
+                rendered[name] = (path, os.path.getsize(path))
+        except Exception:
+            for path, _ in rendered.values():
+                os.remove(path)
+            raise
+
+    return metadata, rendered
+
+
+class VariantRenderer:
+    """
+    Renders image variants in a per-process pool.
+
+    With workers=0 rendering runs inline, which is what tests use.
+    """
+
+    def __init__(self, variants=None, image_format='WEBP', quality=80, workers=0, timeout=60):
+        self.variants = dict(variants or DEFAULT_VARIANTS)
+        self.image_format = image_format.upper()
+        self.quality = quality
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def content_type(self):
+        """Content type of the variant files."""
+        return VARIANT_CONTENT_TYPES[self.image_format]
+
+    def _get_executor(self):
+        # Each forked web worker starts its own pool
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def render(self, source_path, output_folder):
+        """
+        Render the configured variants of an image.
+
+        Args:
+            source_path: Image file path
+            output_folder: Folder for the variant files
+
+        Returns:
+            tuple: (metadata dict, dict of variant name to (path, size))
+
+        Raises:
+            RuntimeError: If Pillow is not installed
+            OSError: If the file is not a readable image
+        """
+        args = (source_path, output_folder, self.variants, self.image_format, self.quality)
+        if not self.workers:
+            return render_variants(*args)
+        return self._get_executor().submit(render_variants, *args).result(timeout=self.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def init_variant_renderer(app):
+    """
+    Initialize the variant renderer from app config.
+
+    Args:
+        app: Flask application
+    """
+    app.extensions['variant_renderer'] = VariantRenderer(
+        variants=app.config.get('PHOTO_VARIANTS'),
+        image_format=app.config.get('PHOTO_VARIANT_FORMAT', 'WEBP'),
+        quality=app.config.get('PHOTO_VARIANT_QUALITY', 80),
+        workers=app.config.get('PHOTO_VARIANT_WORKERS', 0),
+        timeout=app.config.get('PHOTO_VARIANT_TIMEOUT', 60)
+    )
+
+
+def get_variant_renderer():
+    """
+    Get the variant renderer for the current app.
+
+    Returns:
+        VariantRenderer: Variant renderer
+    """
+    return current_app.extensions['variant_renderer']
@@ -0,0 +1,46 @@
+"""
+Lazily imported view functions.
+
+Controllers pull in services, marshmallow and their other dependencies, so
+importing all of them makes every worker and CLI command pay for endpoints
+it may never serve. Routes register a LazyView naming the controller
+function instead, and the controller module is imported on the first
+request that reaches it.
+"""
+from importlib import import_module
+
+
+class LazyView:
+    """View function proxy that imports its controller on first call."""
+
+    def __init__(self, module_name, view_name):
+        self.module_name = module_name
+        # Flask derives the endpoint from __name__, so endpoints keep the
+        # names they had with directly imported handlers
+        self.__name__ = view_name
+        self.__qualname__ = view_name
+        self.__module__ = module_name
+        self._view = None
+
+    @property
+    def view(self):
+        """The controller function, imported on first access."""
+        if self._view is None:
+            self._view = getattr(import_module(self.module_name), self.__name__)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def resolve_view(view):
+    """
+    Get the function behind a view, importing it if it is lazy.
+
+    Args:
+        view: View function or LazyView
+
+    Returns:
+        function: View function
+    """
+    return view.view if isinstance(view, LazyView) else view
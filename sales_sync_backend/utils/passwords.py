@@ -0,0 +1,170 @@
+"""
+Password hashing off the request thread.
+
+bcrypt is deliberately slow, so a login storm can occupy every web worker
+with hashing and starve other endpoints. Hashes and verifications run in a
+small process pool per web worker instead. The number of requests waiting
+for the pool is bounded; once it is full, callers get PasswordHasherBusy
+straight away, which handlers turn into 503 with Retry-After.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from flask import current_app, has_app_context, jsonify
+from passlib.hash import bcrypt
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated or too slow to answer."""
+
+    def __init__(self, retry_after=1):
+        super().__init__('Password hashing is temporarily overloaded')
+        self.retry_after = retry_after
+
+
+def _hash(password, rounds):
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password, password_hash):
+    return bcrypt.verify(password, password_hash)
+
+
+class PasswordHasher:
+    """
+    bcrypt hasher backed by a bounded process pool.
+
+    With workers=0 hashing runs inline, which is what tests and scripts
+    outside the app use.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=0, max_queue=32, timeout=10, retry_after=1):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(workers + max_queue) if workers else None
+
+    def _get_executor(self):
+        # Each forked web worker starts its own pool
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        # Reject instead of queueing without bound
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy(self.retry_after)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy(self.retry_after)
+
+    def hash(self, password):
+        """
+        Hash a password with the configured cost factor.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            str: Hashed password
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        return self._run(_hash, password, self.rounds)
+
+    def verify(self, password, password_hash):
+        """
+        Verify a password against a hash.
+
+        Args:
+            password: Plain text password
+            password_hash: Hashed password
+
+        Returns:
+            bool: True if password matches hash
+
+        Raises:
+            PasswordHasherBusy: If the pool is saturated
+        """
+        return self._run(_verify, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """Check if a hash uses a lower cost factor than the configured one."""
+        try:
+            return bcrypt.from_string(password_hash).rounds < self.rounds
+        except ValueError:
+            return False
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Used outside an app context (scripts, fixtures)
+_default_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    """
+    Initialize the password hasher from app config.
+
+    Args:
+        app: Flask application
+    """
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 0),
+        max_queue=app.config.get('PASSWORD_HASH_MAX_QUEUE', 32),
+        timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10),
+        retry_after=app.config.get('PASSWORD_HASH_RETRY_AFTER', 1)
+    )
+
+
+def get_password_hasher():
+    """
+    Get the password hasher for the current app.
+
+    Returns:
+        PasswordHasher: App hasher, or an inline hasher outside an app context
+    """
+    if has_app_context():
+        hasher = current_app.extensions.get('password_hasher')
+        if hasher is not None:
+            return hasher
+    return _default_hasher
+
+
+def password_hasher_busy_response(error):
+    """Build the 503 response for a saturated hashing pool."""
+    response = jsonify({'error': 'Too many login attempts in progress, please retry shortly'})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
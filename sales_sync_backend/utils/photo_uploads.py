@@ -0,0 +1,295 @@
+"""
+Photo upload pipeline.
+
+Request threads only copy an upload to a spool file, a fixed-size chunk at
+a time, and record the photo as pending. A small per-process thread pool
+then moves the spooled file to storage, as an S3 multipart transfer with
+the shared client or a rename into UPLOAD_FOLDER, and the job marks the
+photo ready or failed. Memory use per upload is one chunk whatever the
+image size, and the request returns as soon as the bytes are on disk.
+
+The SHA-256 of the file is computed while spooling, so storage can be
+content-addressed: a tenant's identical uploads share one stored object.
+
+A spool file is removed by the job that stores it. Files whose job never
+finished, because the process was killed or recycled mid-transfer or
+with jobs still queued, are swept once they are older than
+PHOTO_BLOB_CLAIM_TIMEOUT (sweep_spool_folder).
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from utils.image_utils import get_s3_client
+
+logger = logging.getLogger(__name__)
+
+# Bytes copied per read when spooling an upload
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+
+class SpooledUpload:
+    """An upload copied to a local spool file, waiting to be stored."""
+
+    def __init__(self, path, size, filename, content_type, sha256=None):
+        self.path = path
+        self.size = size
+        self.filename = filename
+        self.content_type = content_type
+        self.sha256 = sha256
+
+    def discard(self):
+        """Delete the spool file if it is still there."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def get_spool_folder(config):
+    """Get the spool folder, inside UPLOAD_FOLDER by default so local storage is a rename."""
+    return config.get('PHOTO_SPOOL_FOLDER') or os.path.join(config.get('UPLOAD_FOLDER', 'uploads'), '.spool')
+
+
+def sweep_spool_folder(config, max_age, dry_run=False):
+    """
+    Delete spool and variant files left behind by uploads that never finished.
+
+    Args:
+        config: App config
+        max_age: Seconds since a file was last written before it counts as left behind
+        dry_run: Only list the files
+
+    Returns:
+        list: Paths of the left-behind files
+    """
+    cutoff = time.time() - max_age
+    try:
+        entries = list(os.scandir(get_spool_folder(config)))
+    except FileNotFoundError:
+        return []
+
+    paths = []
+    for entry in entries:
+        try:
+            if not entry.is_file() or entry.stat().st_mtime >= cutoff:
+                continue
+            if not dry_run:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            # Stored or swept by another process meanwhile
+            continue
+        paths.append(entry.path)
+    return paths
+
+
+def spool_upload(file, chunk_size=SPOOL_CHUNK_SIZE):
+    """
+    Copy an uploaded file to a spool file in fixed-size chunks, hashing it on the way.
+
+    Args:
+        file: werkzeug FileStorage
+        chunk_size: Bytes per read
+
+    Returns:
+        SpooledUpload: Spooled file
+    """
+    spool_folder = get_spool_folder(current_app.config)
+    os.makedirs(spool_folder, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=spool_folder, suffix='.upload')
+
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as spool:
+            while True:
+                chunk = file.stream.read(chunk_size)
+                if not chunk:
+                    break
+                spool.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return SpooledUpload(path, size, secure_filename(file.filename or '') or 'upload', file.content_type, digest.hexdigest())
+
+
+def get_content_key(tenant_id, sha256, filename=''):
+    """
+    Get the content-addressed storage key of a tenant's file.
+
+    Args:
+        tenant_id: Tenant ID
+        sha256: SHA-256 hex digest of the file
+        filename: Original filename, only its extension is kept
+
+    Returns:
+        str: Storage key
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    return f"photos/{tenant_id}/{sha256[:2]}/{sha256}{extension}"
+
+
+def use_s3():
+    """Check if photos go to S3 (S3_BUCKET is set and boto3 is installed)."""
+    return bool(current_app.config.get('S3_BUCKET')) and get_s3_client() is not None
+
+
+def get_file_url(key):
+    """
+    Get the public URL of a stored object.
+
+    Args:
+        key: Storage key
+
+    Returns:
+        str: S3 URL, or /uploads/ URL for local storage
+    """
+    if use_s3():
+        return f"https://{current_app.config['S3_BUCKET']}.s3.amazonaws.com/{key}"
+    return f"/uploads/{key}"
+
+
+def store_spooled_file(spooled, key):
+    """
+    Move a spooled upload to storage under a key.
+
+    Args:
+        spooled: SpooledUpload
+        key: Storage key
+    """
+    config = current_app.config
+    try:
+        if use_s3():
+            from boto3.s3.transfer import TransferConfig
+
+            # Large files go up in parts, several at a time, over the shared client's pool
+            get_s3_client().upload_file(
+                spooled.path,
+                config['S3_BUCKET'],
+                key,
+                ExtraArgs={'ContentType': spooled.content_type or 'application/octet-stream'},
+                Config=TransferConfig(
+                    multipart_threshold=config.get('S3_MULTIPART_THRESHOLD', 8 * 1024 * 1024),
+                    multipart_chunksize=config.get('S3_MULTIPART_CHUNKSIZE', 8 * 1024 * 1024)
+                )
+            )
+        else:
+            path = os.path.join(config.get('UPLOAD_FOLDER', 'uploads'), key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Same filesystem as the spool folder by default, so no bytes are copied
+            os.replace(spooled.path, path)
+    finally:
+        spooled.discard()
+
+
+def delete_stored_file(key):
+    """
+    Delete a stored object, ignoring objects that are already gone.
+
+    Args:
+        key: Storage key
+    """
+    config = current_app.config
+    if use_s3():
+        get_s3_client().delete_object(Bucket=config['S3_BUCKET'], Key=key)
+        return
+    try:
+        os.remove(os.path.join(config.get('UPLOAD_FOLDER', 'uploads'), key))
+    except FileNotFoundError:
+        pass
+
+
+class UploadWorker:
+    """
+    Runs storage jobs off the request thread, in a per-process thread pool.
+
+    Jobs are called as fn(session, *args) inside an app context. With
+    workers=0 they run inline, which is what tests use.
+    """
+
+    def __init__(self, app, workers=4):
+        self.app = app
+        self.workers = workers
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # Each forked web worker starts its own threads
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='photo-upload')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        with self.app.app_context():
+            try:
+                fn(self.app.db_session, *args)
+            except Exception:
+                logger.exception(f"Background job {fn.__name__} failed")
+            finally:
+                self.app.db_session.remove()
+
+    def submit(self, fn, *args):
+        """
+        Queue a job.
+
+        Args:
+            fn: Job function, called with the app's session and args
+            *args: Job arguments
+        """
+        if not self.workers:
+            fn(self.app.db_session, *args)
+            return
+        self._get_executor().submit(self._run, fn, *args)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def init_upload_worker(app):
+    """
+    Initialize the photo upload worker from app config.
+
+    Files that an earlier process spooled but never stored, for example
+    jobs still queued when it was recycled, are swept once they are older
+    than PHOTO_BLOB_CLAIM_TIMEOUT.
+
+    Args:
+        app: Flask application
+    """
+    app.extensions['upload_worker'] = UploadWorker(app, workers=app.config.get('PHOTO_UPLOAD_WORKERS', 4))
+
+    max_age = app.config.get('PHOTO_BLOB_CLAIM_TIMEOUT')
+    if max_age:
+        try:
+            paths = sweep_spool_folder(app.config, max_age)
+        except OSError as e:
+            logger.warning(f"Spool folder sweep failed: {str(e)}")
+            return
+        if paths:
+            logger.info(f"Deleted {len(paths)} spool files left by unfinished uploads")
+
+
+def get_upload_worker():
+    """
+    Get the upload worker for the current app.
+
+    Returns:
+        UploadWorker: Upload worker
+    """
+    return current_app.extensions['upload_worker']
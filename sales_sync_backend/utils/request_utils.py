@@ -1,6 +1,8 @@
 """Request utilities for the API."""
+import base64
+import binascii
 import json
-from flask import request, jsonify, g
+from flask import request, jsonify, g, current_app
 from marshmallow import ValidationError
 from flask_jwt_extended import get_jwt, get_jwt_identity
 
@@ -39,7 +41,7 @@ def get_filter_params():
     """Get filter parameters from request."""
     filters = {}
     for key, value in request.args.items():
-        if key not in ['page', 'per_page', 'sort', 'order']:
+        if key not in ['page', 'per_page', 'sort', 'order', 'cursor', 'limit', 'fields', 'include']:
             filters[key] = value
     return filters
 
@@ -51,15 +53,98 @@ def get_sort_params():
     return sort, order
 
 
-def paginate_response(items, total, page, per_page):
-    """Create a paginated response."""
+def get_cursor_params(default_limit=50, max_limit=500):
+    """Get keyset pagination parameters from request."""
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        limit = default_limit
+    limit = max(1, min(limit, max_limit))
+    return request.args.get('cursor'), limit
+
+
+def get_fieldset_params():
+    """Get sparse fieldset (?fields=) and include (?include=) parameters from request."""
+    fieldset = {}
+    for key in ('fields', 'include'):
+        values = [value.strip() for value in request.args.get(key, '').split(',') if value.strip()]
+        fieldset[key] = values or None
+    return fieldset
+
+
+def get_list_params(default_sort='created_at'):
+    """
+    Get sorting, pagination, count and fieldset parameters for list endpoints.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    page, per_page = get_pagination_params()
+    sort, order = get_sort_params()
+    if 'sort' not in request.args:
+        sort = default_sort
+    cursor = request.args.get('cursor')
     return {
-        'items': items,
+        'sort': sort,
+        'order': order.lower(),
+        'page': page,
+        'per_page': min(per_page, current_app.config.get('LIST_MAX_PER_PAGE', 100)),
+        'cursor': decode_cursor(cursor) if cursor else None,
+        'count': current_app.config.get('LIST_COUNT_STRATEGY', 'capped'),
+        'count_cap': current_app.config.get('LIST_COUNT_CAP', 10000),
+        **get_fieldset_params()
+    }
+
+
+def encode_cursor(values):
+    """Encode keyset values into an opaque cursor token."""
+    payload = json.dumps(values, default=str, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token produced by encode_cursor.
+    
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def paginate_response(items, total=None, page=None, per_page=20, next_cursor=None, items_key='items', total_exact=True):
+    """
+    Create a paginated response.
+    
+    Offset pages report total and pages. Keyset pages (total is None) report
+    next_cursor instead, which is None on the last page. total_exact is
+    False when total is a capped or estimated count.
+    """
+    if total is None:
+        return {
+            items_key: items,
+            'per_page': per_page,
+            'next_cursor': next_cursor
+        }
+    
+    response = {
+        items_key: items,
         'total': total,
         'page': page,
         'per_page': per_page,
-        'pages': (total + per_page - 1) // per_page
+        'pages': (total + per_page - 1) // per_page,
+        'total_exact': total_exact
     }
+    if next_cursor is not None:
+        response['next_cursor'] = next_cursor
+    return response
 
 
 def get_tenant_id_from_jwt():
@@ -80,10 +165,11 @@ def get_user_id_from_jwt():
 
 
 def get_roles_from_jwt():
-    """Get roles from JWT claims."""
+    """Get role names from the JWT role mask."""
+    from utils.auth_context import load_auth_context
+    
     try:
-        claims = get_jwt()
-        return claims.get('roles', [])
+        return sorted(load_auth_context().roles)
     except Exception:
         return []
 
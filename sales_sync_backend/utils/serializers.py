@@ -0,0 +1,466 @@
+"""
+Compiled serializers for hot list and streaming paths.
+
+Each registered model gets two functions generated once at import: one
+reading attributes from ORM instances and one reading positions from
+Core row tuples selected with the model's columns. Both return exactly the
+dict the model's to_dict() returns, so responses are unchanged; the row
+variant additionally skips ORM instance construction and the identity map.
+"""
+import json
+import logging
+import uuid
+from operator import attrgetter
+
+from flask import current_app, has_app_context
+from sqlalchemy import String, type_coerce
+from sqlalchemy.orm import load_only, selectinload
+
+from models.audit import AuditLog
+from models.base import UUID as UUIDType
+from models.brand import Brand
+from models.call_cycle import CallCycle, CallCycleLocation
+from models.goal import Goal, GoalAssignment
+from models.photo import Photo, ShelfQuadrant
+from models.survey import Survey, SurveyQuestion
+from models.team import Team
+from models.visit import Visit, VisitAnswer
+
+# Import orjson only if available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Value conversions, matching the expressions used in to_dict()
+VALUE = 'value'
+UUID = 'uuid'
+OPTIONAL_UUID = 'optional_uuid'
+DATETIME = 'datetime'
+DECIMAL = 'decimal'
+
+_CONVERSIONS = {
+    VALUE: '{v}',
+    UUID: 'str({v})',
+    OPTIONAL_UUID: 'str({v}) if {v} else None',
+    DATETIME: '{v}.isoformat() if {v} else None',
+    DECIMAL: 'float({v}) if {v} is not None else None'
+}
+
+# Row tuples carry UUIDs as their stored text
+_ROW_CONVERSIONS = dict(_CONVERSIONS, **{
+    UUID: '_uuid_text({v})',
+    OPTIONAL_UUID: '_uuid_text({v}) if {v} else None'
+})
+
+
+def _uuid_text(value):
+    """
+    Get str(uuid.UUID(value)) for stored UUID text.
+
+    Text that is already in canonical form is returned as is, which skips
+    building a UUID object for almost every row.
+    """
+    if len(value) == 36 and value.islower() and value[8] == value[13] == value[18] == value[23] == '-':
+        return value
+    return str(uuid.UUID(value))
+
+
+_serializers = {}
+
+
+def _compile(name, fields, accessor, conversions):
+    """
+    Generate a function building the serialized dict in a single expression.
+
+    Args:
+        name: Function name
+        fields: List of (key, attribute, conversion) tuples
+        accessor: Format string reading a field from `source` ({attribute} or {index})
+        conversions: Dictionary of conversion name to expression template
+
+    Returns:
+        function: Serializer taking one source object
+    """
+    lines = [f'def {name}(source):']
+    items = []
+    for index, (key, attribute, conversion) in enumerate(fields):
+        lines.append(f'    v{index} = ' + accessor.format(attribute=attribute, index=index))
+        items.append(f'{key!r}: ' + conversions[conversion].format(v=f'v{index}'))
+    lines.append('    return {' + ', '.join(items) + '}')
+
+    namespace = {'_uuid_text': _uuid_text}
+    exec(compile('\n'.join(lines), f'<serializer {name}>', 'exec'), namespace)
+    return namespace[name]
+
+
+class ModelSerializer:
+    """Serializer generated from a model's to_dict() field list."""
+
+    def __init__(self, model, fields, includes=None, partial=False):
+        self.model = model
+        self.fields = fields
+        self.keys = [key for key, _, _ in fields]
+        self.includes = includes if includes is not None else {}
+        self.partial = partial
+        self.columns = [self._select_column(getattr(model, attribute)) for _, attribute, _ in fields]
+        self.from_object = _compile(f'{model.__name__.lower()}_from_object', fields, 'source.{attribute}', _CONVERSIONS)
+        self.from_row = _compile(f'{model.__name__.lower()}_from_row', fields, 'source[{index}]', _ROW_CONVERSIONS)
+        self._subsets = {}
+
+    @staticmethod
+    def _select_column(column):
+        """Select UUID columns as stored text so rows skip the UUID result processor."""
+        if isinstance(column.type, UUIDType):
+            return type_coerce(column, String).label(column.key)
+        return column
+
+    def subset(self, keys=None):
+        """
+        Get the serializer for a subset of fields, compiled once per subset.
+
+        Args:
+            keys: Field names to keep (optional, all fields if omitted)
+
+        Returns:
+            ModelSerializer: Serializer for the requested fields
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        if not keys:
+            return self
+
+        unknown = set(keys) - set(self.keys)
+        if unknown:
+            raise ValueError(f"Invalid fields: {', '.join(sorted(unknown))}")
+
+        cache_key = tuple(key for key in self.keys if key in keys)
+        serializer = self._subsets.get(cache_key)
+        if serializer is None:
+            fields = [field for field in self.fields if field[0] in cache_key]
+            serializer = ModelSerializer(self.model, fields, self.includes, partial=True)
+            self._subsets[cache_key] = serializer
+        return serializer
+
+    def rows(self, query):
+        """
+        Select this serializer's columns from a query over the model.
+
+        Args:
+            query: SQLAlchemy query over the model
+
+        Returns:
+            Query: Query returning row tuples in field order
+        """
+        return query.with_entities(*self.columns)
+
+
+def register_serializer(model, fields):
+    """
+    Register a compiled serializer for a model.
+
+    Args:
+        model: SQLAlchemy model class
+        fields: List of (key, attribute, conversion) tuples in to_dict() order
+
+    Returns:
+        ModelSerializer: Registered serializer
+    """
+    serializer = ModelSerializer(model, fields)
+    _serializers[model] = serializer
+    return serializer
+
+
+def get_serializer(model):
+    """
+    Get the compiled serializer for a model.
+
+    Returns:
+        ModelSerializer: Serializer or None if the model is not registered
+    """
+    return _serializers.get(model)
+
+
+def register_includes(model, includes):
+    """
+    Register the relationships clients may expand with ?include=.
+
+    Args:
+        model: SQLAlchemy model class with a registered serializer
+        includes: Dictionary of include name to (relationship attribute, sort attribute or None)
+    """
+    _serializers[model].includes.update(includes)
+
+
+def serialize(item):
+    """Serialize a model instance, falling back to its to_dict()."""
+    serializer = _serializers.get(type(item))
+    if serializer is None:
+        return item.to_dict()
+    return serializer.from_object(item)
+
+
+def get_fieldset(model, fields=None, include=None):
+    """
+    Resolve requested fields and includes for a model.
+
+    Args:
+        model: SQLAlchemy model class
+        fields: Field names to return (optional)
+        include: Relationship names to expand (optional)
+
+    Returns:
+        tuple: (ModelSerializer for the fields, list of include names)
+
+    Raises:
+        ValueError: If a field or include name is unknown, or the model has
+            no registered serializer
+    """
+    serializer = _serializers.get(model)
+    if serializer is None:
+        raise ValueError(f'Fields and include are not supported for {model.__tablename__}')
+    include = list(include or [])
+    unknown = set(include) - set(serializer.includes)
+    if unknown:
+        raise ValueError(f"Invalid include: {', '.join(sorted(unknown))}")
+    return serializer.subset(fields), include
+
+
+def apply_fieldset(query, model, fields=None, include=None):
+    """
+    Load only the requested columns and eager load included relationships.
+
+    Each included relationship is loaded with one extra SELECT ... IN query
+    for the whole page instead of one query per row.
+
+    Args:
+        query: SQLAlchemy query over model
+        model: SQLAlchemy model class
+        fields: Field names to return (optional)
+        include: Relationship names to expand (optional)
+
+    Returns:
+        Query: Query with loader options
+
+    Raises:
+        ValueError: If a field or include name is unknown
+    """
+    serializer, include = get_fieldset(model, fields, include)
+
+    options = []
+    if serializer.partial:
+        options.append(load_only(*[getattr(model, attribute) for _, attribute, _ in serializer.fields]))
+    for name in include:
+        options.append(selectinload(getattr(model, serializer.includes[name][0])))
+    return query.options(*options) if options else query
+
+
+def make_serializer(model, fields=None, include=None):
+    """
+    Build a function serializing instances with the requested fields and includes.
+
+    Included relationships are serialized in full, as to_dict() does with
+    its include flags.
+
+    Args:
+        model: SQLAlchemy model class
+        fields: Field names to return (optional)
+        include: Relationship names to expand (optional)
+
+    Returns:
+        function: Function converting an instance to a dict
+
+    Raises:
+        ValueError: If a field or include name is unknown
+    """
+    serializer, include = get_fieldset(model, fields, include)
+    if not include:
+        return serializer.from_object
+
+    from_object = serializer.from_object
+    relations = [(name,) + serializer.includes[name] for name in include]
+
+    def serialize_with_includes(item):
+        result = from_object(item)
+        for name, attribute, order_by in relations:
+            children = getattr(item, attribute)
+            if order_by:
+                children = sorted(children, key=attrgetter(order_by))
+            result[name] = [serialize(child) for child in children]
+        return result
+
+    return serialize_with_includes
+
+
+def get_encoder():
+    """
+    Get a JSON encoding function for the current app config.
+
+    The default encoder matches flask.json.dumps byte for byte. With
+    JSON_SERIALIZER = 'orjson' and orjson installed the output is compact
+    UTF-8 with sorted keys, which parses to the same value. Resolve the
+    encoder once per response rather than once per row.
+
+    Returns:
+        function: Function encoding a value to a JSON string
+    """
+    config = current_app.config if has_app_context() else {}
+    if config.get('JSON_SERIALIZER') == 'orjson':
+        if orjson is not None:
+            return lambda value: orjson.dumps(value, option=orjson.OPT_SORT_KEYS).decode('utf-8')
+        logger.warning("JSON_SERIALIZER is 'orjson' but orjson is not installed, using json")
+
+    return json.JSONEncoder(
+        ensure_ascii=config.get('JSON_AS_ASCII', True),
+        sort_keys=config.get('JSON_SORT_KEYS', True),
+        default=str
+    ).encode
+
+
+def dumps(value):
+    """Encode a single value as JSON text (see get_encoder)."""
+    return get_encoder()(value)
+
+
+register_serializer(Visit, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('survey_id', 'survey_id', UUID),
+    ('user_id', 'user_id', UUID),
+    ('visit_type', 'visit_type', VALUE),
+    ('shop_id', 'shop_id', OPTIONAL_UUID),
+    ('started_at', 'started_at', DATETIME),
+    ('completed_at', 'completed_at', DATETIME),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(VisitAnswer, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('visit_id', 'visit_id', UUID),
+    ('question_id', 'question_id', OPTIONAL_UUID),
+    ('answer_text', 'answer_text', VALUE),
+    ('answer_json', 'answer_json', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(Photo, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('visit_id', 'visit_id', UUID),
+    ('file_url', 'file_url', VALUE),
+    ('purpose', 'purpose', VALUE),
+    ('metadata', 'image_metadata', VALUE),
+    ('status', 'status', VALUE),
+    ('content_hash', 'content_hash', VALUE),
+    ('variants', 'variants', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(ShelfQuadrant, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('photo_id', 'photo_id', UUID),
+    ('brand_id', 'brand_id', UUID),
+    ('quadrant_coords', 'quadrant_coords', VALUE),
+    ('area_percentage', 'area_percentage', DECIMAL),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(AuditLog, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', OPTIONAL_UUID),
+    ('user_id', 'user_id', OPTIONAL_UUID),
+    ('action', 'action', VALUE),
+    ('object_type', 'object_type', VALUE),
+    ('object_id', 'object_id', OPTIONAL_UUID),
+    ('metadata', 'audit_metadata', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(Brand, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('name', 'name', VALUE),
+    ('slug', 'slug', VALUE),
+    ('active', 'active', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(Survey, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('name', 'name', VALUE),
+    ('type', 'type', VALUE),
+    ('brand_id', 'brand_id', OPTIONAL_UUID),
+    ('active', 'active', VALUE),
+    ('created_by', 'created_by', OPTIONAL_UUID),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(SurveyQuestion, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('survey_id', 'survey_id', UUID),
+    ('question_text', 'question_text', VALUE),
+    ('input_type', 'input_type', VALUE),
+    ('meta', 'meta', VALUE),
+    ('order_num', 'order_num', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(CallCycle, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('name', 'name', VALUE),
+    ('frequency', 'frequency', VALUE),
+    ('created_by', 'created_by', OPTIONAL_UUID),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(CallCycleLocation, [
+    ('id', 'id', UUID),
+    ('call_cycle_id', 'call_cycle_id', UUID),
+    ('shop_id', 'shop_id', OPTIONAL_UUID),
+    ('order_num', 'order_num', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(Team, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('name', 'name', VALUE),
+    ('manager_id', 'manager_id', OPTIONAL_UUID),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(Goal, [
+    ('id', 'id', UUID),
+    ('tenant_id', 'tenant_id', UUID),
+    ('name', 'name', VALUE),
+    ('metric', 'metric', VALUE),
+    ('target_value', 'target_value', DECIMAL),
+    ('period', 'period', VALUE),
+    ('start_date', 'start_date', DATETIME),
+    ('end_date', 'end_date', DATETIME),
+    ('created_at', 'created_at', DATETIME)
+])
+
+register_serializer(GoalAssignment, [
+    ('id', 'id', UUID),
+    ('goal_id', 'goal_id', UUID),
+    ('assignee_type', 'assignee_type', VALUE),
+    ('assignee_id', 'assignee_id', UUID),
+    ('progress', 'progress', VALUE),
+    ('created_at', 'created_at', DATETIME)
+])
+
+# Relationships clients may expand with ?include=
+register_includes(Visit, {'answers': ('answers', None), 'photos': ('photos', None)})
+register_includes(Photo, {'shelf_quadrants': ('shelf_quadrants', None)})
+register_includes(Survey, {'questions': ('questions', 'order_num')})
+register_includes(CallCycle, {'locations': ('locations', 'order_num')})
+register_includes(Goal, {'assignments': ('assignments', None)})
@@ -0,0 +1,137 @@
+"""
+Streaming responses for large collections.
+
+Rows are read from the database in batches with yield_per and encoded as
+they arrive, so neither the full list of ORM objects nor the full encoded
+body is ever held in memory.
+"""
+from flask import Response, request, stream_with_context
+
+from utils.serializers import (
+    apply_fieldset,
+    dumps,
+    get_encoder,
+    get_fieldset,
+    get_serializer,
+    make_serializer,
+    serialize as serialize_item
+)
+
+JSON_MIMETYPE = 'application/json'
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def wants_ndjson():
+    """Check if the client prefers NDJSON over a JSON document."""
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """Check if the client asked for a streamed collection (?stream=true or NDJSON)."""
+    return request.args.get('stream', '').lower() == 'true' or wants_ndjson()
+
+
+def iter_ndjson(rows, serialize=serialize_item, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encode rows as newline-delimited JSON.
+
+    Args:
+        rows: Iterable of rows
+        serialize: Function converting a row to a dict
+        batch_size: Number of rows encoded per chunk
+
+    Yields:
+        str: Chunks of NDJSON
+    """
+    encode = get_encoder()
+    chunk = []
+    for row in rows:
+        chunk.append(encode(serialize(row)))
+        if len(chunk) >= batch_size:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+
+def iter_json_array(rows, serialize=serialize_item, items_key=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Encode rows as a JSON array, optionally wrapped in an object.
+
+    Args:
+        rows: Iterable of rows
+        serialize: Function converting a row to a dict
+        items_key: Wrap the array as {items_key: [...]} (optional)
+        batch_size: Number of rows encoded per chunk
+
+    Yields:
+        str: Chunks of the JSON document
+    """
+    # Send the opening bracket before the first row is fetched
+    yield '{%s:[' % dumps(items_key) if items_key else '['
+
+    encode = get_encoder()
+    separator = ''
+    chunk = []
+    for row in rows:
+        chunk.append(encode(serialize(row)))
+        if len(chunk) >= batch_size:
+            yield separator + ','.join(chunk)
+            separator = ','
+            chunk = []
+    if chunk:
+        yield separator + ','.join(chunk)
+
+    yield ']}' if items_key else ']'
+
+
+def stream_query(query, serialize=None, items_key=None, batch_size=DEFAULT_BATCH_SIZE, fields=None, include=None):
+    """
+    Stream a query as NDJSON or JSON depending on the Accept header.
+
+    Without an explicit serialize function, queries over a model with a
+    registered serializer select plain column tuples (only the requested
+    fields) and never build ORM instances. Included relationships need ORM
+    instances; they are loaded with selectinload once per batch. The query is
+    read with yield_per, so it must not joined-load collections. The request
+    context stays open until the body has been sent, which keeps the session
+    usable while streaming.
+
+    Args:
+        query: SQLAlchemy query
+        serialize: Function converting a row to a dict (optional)
+        items_key: Key wrapping the JSON array (ignored for NDJSON)
+        batch_size: Rows fetched and encoded per batch
+        fields: Field names to return (optional, all fields if omitted)
+        include: Relationship names to expand (optional)
+
+    Returns:
+        Response: Streaming response
+
+    Raises:
+        ValueError: If a field or include name is invalid
+    """
+    if serialize is None:
+        model = query.column_descriptions[0]['entity']
+        if include:
+            query = apply_fieldset(query, model, fields, include)
+            serialize = make_serializer(model, fields, include)
+        elif fields:
+            serializer, _ = get_fieldset(model, fields)
+            query, serialize = serializer.rows(query), serializer.from_row
+        elif get_serializer(model) is not None:
+            serializer = get_serializer(model)
+            query, serialize = serializer.rows(query), serializer.from_row
+        else:
+            serialize = serialize_item
+
+    rows = query.yield_per(batch_size)
+    if wants_ndjson():
+        body = iter_ndjson(rows, serialize, batch_size)
+        mimetype = NDJSON_MIMETYPE
+    else:
+        body = iter_json_array(rows, serialize, items_key, batch_size)
+        mimetype = JSON_MIMETYPE
+    return Response(stream_with_context(body), mimetype=mimetype)
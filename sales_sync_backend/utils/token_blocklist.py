@@ -0,0 +1,244 @@
+"""
+Revoked JWT blocklist.
+
+Revoked token IDs (jti) are stored until the token would have expired: as
+Redis keys with a TTL, or in process memory without Redis. Each worker
+keeps a bloom filter of revoked IDs in front of the store. A token that is
+not in the filter cannot be revoked, so the common case is a few hash
+lookups and no network call; only filter hits are confirmed against the
+store. Workers pull revocations made elsewhere every
+TOKEN_BLOCKLIST_SYNC_INTERVAL seconds and rebuild the filter from scratch
+every TOKEN_BLOCKLIST_REBUILD_INTERVAL seconds to drop expired entries.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Re-read this many seconds of revocations on each sync to absorb clock skew between workers
+SYNC_OVERLAP = 5.0
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings."""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Double hashing from one 128-bit digest
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class MemoryBlocklistBackend:
+    """In-process blocklist, for single-process deployments and tests."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._entries[jti] = (expires_at, time.time())
+
+    def contains(self, jti):
+        with self._lock:
+            entry = self._entries.get(jti)
+        return entry is not None and entry[0] > time.time()
+
+    def changes_since(self, since):
+        """Get jtis revoked after a timestamp that have not expired yet."""
+        now = time.time()
+        with self._lock:
+            # Drop expired entries
+            for jti in [jti for jti, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[jti]
+            return [jti for jti, (_, revoked_at) in self._entries.items() if revoked_at > since]
+
+
+class RedisBlocklistBackend:
+    """Redis blocklist shared by all workers."""
+
+    def __init__(self, url, prefix='sales_sync:jwt_blocklist:'):
+        # Imported here so processes without a Redis backend never load it
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('redis is not installed')
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def add(self, jti, expires_at):
+        now = time.time()
+        ttl = max(1, math.ceil(expires_at - now))
+        pipeline = self.client.pipeline()
+        # The key is the source of truth and expires with the token
+        pipeline.set(f'{self.prefix}jti:{jti}', 1, ex=ttl)
+        # The index tells other workers what to add to their bloom filters
+        pipeline.zadd(f'{self.prefix}index', {jti: now})
+        pipeline.zadd(f'{self.prefix}expiry', {jti: expires_at})
+        pipeline.execute()
+
+    def contains(self, jti):
+        return self.client.exists(f'{self.prefix}jti:{jti}') > 0
+
+    def changes_since(self, since):
+        """Get jtis revoked after a timestamp that have not expired yet."""
+        now = time.time()
+        # Drop expired entries from the indexes
+        expired = self.client.zrangebyscore(f'{self.prefix}expiry', '-inf', now)
+        if expired:
+            pipeline = self.client.pipeline()
+            pipeline.zrem(f'{self.prefix}index', *expired)
+            pipeline.zrem(f'{self.prefix}expiry', *expired)
+            pipeline.execute()
+        return [jti.decode('utf-8') for jti in self.client.zrangebyscore(f'{self.prefix}index', f'({since}', '+inf')]
+
+
+class TokenBlocklist:
+    """Bloom filter front for a blocklist backend."""
+
+    def __init__(self, backend, sync_interval=1.0, rebuild_interval=600, capacity=100000, error_rate=0.001):
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._synced_at = 0.0
+        self._built_at = 0.0
+
+    def _sync(self, now):
+        """Add revocations made by other workers to the bloom filter."""
+        with self._lock:
+            if now - self._synced_at < self.sync_interval:
+                return
+            rebuild = now - self._built_at >= self.rebuild_interval
+            since = 0.0 if rebuild else self._synced_at - SYNC_OVERLAP
+            try:
+                jtis = self.backend.changes_since(since)
+            except Exception as e:
+                logger.warning(f"Token blocklist sync failed: {str(e)}")
+                return
+            bloom = BloomFilter(self.capacity, self.error_rate) if rebuild else self._bloom
+            for jti in jtis:
+                bloom.add(jti)
+            self._bloom = bloom
+            self._synced_at = now
+            if rebuild:
+                self._built_at = now
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until it expires.
+
+        Args:
+            jti: Token ID
+            expires_at: Token expiry as a UNIX timestamp
+        """
+        self.backend.add(jti, expires_at)
+        with self._lock:
+            self._bloom.add(jti)
+
+    def is_revoked(self, jti):
+        """
+        Check if a token has been revoked.
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            bool: True if revoked
+        """
+        now = time.time()
+        if now - self._synced_at >= self.sync_interval:
+            self._sync(now)
+
+        # Not in the filter: definitely not revoked
+        if jti not in self._bloom:
+            return False
+
+        try:
+            return self.backend.contains(jti)
+        except Exception as e:
+            # Fail closed for tokens the filter says may be revoked
+            logger.warning(f"Token blocklist lookup failed: {str(e)}")
+            return True
+
+
+def init_token_blocklist(app, jwt):
+    """
+    Initialize the token blocklist from app config and register it with JWTManager.
+
+    Args:
+        app: Flask application
+        jwt: JWTManager
+    """
+    backend_name = app.config.get('TOKEN_BLOCKLIST_BACKEND', 'memory')
+    if backend_name == 'redis':
+        backend = RedisBlocklistBackend(app.config['REDIS_URL'])
+    elif backend_name == 'memory':
+        backend = MemoryBlocklistBackend()
+    else:
+        app.extensions['token_blocklist'] = None
+        return
+
+    app.extensions['token_blocklist'] = TokenBlocklist(
+        backend,
+        sync_interval=app.config.get('TOKEN_BLOCKLIST_SYNC_INTERVAL', 1.0),
+        rebuild_interval=app.config.get('TOKEN_BLOCKLIST_REBUILD_INTERVAL', 600),
+        capacity=app.config.get('TOKEN_BLOCKLIST_CAPACITY', 100000)
+    )
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        blocklist = get_token_blocklist()
+        return blocklist is not None and blocklist.is_revoked(jwt_payload['jti'])
+
+
+def get_token_blocklist():
+    """
+    Get the token blocklist for the current app.
+
+    Returns:
+        TokenBlocklist: Blocklist or None if disabled or outside an app context
+    """
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('token_blocklist')
+
+
+def revoke_token(claims):
+    """
+    Revoke a decoded token until it expires.
+
+    Args:
+        claims: Decoded JWT claims
+
+    Returns:
+        bool: True if the token was added to the blocklist
+    """
+    blocklist = get_token_blocklist()
+    if blocklist is None:
+        return False
+    blocklist.revoke(claims['jti'], claims.get('exp', time.time() + 86400))
+    return True